@@ -0,0 +1,259 @@
+# Headless board-diagram renderer.
+# Turns FENs (or the key positions of annotated PGN games) into PNG or SVG files
+# without creating a Tk window, so it can run from cron on a server.
+# Usage:
+#   python diagram_renderer.py -p games.pgn -d out/ -s staunty -o Green
+#   python diagram_renderer.py -f positions.fen -d out/ --format svg
+import os
+import argparse
+import base64
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+import chess.pgn
+from PIL import Image
+import cairosvg
+
+from pgn_editor.pgn_editor import BOARD_THEMES
+from visualise_pgn import collect_significant_events, select_key_positions
+
+IMAGE_DIRECTORY = "Images/piece"
+
+PIECE_FILE_MAP = {
+    'K': 'wK', 'Q': 'wQ', 'R': 'wR', 'B': 'wB', 'N': 'wN', 'P': 'wP',
+    'k': 'bK', 'q': 'bQ', 'r': 'bR', 'b': 'bB', 'n': 'bN', 'p': 'bP',
+}
+
+
+def get_theme_colors(theme_name):
+    """Returns (light, dark) for a name from BOARD_THEMES, falls back to 'Standard'."""
+    for theme in BOARD_THEMES:
+        if theme["name"].lower() == str(theme_name).lower():
+            return theme["light"], theme["dark"]
+    return BOARD_THEMES[0]["light"], BOARD_THEMES[0]["dark"]
+
+
+class DiagramRenderer:
+    """
+    Renders chess positions to PNG or SVG without Tk.
+    The piece assets are read once; scaled pieces and the empty board
+    (one per size/orientation) are cached and reused for every diagram.
+    """
+
+    def __init__(self, image_dir_path=IMAGE_DIRECTORY, set_identifier="staunty", theme="Standard", square_size=45):
+        self.image_dir_path = image_dir_path
+        self.set_identifier = str(set_identifier)
+        self.square_size = square_size
+        self.color_light, self.color_dark = get_theme_colors(theme)
+
+        self.pil_images = {}     # symbol -> original PIL image (RGBA)
+        self.svg_sources = {}    # symbol -> (mime type, base64 data) for SVG output
+        self.scaled_cache = {}   # (symbol, size) -> scaled PIL image
+        self.background_cache = {}  # size -> composited empty board
+
+        self._load_images()
+
+    def _load_images(self):
+        """Loads the raw piece files; SVG files are rasterized once with cairosvg."""
+        for symbol, base_name in PIECE_FILE_MAP.items():
+            for ext in ('.svg', '.png'):
+                image_path = os.path.join(self.image_dir_path, self.set_identifier, f"{base_name}{ext}")
+                if not os.path.exists(image_path):
+                    continue
+                try:
+                    with open(image_path, "rb") as f:
+                        raw = f.read()
+                    if ext == '.svg':
+                        img = Image.open(BytesIO(cairosvg.svg2png(bytestring=raw, output_width=256, output_height=256)))
+                        self.svg_sources[symbol] = ("image/svg+xml", base64.b64encode(raw).decode("ascii"))
+                    else:
+                        img = Image.open(BytesIO(raw))
+                        self.svg_sources[symbol] = ("image/png", base64.b64encode(raw).decode("ascii"))
+                    self.pil_images[symbol] = img.convert("RGBA")
+                    break
+                except Exception as e:
+                    print(f"Error loading {image_path}: {e}")
+
+        if not self.pil_images:
+            raise FileNotFoundError(f"No piece images found in {os.path.join(self.image_dir_path, self.set_identifier)}")
+
+    def _get_piece(self, symbol, size):
+        key = (symbol, size)
+        img = self.scaled_cache.get(key)
+        if img is None and symbol in self.pil_images:
+            img = self.pil_images[symbol].resize((size, size), Image.Resampling.LANCZOS)
+            self.scaled_cache[key] = img
+        return img
+
+    def _get_background(self, size):
+        """The empty board only depends on the square size, so it is drawn once."""
+        background = self.background_cache.get(size)
+        if background is None:
+            background = Image.new("RGBA", (size * 8, size * 8), self.color_light)
+            dark = Image.new("RGBA", (size, size), self.color_dark)
+            for rank in range(8):
+                for file in range(8):
+                    if (rank + file) % 2 == 0:
+                        background.paste(dark, (file * size, (7 - rank) * size))
+            self.background_cache[size] = background
+        return background
+
+    @staticmethod
+    def _square_origin(square, size, flipped):
+        rank, file = chess.square_rank(square), chess.square_file(square)
+        if flipped:
+            return (7 - file) * size, rank * size
+        return file * size, (7 - rank) * size
+
+    def render_png(self, board, flipped=False):
+        """Returns a PIL image of the position."""
+        size = self.square_size
+        image = self._get_background(size).copy()
+        for square, piece in board.piece_map().items():
+            piece_img = self._get_piece(piece.symbol(), size)
+            if piece_img is not None:
+                image.alpha_composite(piece_img, self._square_origin(square, size, flipped))
+        return image.convert("RGB")
+
+    def render_svg(self, board, flipped=False):
+        """Returns an SVG document (str) of the position, with the piece files embedded."""
+        size = self.square_size
+        parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{size * 8}" height="{size * 8}" '
+                 f'viewBox="0 0 {size * 8} {size * 8}">',
+                 f'<rect width="{size * 8}" height="{size * 8}" fill="{self.color_light}"/>']
+        for square in chess.SQUARES:
+            if (chess.square_rank(square) + chess.square_file(square)) % 2 == 0:
+                x, y = self._square_origin(square, size, flipped)
+                parts.append(f'<rect x="{x}" y="{y}" width="{size}" height="{size}" fill="{self.color_dark}"/>')
+        for square, piece in board.piece_map().items():
+            source = self.svg_sources.get(piece.symbol())
+            if source:
+                x, y = self._square_origin(square, size, flipped)
+                parts.append(f'<image x="{x}" y="{y}" width="{size}" height="{size}" '
+                             f'href="data:{source[0]};base64,{source[1]}"/>')
+        parts.append('</svg>')
+        return "\n".join(parts)
+
+    def render_to_file(self, fen, out_path, flipped=False):
+        board = chess.Board(fen)
+        if out_path.lower().endswith(".svg"):
+            with open(out_path, "w", encoding="utf-8") as f:
+                f.write(self.render_svg(board, flipped))
+        else:
+            self.render_png(board, flipped).save(out_path, optimize=True)
+        return out_path
+
+
+# --- PROCESS POOL PLUMBING ---
+# Every worker builds its own renderer once (initializer) and keeps it for all its jobs.
+_worker_renderer = None
+
+
+def _init_worker(image_dir_path, set_identifier, theme, square_size):
+    global _worker_renderer
+    _worker_renderer = DiagramRenderer(image_dir_path, set_identifier, theme, square_size)
+
+
+def _render_job(job):
+    fen, out_path, flipped = job
+    try:
+        return _worker_renderer.render_to_file(fen, out_path, flipped)
+    except Exception as e:
+        print(f"Error rendering {fen} -> {out_path}: {e}")
+        return None
+
+
+def jobs_from_pgn(pgn_path, out_dir, fmt="png", key_positions_only=True):
+    """
+    Yields (fen, out_path, flipped) for the key positions of every game in the file
+    (same selection as the visualiser tabs). Without evaluation comments,
+    or with key_positions_only=False, every main-line position is used.
+    """
+    stem = os.path.splitext(os.path.basename(pgn_path))[0]
+    with open(pgn_path, encoding="utf-8", errors="replace") as f:
+        game_index = 0
+        while True:
+            game = chess.pgn.read_game(f)
+            if game is None:
+                break
+            events = select_key_positions(collect_significant_events(game)) if key_positions_only else []
+            if events:
+                for n, event in enumerate(events, start=1):
+                    out_path = os.path.join(out_dir, f"{stem}_g{game_index + 1:05d}_{n}.{fmt}")
+                    # Show the board from the side that has to find the move
+                    yield event['fen'], out_path, event['player'] == "Black"
+            else:
+                board = game.board()
+                for ply, move in enumerate(game.mainline_moves(), start=1):
+                    board.push(move)
+                    out_path = os.path.join(out_dir, f"{stem}_g{game_index + 1:05d}_p{ply:03d}.{fmt}")
+                    yield board.fen(), out_path, False
+            game_index += 1
+
+
+def jobs_from_fen_file(fen_path, out_dir, fmt="png"):
+    """Yields a job for every non-empty line (one FEN per line) of a text file."""
+    stem = os.path.splitext(os.path.basename(fen_path))[0]
+    with open(fen_path, encoding="utf-8") as f:
+        for n, line in enumerate((l.strip() for l in f if l.strip()), start=1):
+            yield line, os.path.join(out_dir, f"{stem}_{n:05d}.{fmt}"), False
+
+
+def render_batch(jobs, set_identifier="staunty", theme="Standard", square_size=45,
+                 image_dir_path=IMAGE_DIRECTORY, workers=None, chunksize=64):
+    """
+    Renders all jobs with a process pool. Returns the list of written files.
+    workers=1 renders in-process (handy for debugging).
+    """
+    jobs = list(jobs)
+    if workers == 1:
+        _init_worker(image_dir_path, set_identifier, theme, square_size)
+        results = [_render_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(image_dir_path, set_identifier, theme, square_size)) as pool:
+            results = list(pool.map(_render_job, jobs, chunksize=chunksize))
+    return [r for r in results if r]
+
+
+def parse_args():
+    """
+    Define an argument parser and return the parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog='diagram_renderer',
+        description='render board diagrams (PNG/SVG) for PGN key positions or FEN lists')
+    parser.add_argument("--pgn_game", "-p", nargs="*", default=[],
+                        help="PGN file(s); the key positions of every game are rendered")
+    parser.add_argument("--fen_file", "-f", nargs="*", default=[],
+                        help="Text file(s) with one FEN per line")
+    parser.add_argument("--all_positions", action="store_true",
+                        help="Render every main-line position instead of the key positions")
+    parser.add_argument("--out_dir", "-d", default="diagrams",
+                        help="Output directory")
+    parser.add_argument("--format", choices=["png", "svg"], default="png")
+    parser.add_argument("--piece_set", "-s", default="staunty",
+                        help="Set the piece-set for chess-pieces")
+    parser.add_argument("--board", "-o", default="Standard",
+                        help="Set the color theme of the board")
+    parser.add_argument("--square_size", "-q", type=int, default=45,
+                        help="Set the square-size for the board")
+    parser.add_argument("--workers", "-w", type=int, default=None,
+                        help="Number of worker processes (default: number of CPUs)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    def all_jobs():
+        for pgn_path in args.pgn_game:
+            yield from jobs_from_pgn(pgn_path, args.out_dir, args.format, not args.all_positions)
+        for fen_path in args.fen_file:
+            yield from jobs_from_fen_file(fen_path, args.out_dir, args.format)
+
+    written = render_batch(all_jobs(), args.piece_set, args.board, args.square_size,
+                           workers=args.workers)
+    print(f"{len(written)} diagrams written to {args.out_dir}")
@@ -3,8 +3,10 @@ from tkinter import ttk, filedialog, messagebox
 import chess.pgn
 from pathlib import Path
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import os, sys
 import json
+import re
 
 PREF_FILE = "configuration.json"
 
@@ -39,8 +41,10 @@ if editor_path not in sys.path:
     sys.path.append(editor_path)
 
 # Now you can import as if it were in your local directory
+OpeningClassifier = None
+PGNFile = None
 try:
-    from pgn_editor.pgn_editor import ChessAnnotatorApp, PieceImageManager1
+    from pgn_editor.pgn_editor import ChessAnnotatorApp, PieceImageManager1, OpeningClassifier, PGNFile
     print("Annotator successfully imported!")
 except ImportError as e:
     print(f"Could not find the annotator at {editor_path}: {e}")
@@ -58,12 +62,84 @@ try:
 except ImportError as e:
     print(f"Could not find the annotator at {editor_path}: {e}")
 
+# Openings found by replaying games without an ECO header, per file and offset (see _scan_all_databases)
+OPENING_CACHE_FILE = "opening_cache.json"
+CLASSIFY_CHUNK_SIZE = 500  # games per job for the process pool
+
+
+def _classify_offsets(job):
+    """
+    Runs in a worker process: classifies the games at the given offsets of one file
+    with the ECO data of the annotator. Returns (file_path, [(offset, eco, name), ...]),
+    eco and name are None if no opening was found.
+    """
+    file_path, offsets, max_plies = job
+    classifier = OpeningClassifier.get("eco.json")
+    results = []
+    with PGNFile(file_path) as pgn:
+        for offset in offsets:
+            stub, game = pgn.game_at(offset)
+            node, info = classifier.classify(game, max_plies=max_plies) if game else (None, None)
+            results.append((offset, info["code"], info["name"]) if info else (offset, None, None))
+    return file_path, results
+
+
+def iter_game_headers(file_path):
+    """
+    Yields (offset, headers) for every game of a file without parsing the moves.
+    Uses the shared mmap reader of the annotator (PGNFile), so the offsets are the same
+    game boundaries the editor and viewer use; plain read_headers if it isn't available.
+    """
+    if PGNFile is not None:
+        with PGNFile(file_path) as pgn:
+            for stub in pgn.stubs():
+                yield stub.offset, stub.headers
+        return
+    with open(file_path, encoding='utf-8', errors='ignore') as f:
+        while True:
+            offset = f.tell()
+            headers = chess.pgn.read_headers(f)
+            if headers is None:
+                break
+            yield offset, headers
+
+
+def read_headers_at(file_path, offset):
+    """ The header tags of the game at a byte offset (empty if there is none). """
+    if PGNFile is not None:
+        with PGNFile(file_path) as pgn:
+            for stub in pgn.stubs(int(offset)):
+                return stub.headers
+        return {}
+    with open(file_path, encoding='utf-8', errors='ignore') as f:
+        f.seek(int(offset))
+        return chess.pgn.read_headers(f) or {}
+
+
+def read_game_at_offset(file_path, offset):
+    """ Parses only the game at a byte offset; None if there is none. """
+    if PGNFile is not None:
+        with PGNFile(file_path) as pgn:
+            return pgn.game_at(int(offset))[1]
+    with open(file_path, encoding='utf-8', errors='ignore') as f:
+        f.seek(int(offset))
+        return chess.pgn.read_game(f)
+
+
+def _game_signature(headers):
+    """ Identifies a game in the opening cache, so a changed file doesn't reuse wrong entries. """
+    return "|".join(headers.get(tag, "?") for tag in ("White", "Black", "Date", "Round"))
+
+
 class TouchMoveListColor(tk.Frame):
     """
     A streamlined, touch-friendly list replacement for the Library.
     Supports basic highlighting, smooth scrolling, and momentum.
     """
 
+    # Text within parentheses (the game counts)
+    COUNT_PATTERN = re.compile(r'(\(.+?\))')
+
     def __init__(self, parent, move_pairs=None, select_callback=None, **kwargs):
         super().__init__(parent, **kwargs)
         self.move_pairs = move_pairs if move_pairs else []
@@ -121,8 +197,7 @@ class TouchMoveListColor(tk.Frame):
     def _populate(self):
         """ Clears and fills the text area with initial move pairs. """
         self.delete(0, tk.END)
-        for i, move in enumerate(self.move_pairs):
-            self.insert(tk.END, move)
+        self.insert_many(self.move_pairs)
 
     def _on_drag_start(self, event):
         """ Handles the initial press and cancels active momentum. """
@@ -188,32 +263,41 @@ class TouchMoveListColor(tk.Frame):
         Inserts text with alternating background colors and
         automatic color tagging for game counts.
         """
+        self.insert_many([text])
+
+    def insert_many(self, lines):
+        """
+        Appends several lines with one Tk insert call (text and tags interleaved)
+        and a single state toggle.
+        """
+        if not lines:
+            return
         self.text_area.config(state=tk.NORMAL)
 
         # Determine the current line number to decide on background color
         # index 'end-1c' gives the position before the final newline
         line_number = int(self.text_area.index("end-1c").split('.')[0])
 
-        # Decide which tag to use for the background
-        line_tag = "odd_row" if line_number % 2 == 0 else ""
-
-        # Regex to find text within parentheses
-        import re
-        parts = re.split(r'(\(.+?\))', text)
-
-        for part in parts:
-            # Combine the background tag with the functional tags
-            tags = [line_tag] if line_tag else []
-
-            if part.startswith('(') and part.endswith(')'):
-                tags.append("game_count")
-                self.text_area.insert(tk.END, part, tuple(tags))
-            else:
-                self.text_area.insert(tk.END, part, tuple(tags))
-
-        # Add the newline and apply the background tag to it as well
-        # to ensure the color covers the full width.
-        self.text_area.insert(tk.END, "\n", line_tag if line_tag else None)
+        chunks = []
+        for text in lines:
+            # Decide which tag to use for the background
+            line_tags = ("odd_row",) if line_number % 2 == 0 else ()
+
+            for part in self.COUNT_PATTERN.split(text):
+                if not part:
+                    continue
+                # Combine the background tag with the functional tags
+                if part.startswith('(') and part.endswith(')'):
+                    chunks += [part, line_tags + ("game_count",)]
+                else:
+                    chunks += [part, line_tags]
+
+            # Add the newline and apply the background tag to it as well
+            # to ensure the color covers the full width.
+            chunks += ["\n", line_tags]
+            line_number += 1
+
+        self.text_area.insert(tk.END, *chunks)
         self.text_area.config(state=tk.DISABLED)
 
     def delete(self, first, last=None):
@@ -551,6 +635,10 @@ class GlobalLibraryBrowser(tk.Tk):
                                   command=self._set_page_size_pref)
         settings_menu.add_command(label="Set Game-list Page Size...",
                                   command=self._set_page_size_games_pref)
+        settings_menu.add_separator()
+        self.classify_var = tk.BooleanVar(value=self.prefs.get("classify_openings", False))
+        settings_menu.add_checkbutton(label="Classify Openings While Scanning", variable=self.classify_var,
+                                      command=self._toggle_classify_openings)
 
         # Tools Menu
         tools_menu = tk.Menu(self.menubar, tearoff=0)
@@ -787,56 +875,139 @@ class GlobalLibraryBrowser(tk.Tk):
         if current_tab_idx < len(self.tab_keys):
             self.tabs[self.tab_keys[current_tab_idx]]._invert_selection()
 
+    def _toggle_classify_openings(self):
+        self.prefs["classify_openings"] = self.classify_var.get()
+        self._save_preferences()
+        if self.classify_var.get():
+            self.refresh_library()
+
+    def _load_opening_cache(self):
+        try:
+            if os.path.exists(OPENING_CACHE_FILE):
+                with open(OPENING_CACHE_FILE, "r") as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Error while loading {OPENING_CACHE_FILE}: {e}")
+        return {}
+
+    def _save_opening_cache(self, cache):
+        try:
+            with open(OPENING_CACHE_FILE, "w") as f:
+                json.dump(cache, f)
+        except Exception as e:
+            print(f"Failed to save {OPENING_CACHE_FILE}: {e}")
+
+    def _add_to_opening_index(self, eco, opening_name, entry):
+        full_op = f"{eco} - {opening_name}"
+        if full_op not in self.opening_index: self.opening_index[full_op] = []
+        self.opening_index[full_op].append(entry)
+
+    def _classify_pending_games(self, pending, cache):
+        """
+        Replays the first plies of the games without an ECO header in a process pool
+        and adds them to the opening index. Results go into the cache, so a rescan
+        only classifies games that are new.
+        """
+        max_plies = self.prefs.get("classify_max_plies", 40)
+        by_file = {}
+        for file_path, offset, game_idx, signature in pending:
+            by_file.setdefault(file_path, []).append((offset, game_idx, signature))
+        jobs = []
+        for file_path, games in by_file.items():
+            offsets = [offset for offset, _, _ in games]
+            for start in range(0, len(offsets), CLASSIFY_CHUNK_SIZE):
+                jobs.append((file_path, offsets[start:start + CLASSIFY_CHUNK_SIZE], max_plies))
+
+        self.prog_bar['maximum'] = len(pending)
+        self.prog_bar['value'] = 0
+        self.prog_label.config(text=f"Classifying openings: 0 of {len(pending)}")
+        self.update()
+
+        found = {}  # (file_path, offset) -> (eco, name)
+        try:
+            with ProcessPoolExecutor() as pool:
+                futures = [pool.submit(_classify_offsets, job) for job in jobs]
+                for future in as_completed(futures):
+                    file_path, results = future.result()
+                    for offset, eco, name in results:
+                        found[(file_path, offset)] = (eco, name)
+                    self.prog_bar['value'] = len(found)
+                    self.prog_label.config(text=f"Classifying openings: {len(found)} of {len(pending)}")
+                    self.update()
+        except Exception as e:
+            print(f"Error while classifying openings: {e}")
+
+        for file_path, offset, game_idx, signature in pending:
+            result = found.get((file_path, offset))
+            if result is None:
+                # Not classified (error): try again on the next scan
+                self._add_to_opening_index("???", "Unknown", (file_path, offset, game_idx))
+                continue
+            eco, name = result
+            cache.setdefault(file_path, {})[str(offset)] = [signature, eco or "", name or ""]
+            self._add_to_opening_index(eco or "???", name or "Unknown", (file_path, offset, game_idx))
+
     def _scan_all_databases(self):
         files = list(self.directory.glob('*.pgn'))
         self.prog_bar['maximum'] = len(files)
 
+        # Games without ECO header can be classified by replaying their first moves
+        classify = self.prefs.get("classify_openings", False) and OpeningClassifier is not None
+        old_cache = self._load_opening_cache() if classify else {}
+        cache = {}  # rebuilt during the scan: entries of deleted files or games are dropped
+        pending = []
+
         for i, pgn_file in enumerate(files):
             self.prog_label.config(text=f"Scanning: {pgn_file.name}")
             self.prog_bar['value'] = i + 1
             self.update()
 
             try:
-                with open(pgn_file, encoding='utf-8', errors='ignore') as f:
-                    game_idx = 0
-                    while True:
-                        offset = f.tell()
-                        headers = chess.pgn.read_headers(f)
-                        if headers is None: break
-
-                        # 1. Index Players
-                        for tag in ["White", "Black"]:
-                            name = headers.get(tag, "Unknown")
-                            if name not in self.player_index: self.player_index[name] = []
-                            self.player_index[name].append((str(pgn_file), offset, game_idx))
-
-                        # 2. Index Opening
-                        eco = headers.get("ECO", "???")
-                        opening_name = headers.get("Opening", "Unknown")
-                        full_op = f"{eco} - {opening_name}"
-                        if full_op not in self.opening_index: self.opening_index[full_op] = []
-                        self.opening_index[full_op].append((str(pgn_file), offset, game_idx))
-
-                        # 3. Index Year
-                        date_str = headers.get("Date", "????")
-                        year = date_str[:4] if len(date_str) >= 4 else "Unknown"
-
-                        # Validate if it is a number, otherwise "Unknown"
-                        if not year.isdigit(): year = "Unknown"
-
-                        if year not in self.year_index: self.year_index[year] = []
-                        self.year_index[year].append((str(pgn_file), offset, game_idx))
-
-                        # 4. Index Database File
-                        file_key = pgn_file.name
-                        if file_key not in self.file_index:
-                            self.file_index[file_key] = []
-                        self.file_index[file_key].append((str(pgn_file), offset, game_idx))
-
-                        game_idx += 1
+                for game_idx, (offset, headers) in enumerate(iter_game_headers(pgn_file)):
+                    # 1. Index Players
+                    for tag in ["White", "Black"]:
+                        name = headers.get(tag, "Unknown")
+                        if name not in self.player_index: self.player_index[name] = []
+                        self.player_index[name].append((str(pgn_file), offset, game_idx))
+
+                    # 2. Index Opening
+                    eco = headers.get("ECO", "???")
+                    opening_name = headers.get("Opening", "Unknown")
+                    entry = (str(pgn_file), offset, game_idx)
+                    if classify and eco in ("???", "?", ""):
+                        signature = _game_signature(headers)
+                        cached = old_cache.get(str(pgn_file), {}).get(str(offset))
+                        if cached and cached[0] == signature:
+                            cache.setdefault(str(pgn_file), {})[str(offset)] = cached
+                            self._add_to_opening_index(cached[1] or "???", cached[2] or "Unknown", entry)
+                        else:
+                            pending.append((str(pgn_file), offset, game_idx, signature))
+                    else:
+                        self._add_to_opening_index(eco, opening_name, entry)
+
+                    # 3. Index Year
+                    date_str = headers.get("Date", "????")
+                    year = date_str[:4] if len(date_str) >= 4 else "Unknown"
+
+                    # Validate if it is a number, otherwise "Unknown"
+                    if not year.isdigit(): year = "Unknown"
+
+                    if year not in self.year_index: self.year_index[year] = []
+                    self.year_index[year].append((str(pgn_file), offset, game_idx))
+
+                    # 4. Index Database File
+                    file_key = pgn_file.name
+                    if file_key not in self.file_index:
+                        self.file_index[file_key] = []
+                    self.file_index[file_key].append((str(pgn_file), offset, game_idx))
             except Exception as e:
                 print(f"Error in {pgn_file}: {e}")
 
+        if classify:
+            if pending:
+                self._classify_pending_games(pending, cache)
+            self._save_opening_cache(cache)
+
         self._display_players()
         self._display_openings()
         self._display_years()
@@ -943,7 +1114,8 @@ class GlobalLibraryBrowser(tk.Tk):
 
         page_items = sorted_items[start_index: start_index + self.page_size]
 
-        # 3. Insert into TouchMoveListColor
+        # 3. Insert into TouchMoveListColor (one batch for the page)
+        display_lines = []
         for name, games in page_items:
             # We use a simple format. The 'insert' method will handle the regex.
             # Since this isn't PGN, the regex won't find move numbers/variants,
@@ -962,9 +1134,10 @@ class GlobalLibraryBrowser(tk.Tk):
             else:
                 display_line = f"{clean_name}\t({len(games)} games)"
 
-            tab.touch_list.insert(tk.END, display_line)
+            display_lines.append(display_line)
 
             tab.current_keys.append(name)
+        tab.touch_list.insert_many(display_lines)
 
     def show_statistics(self):
         """Calculates and displays database statistics in a new window."""
@@ -1238,18 +1411,16 @@ class GlobalGameListWindow(tk.Toplevel):
                 # Combine the row color tag with any metadata tags (file_path, offset, etc.)
                 all_tags = (row_tag, file_path, offset, original_index)
 
-                with open(file_path, encoding='utf-8', errors='ignore') as f:
-                    f.seek(offset)
-                    headers = chess.pgn.read_headers(f)
-                    short_filename = os.path.basename(file_path)
-
-                    self.tree.insert("", tk.END, values=(
-                        headers.get("Date", "????.??.??"),
-                        headers.get("White", "Unknown"),
-                        headers.get("Black", "Unknown"),
-                        headers.get("Result", "*"),
-                        short_filename
-                    ), tags=all_tags)  # Apply the tags here
+                headers = read_headers_at(file_path, offset)
+                short_filename = os.path.basename(file_path)
+
+                self.tree.insert("", tk.END, values=(
+                    headers.get("Date", "????.??.??"),
+                    headers.get("White", "Unknown"),
+                    headers.get("Black", "Unknown"),
+                    headers.get("Result", "*"),
+                    short_filename
+                ), tags=all_tags)  # Apply the tags here
             except Exception as e:
                 print(f"Error loading game: {e}")
 
@@ -1284,11 +1455,9 @@ class GlobalGameListWindow(tk.Toplevel):
         # We need to read headers once to sort.
         # For performance, usually, you'd cache these headers in a list.
         path, offset, _ = data_item
-        with open(path, encoding='utf-8', errors='ignore') as f:
-            f.seek(offset)
-            headers = chess.pgn.read_headers(f)
-            val = headers.get(col.capitalize(), "")
-            return val.lower()
+        headers = read_headers_at(path, offset)
+        val = headers.get(col.capitalize(), "")
+        return val.lower()
 
     # The logic methods (identical to LibraryTab but directly on self.tree)
     def _select_all(self, event=None):
@@ -1314,18 +1483,16 @@ class GlobalGameListWindow(tk.Toplevel):
     def _load_games(self):
         try:
             for file_path, offset, original_index in self.game_data:
-                with open(file_path, encoding='utf-8', errors='ignore') as f:
-                    f.seek(offset)
-                    headers = chess.pgn.read_headers(f)
-                    short_filename = os.path.basename(file_path)
-
-                    self.tree.insert("", tk.END, values=(
-                        headers.get("Date", "????.??.??"),
-                        headers.get("White", "Unknown"),
-                        headers.get("Black", "Unknown"),
-                        headers.get("Result", "*"),
-                        short_filename
-                    ), tags=(file_path, offset, original_index))  # Use the original index
+                headers = read_headers_at(file_path, offset)
+                short_filename = os.path.basename(file_path)
+
+                self.tree.insert("", tk.END, values=(
+                    headers.get("Date", "????.??.??"),
+                    headers.get("White", "Unknown"),
+                    headers.get("Black", "Unknown"),
+                    headers.get("Result", "*"),
+                    short_filename
+                ), tags=(file_path, offset, original_index))  # Use the original index
         except Exception as e:
             print(f"Error: {e}")
 
@@ -1373,12 +1540,10 @@ class GlobalGameListWindow(tk.Toplevel):
                     # Get source information from Treeview row tags
                     file_path, offset = self.tree.item(item, "tags")
 
-                    with open(file_path, encoding='utf-8', errors='ignore') as source_file:
-                        source_file.seek(offset)
-                        game = chess.pgn.read_game(source_file)
-                        if game:
-                            export_file.write(str(game) + "\n\n")
-                            count += 1
+                    game = read_game_at_offset(file_path, offset)
+                    if game:
+                        export_file.write(str(game) + "\n\n")
+                        count += 1
 
             tk.messagebox.showinfo("Success", f"{count} games saved in the selected order:\n{file_name}")
 
@@ -1426,7 +1591,8 @@ class GlobalGameListWindow(tk.Toplevel):
         tags = self.tree.item(selected[0], "tags")
         print("tags:", tags)
         file_path = tags[1]
-        offset = tags[3]
+        # The byte offset lets the viewer read just this game instead of the whole file
+        offset = int(tags[2])
         # Convert game_index to an integer!
         game_index = int(tags[3])
 
@@ -1438,7 +1604,7 @@ class GlobalGameListWindow(tk.Toplevel):
         # Call the app with the parameters
         app = ChessEventViewer(new_window,
                                file_path, 80, None, "", file_path,
-                               "", "staunty", current_game_index=game_index)
+                               "", "staunty", current_game_index=game_index, game_offset=offset)
 
     def _display_raw(self):
         """Displays the raw PGN text of the selected game in a new window."""
@@ -1451,12 +1617,10 @@ class GlobalGameListWindow(tk.Toplevel):
 
         try:
             # 1. Read the game
-            with open(file_path, encoding='utf-8', errors='ignore') as f:
-                f.seek(int(offset))
-                game = chess.pgn.read_game(f)
-                if game is None:
-                    return
-                pgn_text = str(game)
+            game = read_game_at_offset(file_path, offset)
+            if game is None:
+                return
+            pgn_text = str(game)
 
             # 2. Create a new window
             raw_win = tk.Toplevel(self)
@@ -1508,7 +1672,8 @@ class GlobalGameListWindow(tk.Toplevel):
         tags = self.tree.item(item[0], "tags")
         print("tags:", tags)
         file_path = tags[1]
-        offset = tags[3]
+        # The byte offset lets the annotator read just this game instead of the whole file
+        offset = int(tags[2])
         # Convert the game_index to an integer!
         game_index = int(tags[3])
         if self.chess_annotator_app is None:
@@ -1530,9 +1695,10 @@ class GlobalGameListWindow(tk.Toplevel):
                 image_manager=asset_manager,
                 square_size=SQUARE_SIZE,
                 current_game_index=game_index,
-                call_back=self.annotator_callback)
+                call_back=self.annotator_callback,
+                game_offset=offset)
         else:
-            self.chess_annotator_app.display_game_externally(file_path, game_index)
+            self.chess_annotator_app.display_game_externally(file_path, game_index, offset)
 
     def annotator_callback(self, param):
         print("return from annotator in db-app")
@@ -1,11 +1,13 @@
 import json, sys
 import tkinter as tk
 import threading
+import queue
 from datetime import datetime
 from tkinter import messagebox, simpledialog, filedialog
 from io import StringIO
 import chess
 import chess.pgn
+import chess.polyglot
 import re # For simple PGN cleaning
 import asyncio
 import argparse
@@ -17,6 +19,17 @@ from tkinter import ttk
 import traceback
 from pathlib import Path
 import zipfile
+import hashlib
+import pickle
+import time
+import itertools
+import bisect
+from collections import OrderedDict
+import tempfile
+import mmap
+import array
+import struct
+import zlib
 
 PREFERENCES_FILE = "preferences.json"
 
@@ -103,28 +116,93 @@ def _add_tooltip(widget, text):
 
 
 class OpeningClassifier:
+    """
+    Finds the opening of a game with the ECO database (eco.json).
+    Use OpeningClassifier.get(): the database is loaded once per process. The lookup table
+    (Zobrist key of board + turn + castling -> opening) is also stored next to eco.json
+    as a pickle, so later processes don't have to rebuild it from the JSON.
+    """
+    INDEX_VERSION = 1
+    _instances = {}
+    _hasher = chess.polyglot.ZobristHasher(chess.polyglot.POLYGLOT_RANDOM_ARRAY)
+
+    @classmethod
+    def get(cls, json_path="eco.json"):
+        """ The shared classifier for this ECO file. """
+        instance = cls._instances.get(json_path)
+        if instance is None:
+            instance = cls._instances[json_path] = cls(json_path)
+        return instance
+
     def __init__(self, json_path="eco.json"):
         """
-        Loads the ECO database and prepares it for FEN-based lookup.
+        Loads the ECO database (or its prebuilt index) and prepares it for Zobrist-based lookup.
         """
         self.script_path = Path(__file__).resolve().parent
         eco_path = self.script_path / json_path
-        self.opening_db = {}
+        self.opening_db = {}   # position key -> {"name": ..., "code": ...}
+        # (white pawns on rank 2, black pawns on rank 7, min. number of pieces) of the ECO positions:
+        # used to stop as soon as no ECO position can be reached anymore
+        self.pawn_groups = []
+        if self._load_index(eco_path):
+            return
         try:
-            with open(eco_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Map standardized FEN to opening data for fast lookup
-                for entry in data:
-                    clean_fen = entry['f']
-                    self.opening_db[clean_fen] = {
-                        "name": entry['n'],
-                        "code": entry['c']
-                    }
+            self._build_index(eco_path)
+            self._save_index(eco_path)
         except FileNotFoundError:
             print(f"Error: {eco_path} not found.")
         except Exception as e:
             print(f"Error loading ECO database: {e}")
 
+    @classmethod
+    def position_key(cls, board):
+        """ Zobrist key of board, turn and castling rights (like the FENs in eco.json, without en passant). """
+        return cls._hasher.hash_board(board) ^ cls._hasher.hash_castling(board) ^ cls._hasher.hash_turn(board)
+
+    @staticmethod
+    def _index_path(eco_path):
+        return eco_path.with_suffix(".idx.pickle")
+
+    def _build_index(self, eco_path):
+        with open(eco_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        groups = {}
+        for entry in data:
+            board = chess.Board(self._standardize_fen(entry['f']) + " - 0 1")
+            self.opening_db[self.position_key(board)] = {
+                "name": entry['n'],
+                "code": entry['c']
+            }
+            group = (board.pieces_mask(chess.PAWN, chess.WHITE) & chess.BB_RANK_2,
+                     board.pieces_mask(chess.PAWN, chess.BLACK) & chess.BB_RANK_7)
+            pieces = chess.popcount(board.occupied)
+            groups[group] = min(pieces, groups.get(group, pieces))
+        self.pawn_groups = [(white, black, pieces) for (white, black), pieces in groups.items()]
+
+    def _load_index(self, eco_path):
+        """ Uses the prebuilt index if it is newer than eco.json. """
+        index_path = self._index_path(eco_path)
+        try:
+            if not eco_path.exists() or index_path.stat().st_mtime < eco_path.stat().st_mtime:
+                return False
+            with open(index_path, 'rb') as f:
+                index = pickle.load(f)
+            if index.get("version") != self.INDEX_VERSION:
+                return False
+            self.opening_db = index["opening_db"]
+            self.pawn_groups = index["pawn_groups"]
+            return True
+        except (OSError, pickle.PickleError, EOFError, KeyError, AttributeError):
+            return False
+
+    def _save_index(self, eco_path):
+        try:
+            with open(self._index_path(eco_path), 'wb') as f:
+                pickle.dump({"version": self.INDEX_VERSION, "opening_db": self.opening_db,
+                             "pawn_groups": self.pawn_groups}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            print(f"Could not store the ECO index: {e}")
+
     def _standardize_fen(self, fen):
         """
         Standardizes FEN by removing move clocks.
@@ -132,52 +210,154 @@ class OpeningClassifier:
         turn, castling, and en passant square.
         """
         parts = fen.split()
-        # Keep only board, turn, castling, and en passant (first 4 parts)
+        # Keep only board, turn and castling (first 3 parts)
         return " ".join(parts[:3])
 
-    def annotate_opening(self, game):
+    def classify(self, game, max_plies=None):
         """
-        Uses a while-loop to traverse the mainline and annotate the last matching opening move.
+        Walks the mainline with one board (push per move, no node.board() per node) and
+        returns (node, opening_info) of the last position found in the ECO database, or (None, None).
+        Stops when no ECO position is reachable anymore: pawns that left their start square
+        and captured pieces never come back. max_plies limits the walk further.
         """
-        if not game:
-            return None
-
-        node = game
+        if not game or not self.opening_db:
+            return None, None
+        board = game.board()
+        candidates = self.pawn_groups
         last_matched_node = None
         opening_info = None
-
-        # Traverse the mainline using the requested while-loop
-        while not node.is_end():
-            # Move to the next node in the main variation
+        node = game
+        ply = 0
+        while node.variations and candidates:
+            if max_plies is not None and ply >= max_plies:
+                break
             node = node.variation(0)
-
-            # Get the board position at this specific node
-            board = node.board()
-            current_fen = self._standardize_fen(board.fen())
+            board.push(node.move)
+            ply += 1
 
             # Check if this position is in our opening database
-            if current_fen in self.opening_db:
-                opening_info = self.opening_db[current_fen]
+            info = self.opening_db.get(self.position_key(board))
+            if info:
+                opening_info = info
                 last_matched_node = node
 
+            white_pawns = board.pieces_mask(chess.PAWN, chess.WHITE)
+            black_pawns = board.pieces_mask(chess.PAWN, chess.BLACK)
+            pieces = chess.popcount(board.occupied)
+            candidates = [group for group in candidates
+                          if not (group[0] & ~white_pawns) and not (group[1] & ~black_pawns) and group[2] <= pieces]
+        return last_matched_node, opening_info
+
+    def annotate_opening(self, game):
+        """
+        Annotates the last mainline move that matches an ECO position with the opening name.
+        Returns the opening info, or None.
+        """
+        last_matched_node, opening_info = self.classify(game)
+
         # If we found a match, add it as a comment to the specific node
         if last_matched_node and opening_info:
-            annotation = f"{opening_info['name']}"
-
-            # Check if the annotation is already there to avoid duplicates
-            existing_comment = last_matched_node.comment or ""
-            if annotation not in existing_comment:
-                if existing_comment:
-                    last_matched_node.comment = f"{existing_comment} ({annotation})"
-                    #print("opening", annotation, "added to:", last_matched_node)
-                else:
-                    last_matched_node.comment = annotation
-                    #print("opening", annotation, "added to:", last_matched_node)
-
+            self.annotate_node(last_matched_node, opening_info)
             return opening_info
 
         return None
 
+    @staticmethod
+    def annotate_node(node, opening_info):
+        """ Adds the opening name to the comment of node. Returns True if the comment changed. """
+        annotation = f"{opening_info['name']}"
+
+        # Check if the annotation is already there to avoid duplicates
+        existing_comment = node.comment or ""
+        if annotation in existing_comment:
+            return False
+        if existing_comment:
+            node.comment = f"{existing_comment} ({annotation})"
+        else:
+            node.comment = annotation
+        return True
+
+
+def benchmark_opening_classifier(pgn_path, limit=None):
+    """
+    Throughput of OpeningClassifier on a PGN file (parsing is measured separately).
+    python pgn_editor.py --benchmark_eco games.pgn
+    """
+    start = time.perf_counter()
+    classifier = OpeningClassifier.get("eco.json")
+    load_time = time.perf_counter() - start
+
+    games = []
+    with PGNFile(pgn_path) as pgn:
+        for stub in pgn.stubs():
+            if limit is not None and len(games) >= limit:
+                break
+            if game := pgn.read_game(stub.offset, stub.length):
+                games.append(game)
+
+    start = time.perf_counter()
+    found = sum(1 for game in games if classifier.classify(game)[1])
+    classify_time = time.perf_counter() - start
+    print(f"ECO index loaded in {load_time * 1000:.1f} ms ({len(classifier.opening_db)} positions)")
+    print(f"{len(games)} games classified in {classify_time:.2f} s "
+          f"({len(games) / classify_time if classify_time else 0:.0f} games/s), {found} with an opening")
+
+
+class AnalysisScheduler:
+    """
+    Divides the time budget of phase 2 of AnalysisManager over the selected plies.
+    Every ply gets a weight from phase 1: a big calibration drop or an eval swing gets more
+    time, a position that was already clearly won or lost much less. Each ply gets its share
+    of the time that is left, so time saved by a ply that stopped early (stable best move)
+    goes to the plies after it, and the game as a whole stays within its budget.
+    """
+    MIN_PLY_TIME = 0.1   # seconds, also once the budget is used up
+    MAX_PLY_TIME = 10.0
+    DECIDED_CP = 500     # |eval| before and after the move: the game is decided
+
+    def __init__(self, budget, weights):
+        """ budget in seconds, weights: ply index -> weight (see weight()). """
+        self.budget = budget
+        self.remaining = budget
+        self.weights = weights
+        self.remaining_weight = sum(weights.values())
+        self.report = []  # (ply index, move, seconds, depth, stopped early), in analysis order
+
+    @classmethod
+    def weight(cls, drop, is_swing, score_before, score_after):
+        """ drop and scores in centipawns (White's view) from the calibration scan. """
+        weight = 1.0 + min(drop, 300) / 100.0
+        if is_swing:
+            weight += 1.0
+        if (min(abs(score_before), abs(score_after)) >= cls.DECIDED_CP
+                and (score_before > 0) == (score_after > 0)):
+            weight *= 0.25
+        return weight
+
+    def time_for(self, ply):
+        """ Seconds for this ply: its share of the time that is left. """
+        if self.remaining_weight <= 0:
+            return self.MIN_PLY_TIME
+        share = max(0.0, self.remaining) * self.weights.get(ply, 1.0) / self.remaining_weight
+        return min(self.MAX_PLY_TIME, max(self.MIN_PLY_TIME, share))
+
+    def spent(self, ply, move, seconds, depth, stopped_early):
+        self.remaining -= seconds
+        self.remaining_weight -= self.weights.get(ply, 1.0)
+        self.report.append((ply, move, seconds, depth, stopped_early))
+
+    def summary(self, per_ply=True):
+        """ Time spent (per ply), for the console. """
+        used = sum(entry[2] for entry in self.report)
+        lines = [f"Phase 2: {len(self.report)} plies in {used:.1f} s (budget {self.budget:.1f} s)"]
+        for ply, move, seconds, depth, stopped_early in self.report:
+            move_number = f"{ply // 2 + 1}{'.' if ply % 2 == 0 else '...'}"
+            if per_ply:
+                lines.append(f"  {move_number}{move}: {seconds:.2f} s, depth {depth}"
+                             f"{' (stable)' if stopped_early else ''}")
+        return "\n".join(lines)
+
+
 class AnalysisManager:
     # --- CONFIGURATION PARAMETERS ---
     THREADS = 4
@@ -186,11 +366,18 @@ class AnalysisManager:
     MULTIPV_COUNT = 4
     PAWN_THRESHOLD = 0.5
 
+    # Phase 2 time: without a time_budget every selected ply gets this much on average
+    TIME_PER_PLY = 1.0
+    # Stop a ply early when the best move stayed the same for this many depths (from MIN_STABLE_DEPTH on)
+    STABLE_DEPTHS = 4
+    MIN_STABLE_DEPTH = 12
+
     def __init__(self, root, pgn_game, stockfish_path, on_finished_callback=None, db_info=None, depth_limit=17,
-                 check_previous = False, external_progress_ui=None):
+                 check_previous = False, external_progress_ui=None, time_budget=None):
         """
         Initialize the analysis manager.
         :param db_info: Optional string info like "Game 3 of 10: Player A vs Player B"
+        :param time_budget: Optional seconds for the whole game (both phases), see AnalysisScheduler
         """
         self.root = root
         self.check_previous = check_previous
@@ -201,9 +388,12 @@ class AnalysisManager:
         self.db_info = db_info  # Information about database progress
 
         self.is_cancelled = False  # Flag to stop the process
+        self.completed = False  # True when the whole game was analyzed (or already had an analysis)
         self.progress_win = None
         self.progress_bar = None
         self.depth_limit = depth_limit
+        self.time_budget = time_budget
+        self.scheduler = None  # AnalysisScheduler of phase 2, holds the time spent per ply
         self.status_label = None
         self.db_label = None
 
@@ -279,13 +469,16 @@ class AnalysisManager:
             analysis_header = f"Analysis by {engine_name} (Depth {self.depth_limit}"
 
             if self.game.comment.startswith(analysis_header) and self.check_previous:
+                self.completed = True
                 return
 
             # --- PHASE 1: CALIBRATION ---
             self.root.after(0,
                             lambda: self.status_label.config(text="Phase 1: Calibrating thresholds for this game..."))
+            start_time = time.perf_counter()
             all_drops = []
             node_indices = []
+            calib_scores = []  # score of the played move per ply, for the scheduler
             node = self.game
             total_moves = sum(1 for _ in self.game.mainline_moves())
 
@@ -310,6 +503,7 @@ class AnalysisManager:
 
                 all_drops.append(abs(best_val - played_val))
                 node_indices.append(idx)
+                calib_scores.append(played_val)
 
                 if prev_score is not None:
                     swing = abs(played_val - prev_score)
@@ -332,8 +526,19 @@ class AnalysisManager:
             analysis_worthy_indices = {index for drop, index in combined[:35]}
             # add swing-moments
             analysis_worthy_indices = analysis_worthy_indices | swing_indices
+            drop_of = dict(zip(node_indices, all_drops))
             all_drops.sort(reverse=True)
 
+            # Time for phase 2: what is left of the game budget, or TIME_PER_PLY per selected ply
+            if self.time_budget is not None:
+                budget = max(0.0, self.time_budget - (time.perf_counter() - start_time))
+            else:
+                budget = self.TIME_PER_PLY * len(analysis_worthy_indices)
+            self.scheduler = AnalysisScheduler(budget, {
+                i: AnalysisScheduler.weight(drop_of[i], i in swing_indices,
+                                            calib_scores[i - 1] if i > 0 else 0, calib_scores[i])
+                for i in analysis_worthy_indices})
+
             target_vbox = 20
             if len(all_drops) >= target_vbox:
                 # Set threshold to the 20th biggest error
@@ -382,12 +587,15 @@ class AnalysisManager:
                 board = node.board()
                 current_move_num = board.fullmove_number
 
-                self.root.after(0, lambda: self.status_label.config(
-                    text=f"Analyzing move {current_move_num}: {played_move}"))
+                ply_time = self.scheduler.time_for(move_count)
+                self.root.after(0, lambda t=ply_time: self.status_label.config(
+                    text=f"Analyzing move {current_move_num}: {played_move} ({t:.1f} s)"))
 
-                # Deep Multi-PV Analysis
-                limit = chess.engine.Limit(depth=self.depth_limit, time=1.0)
-                analysis = engine.analyse(board, limit, multipv=self.MULTIPV_COUNT)
+                # Deep Multi-PV Analysis, within the time the scheduler gives this ply
+                ply_start = time.perf_counter()
+                analysis, depth, stopped_early = self._analyse_ply(engine, board, ply_time)
+                self.scheduler.spent(move_count, board.san(played_move), time.perf_counter() - ply_start,
+                                     depth, stopped_early)
 
                 # Scores
                 best_entry = analysis[0]
@@ -423,6 +631,9 @@ class AnalysisManager:
                 move_count += 1
                 self.root.after(0, lambda v=move_count: self.progress_bar.config(value=v))
                 node = main_variation
+            self.completed = not self.is_cancelled
+            # A database run only reports the total per game
+            print(self.scheduler.summary(per_ply=not self.external_progress_ui))
 
         except Exception as e:
             print(f"Analysis error: {e}")
@@ -431,6 +642,31 @@ class AnalysisManager:
             if engine: engine.quit()
             self.root.after(0, self._on_cancel_complete if self.is_cancelled else self._on_complete)
 
+    def _analyse_ply(self, engine, board, ply_time):
+        """
+        Multi-PV analysis that stops at depth_limit, after ply_time seconds, or as soon as
+        the best move has been the same for STABLE_DEPTHS depths.
+        Returns (lines like engine.analyse with multipv, depth reached, stopped early).
+        """
+        limit = chess.engine.Limit(depth=self.depth_limit, time=ply_time)
+        best_move, stable_since, depth = None, 0, 0
+        stopped_early = False
+        with engine.analysis(board, limit, multipv=self.MULTIPV_COUNT) as result:
+            for info in result:
+                if info.get("multipv", 1) != 1 or "pv" not in info or "depth" not in info:
+                    continue
+                depth = info["depth"]
+                if info["pv"][0] != best_move:
+                    best_move, stable_since = info["pv"][0], depth
+                elif depth >= self.MIN_STABLE_DEPTH and depth - stable_since >= self.STABLE_DEPTHS:
+                    stopped_early = True
+                    break
+            lines = [entry for entry in result.multipv if "pv" in entry and "score" in entry]
+        if not lines:
+            # Stopped before the engine sent a line: a quick search instead
+            lines = engine.analyse(board, chess.engine.Limit(depth=10), multipv=self.MULTIPV_COUNT)
+        return lines, depth, stopped_early
+
     def store_score_in_node(self, main_variation, played_score_str: str):
         # Comment Clean & Update
         clean_comment = re.sub(r'^[+-]?\d+\.\d+\s*', '', main_variation.comment).strip()
@@ -485,6 +721,50 @@ class AnalysisManager:
         """Unified error reporting for the analysis thread."""
         if self.progress_win: self.progress_win.destroy()
         messagebox.showerror("Engine Error", f"An error occurred: {error}", parent=self.root)
+class AnalysisJournal:
+    """
+    Sidecar file of a database analysis (<pgn file>.analysis.jsonl).
+    Every analyzed game is appended as one JSON line and synced to disk right away,
+    so a stopped or crashed overnight run loses at most the game it was working on
+    and can be resumed. The file is removed once the games are saved into the PGN.
+    """
+    SUFFIX = ".analysis.jsonl"
+
+    def __init__(self, pgn_path):
+        self.path = pgn_path + self.SUFFIX
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def read(self):
+        """ The journal entries; a line that was cut off by a crash is skipped. """
+        entries = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        print(f"Skipping damaged line in {self.path}")
+        except OSError as e:
+            print(f"Could not read {self.path}: {e}")
+        return entries
+
+    def append(self, index, key, game):
+        exporter = chess.pgn.StringExporter(headers=True, variations=True, comments=True)
+        entry = {"index": index, "key": list(key), "pgn": game.accept(exporter)}
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
 class CommentManager:
     def __init__(self, label_widget, lines_per_page=5):
         self.display = label_widget
@@ -802,13 +1082,27 @@ BOARD_THEMES = [
 ]
 
 class PrettyMoveList(tk.Text):
+    # Text is always inserted at this mark (right gravity, so it moves along with the text)
+    RENDER_MARK = "render_pos"
+
     def __init__(self, master, select_callback=None, **kwargs):
         # Initialize the text widget with specific styles for chess PGN
         super().__init__(master, **kwargs)
         self.master = master
         self.select_callback = select_callback
-        # Dictionary to map chess nodes to their position in the text
+        # Dictionary to map chess nodes to their position in the text:
+        # node -> (main line node of the block, start offset, end offset), offsets relative to the block start
         self.node_to_index = {}
+        # Mainline node -> (start mark, end mark, interval starts, intervals) of its block:
+        # the move with its value, comments and the variations that replace it.
+        # intervals is the sorted list of (start, end, node, type_label) of the moves in the block,
+        # so the move under the mouse is found with bisect instead of a tag (and bindings) per move.
+        # A block can be redrawn on its own, see refresh_node.
+        self.node_blocks = {}
+        self.block_order = []  # main line nodes in text order
+        self._block_intervals = []
+        self._block_offset = 0
+        self._hover_cursor = ""
         self.is_variant = False
         # English: Configure background colors for the entire row
         self.tag_configure("bg_major", background="#f8d7da")  # English: Very light blue
@@ -870,6 +1164,9 @@ class PrettyMoveList(tk.Text):
         self.bind("<Button-1>", self._on_drag_start, add="+")
         self.bind("<B1-Motion>", self._on_drag_motion)  # No '+' here to block selection
         self.bind("<ButtonRelease-1>", self._on_drag_stop, add="+")
+        # One binding for all moves: clicks and hover are mapped to the node under the mouse
+        self.bind("<Button-1>", self._on_click, add="+")
+        self.bind("<Motion>", self._on_motion, add="+")
 
         # Linux scroll-wheel/touchpad support
         self.bind("<Button-4>", lambda e: self.yview_scroll(-1, "units"))
@@ -922,9 +1219,16 @@ class PrettyMoveList(tk.Text):
         if game:
             if self.is_variant:
                 return
+            # Release the marks of the previous game
+            for start_mark, end_mark, _, _ in self.node_blocks.values():
+                self.mark_unset(start_mark, end_mark)
             self.node_to_index = {}
+            self.node_blocks = {}
+            self.block_order = []
             self.config(state="normal")
             self.delete("1.0", tk.END)
+            self.mark_set(self.RENDER_MARK, "end-1c")
+            self.mark_gravity(self.RENDER_MARK, tk.RIGHT)
 
             # English: High-priority configuration before we start inserting text
             # We add 'offset' to help with vertical alignment of larger symbols
@@ -941,61 +1245,166 @@ class PrettyMoveList(tk.Text):
         """Handles main line moves with values and comments underneath."""
         for i, child in enumerate(node.variations):
             if i == 0: # Main line move
-                board = node.board()
-                san = board.san(child.move)
-                prefix = f"{board.fullmove_number}. " if board.turn == chess.WHITE else f"{board.fullmove_number}... "
-
-                # Add 'move_row' tag to minimize space after this line
-                # Pre-check if there is a valuation (value)
-                raw_comment = child.comment.strip() if child.comment else ""
-                comment_text = child.comment
-                comment_text = ""
-
-                has_value = False
-                val_str = ""
-                if raw_comment:
-                    # Check for valuation (value)
-                    val_match = re.match(r"^(\s?[\+\-\d\.\/\|\\=\?]{1,6})", raw_comment)
-                    if val_match:
-                        has_value = True
-                        val_str = val_match.group(1).strip()
-                        # Take the rest and remove internal newlines
-                        comment_text = raw_comment[val_match.end():].replace('\n', ' ').strip()
-                    else:
-                        comment_text = raw_comment.replace('\n', ' ').strip()
-
-
-                if comment_text:
-                    val_match = re.match(r"^(\s?[\+\-\d\.\/\|\\=\?]{1,6})", comment_text)
-                    if val_match:
-                        has_value = True
-                        val_str = val_match.group(1).strip()
-                        comment_text = comment_text[val_match.end():].strip()
+                start = self.index(self.RENDER_MARK)
+                self._start_block()
+                self._render_main_block(child)
+                self._set_block(child, start)
+                self.block_order.append(child)
 
-                # Apply 'move_row' (tight spacing) ONLY if a value follows
-                line_tags = ("number",)
-                if has_value:
-                    line_tags = ("number", "move_row")
-
-                self.insert(tk.END, f"\n{prefix}", line_tags)
-                self._add_move_node(san, "regular", "Regulier", child)
-
-                # Add value on a tight line
-                if has_value:
-                    self.insert(tk.END, f"\n  {val_str}", "value")
+                self._process_main_line(child)
 
-                # 3. Display remaining comments on separate lines
-                if comment_text:
-                    for line in comment_text.split('\n'):
-                        self.insert(tk.END, f"\n  {line.strip()}", "comment")
+    def _render_main_block(self, child):
+        """Renders one main line move: number, move, value, comments and the variants that replace it."""
+        board = child.parent.board()
+        san = board.san(child.move)
+        prefix = f"{board.fullmove_number}. " if board.turn == chess.WHITE else f"{board.fullmove_number}... "
+
+        # Add 'move_row' tag to minimize space after this line
+        # Pre-check if there is a valuation (value)
+        raw_comment = child.comment.strip() if child.comment else ""
+        comment_text = child.comment
+        comment_text = ""
+
+        has_value = False
+        val_str = ""
+        if raw_comment:
+            # Check for valuation (value)
+            val_match = re.match(r"^(\s?[\+\-\d\.\/\|\\=\?]{1,6})", raw_comment)
+            if val_match:
+                has_value = True
+                val_str = val_match.group(1).strip()
+                # Take the rest and remove internal newlines
+                comment_text = raw_comment[val_match.end():].replace('\n', ' ').strip()
+            else:
+                comment_text = raw_comment.replace('\n', ' ').strip()
+
+
+        if comment_text:
+            val_match = re.match(r"^(\s?[\+\-\d\.\/\|\\=\?]{1,6})", comment_text)
+            if val_match:
+                has_value = True
+                val_str = val_match.group(1).strip()
+                comment_text = comment_text[val_match.end():].strip()
+
+        # Apply 'move_row' (tight spacing) ONLY if a value follows
+        line_tags = ("number",)
+        if has_value:
+            line_tags = ("number", "move_row")
+
+        self._emit(f"\n{prefix}", line_tags)
+        self._add_move_node(san, "regular", "Regulier", child)
+
+        # Add value on a tight line
+        if has_value:
+            self._emit(f"\n  {val_str}", "value")
+
+        # 3. Display remaining comments on separate lines
+        if comment_text:
+            for line in comment_text.split('\n'):
+                self._emit(f"\n  {line.strip()}", "comment")
+
+        # 4. Display variants of this move below comments, in brackets
+        for j in range(1, len(child.parent.variations)):
+            self._emit("\n  (", "variant")
+            self._process_variant_line(child.parent.variations[j], level=1, force_number=True)
+            self._emit(")", "variant")
+
+    def _emit(self, text, *tags):
+        """Inserts text at the render mark and keeps track of the offset within the current block."""
+        self.insert(self.RENDER_MARK, text, *tags)
+        self._block_offset += len(text)
+
+    def _start_block(self):
+        self._block_intervals = []
+        self._block_offset = 0
+
+    def _set_block(self, node, start):
+        """Remembers where the block of a main line node starts and ends (at the render mark)."""
+        start_mark, end_mark = f"blk_s_{id(node)}", f"blk_e_{id(node)}"
+        # The start moves along with text inserted at the end of the previous block,
+        # the end stays put when the next block is redrawn
+        self.mark_set(start_mark, start)
+        self.mark_gravity(start_mark, tk.RIGHT)
+        self.mark_set(end_mark, self.RENDER_MARK)
+        self.mark_gravity(end_mark, tk.LEFT)
+        # Moves are emitted in text order, so the intervals are already sorted
+        intervals = self._block_intervals
+        self.node_blocks[node] = (start_mark, end_mark, [iv[0] for iv in intervals], intervals)
+        for iv_start, iv_end, iv_node, _ in intervals:
+            self.node_to_index[iv_node] = (node, iv_start, iv_end)
+        self._block_intervals = []
+
+    def _node_at(self, index):
+        """Returns (node, type_label) of the move drawn at a text index, or None."""
+        # 1. Last block that starts at or before the index (blocks are in text order)
+        lo, hi = 0, len(self.block_order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.compare(self.node_blocks[self.block_order[mid]][0], "<=", index):
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return None
+        start_mark, _, starts, intervals = self.node_blocks[self.block_order[lo - 1]]
 
-                # 4. Display variants of this move below comments, in brackets
-                for j in range(1, len(child.parent.variations)):
-                    self.insert(tk.END, "\n  (", "variant")
-                    self._process_variant_line(child.parent.variations[j], level=1, force_number=True)
-                    self.insert(tk.END, ")", "variant")
+        # 2. The move interval within the block
+        offset = (self.count(start_mark, index, "chars") or (0,))[0]
+        i = bisect.bisect_right(starts, offset) - 1
+        if i >= 0 and offset < intervals[i][1]:
+            return intervals[i][2], intervals[i][3]
+        return None
 
-                self._process_main_line(child)
+    def _on_click(self, event):
+        hit = self._node_at(self.index(f"@{event.x},{event.y}"))
+        if hit:
+            self._on_move_click(*hit)
+
+    def _on_motion(self, event):
+        cursor = "hand2" if self._node_at(self.index(f"@{event.x},{event.y}")) else ""
+        if cursor != self._hover_cursor:
+            self._hover_cursor = cursor
+            self.config(cursor=cursor)
+
+    @staticmethod
+    def _block_owner(node):
+        """The main line node whose block shows node (variations are shown with the move they replace)."""
+        while node.parent is not None and not node.is_mainline():
+            if node.parent.is_mainline():
+                return node.parent.variations[0]
+            node = node.parent
+        return node
+
+    def refresh_node(self, node):
+        """
+        Redraws only the blocks that show node after its comment or variations changed:
+        the block that contains it and the block of the next main line move (which lists
+        the variations starting at node). Returns False if such a block was never drawn
+        (e.g. a new main line move), then the caller has to reload the whole game.
+        """
+        if self.is_variant:
+            return True
+        owners = [self._block_owner(node)]
+        if node.is_mainline() and node.variations:
+            owners.append(node.variations[0])
+        owners = [owner for owner in dict.fromkeys(owners) if owner.parent is not None]
+        if not owners or any(owner not in self.node_blocks for owner in owners):
+            return False
+
+        self.config(state="normal")
+        for owner in owners:
+            start_mark, end_mark, _, intervals = self.node_blocks[owner]
+            for interval in intervals:
+                self.node_to_index.pop(interval[2], None)
+            start = self.index(start_mark)
+            self.delete(start, end_mark)
+            self.mark_set(self.RENDER_MARK, start)
+            self._start_block()
+            self._render_main_block(owner)
+            self._set_block(owner, start)
+        self.tag_raise("figurine")
+        self.config(state="disabled")
+        return True
 
     def _process_variant_line(self, node, level, force_number=False):
         """Handles variant lines compactly: '2. Nf3 d6'."""
@@ -1005,37 +1414,34 @@ class PrettyMoveList(tk.Text):
 
         # Number logic: only show for White, or if forced (after comments/brackets)
         if board.turn == chess.WHITE:
-            self.insert(tk.END, f"{board.fullmove_number}. ", "number")
+            self._emit(f"{board.fullmove_number}. ", "number")
             next_force = False
         else:
             if force_number:
-                self.insert(tk.END, f"{board.fullmove_number}... ", "number")
+                self._emit(f"{board.fullmove_number}... ", "number")
             next_force = False
 
         self._add_move_node(san, tag, "Variant", node)
 
         # Handle comments and sub-variations within the variant block
         if node.comment:
-            self.insert(tk.END, f" {{{node.comment}}} ", "comment")
+            self._emit(f" {{{node.comment}}} ", "comment")
             next_force = True
         else:
-            self.insert(tk.END, " ")
+            self._emit(" ")
             next_force = (len(node.variations) > 1)
 
         for i, var in enumerate(node.variations):
             if i == 0: # Continue same variant line
                 self._process_variant_line(var, level, force_number=next_force)
             else: # Nested sub-variation
-                self.insert(tk.END, "(", "subvariant")
+                self._emit("(", "subvariant")
                 self._process_variant_line(var, level + 1, force_number=True)
-                self.insert(tk.END, ")", "subvariant")
+                self._emit(")", "subvariant")
                 next_force = True
 
     def _add_move_node(self, san, tag, type_label, node):
         """ English: Only apply major/minor colors to regular (mainline) moves. """
-        unique_id = f"node_{id(node)}"
-        tags = [unique_id, tag]
-
         # English: Step 1 - Determine if this node should get an analysis background
         is_major = False
         is_minor = False
@@ -1053,7 +1459,8 @@ class PrettyMoveList(tk.Text):
         # Fallback to 'fig_regular' if the tag isn't in our map
         fig_style = fig_tag_map.get(tag, "fig_regular")
 
-        start_index = self.index(tk.INSERT)
+        start_index = self.index(self.RENDER_MARK)
+        start_offset = self._block_offset
 
         if type_label == "Regulier":
             idx = node.ply() - 1
@@ -1068,13 +1475,11 @@ class PrettyMoveList(tk.Text):
             remainder = san[1:]
 
             # Insert symbol larger, then the rest normal size
-            # English: We give both the unique_id so the whole thing is clickable
-            self.insert(tk.INSERT, symbol, (unique_id, tag, fig_style))
-            self.insert(tk.INSERT, remainder, (unique_id, tag))
+            self._emit(symbol, (tag, fig_style))
+            self._emit(remainder, tag)
         else:
             # English: Pawn moves or O-O
-            self.insert(tk.INSERT, san, (unique_id, tag))
-        end_index = self.index(tk.INSERT)
+            self._emit(san, tag)
 
         # 5. Apply row background color ONLY for the identified mainline moves
         line_num = start_index.split('.')[0]
@@ -1085,12 +1490,8 @@ class PrettyMoveList(tk.Text):
         elif is_minor:
             self.tag_add("bg_minor", f"{line_num}.0", f"{line_num}.end + 1 chars")
 
-        # 6. Bindings (events blijven voor alle zetten gelijk)
-        self.tag_bind(unique_id, "<Button-1>", lambda e, n=node, l=type_label: self._on_move_click(n, l))
-        self.tag_bind(unique_id, "<Enter>", lambda e: self.config(cursor="hand2"))
-        self.tag_bind(unique_id, "<Leave>", lambda e: self.config(cursor=""))
-
-        self.node_to_index[node] = (start_index, end_index)
+        # 6. Clicks and hover are handled by the widget bindings (see _node_at)
+        self._block_intervals.append((start_offset, self._block_offset, node, type_label))
 
     def highlight_node(self, node):
         """ Highlights the node and ensures it's fully visible. """
@@ -1098,7 +1499,10 @@ class PrettyMoveList(tk.Text):
         self.tag_remove("active_line", "1.0", tk.END)
 
         if node in self.node_to_index:
-            start, end = self.node_to_index[node]
+            owner, start_offset, end_offset = self.node_to_index[node]
+            block_start = self.index(self.node_blocks[owner][0])
+            start = self.index(f"{block_start} + {start_offset} chars")
+            end = self.index(f"{block_start} + {end_offset} chars")
             self.tag_add("active_move", start, end)
 
             line_num = int(start.split('.')[0])
@@ -1136,6 +1540,9 @@ class TouchMoveListColor(tk.Frame):
     with insert/delete/selection methods.
     """
 
+    # Move numbers, (variations), {comments}, moves and whitespace of a line
+    TOKEN_PATTERN = re.compile(r'(\d+\.+\s?)|(\(.+?\))|(\{.+?\})|([^\s(){}\[\]]+)|(\s+)')
+
     def __init__(self, parent, move_pairs=None, select_callback=None, **kwargs):
         super().__init__(parent, **kwargs)
 
@@ -1239,8 +1646,7 @@ class TouchMoveListColor(tk.Frame):
     def _populate(self):
         """ Clears and fills the text area with initial move pairs. """
         self.delete(0, tk.END)
-        for i, move in enumerate(self.move_pairs):
-            self.insert(tk.END, move)
+        self.insert_many(self.move_pairs)
 
     def _on_click(self, event):
         """ Records the start of a click/drag. """
@@ -1329,50 +1735,49 @@ class TouchMoveListColor(tk.Frame):
         Inserts PGN text.
         If tag_override starts with 'line_', the whole line gets that background.
         """
-        self.text_area.config(state=tk.NORMAL)
+        self.insert_many([(move_text, tag_override)])
 
-        # Determine the starting position of this new line
-        start_index = self.text_area.index("end-1c")
+    def insert_many(self, lines):
+        """
+        Appends several lines at once: lines is a list of texts or (text, tag_override) pairs.
+        All text/tag pairs go to Tk in one insert call, with one state toggle for the batch.
+        """
+        chunks = []
+        for line in lines:
+            if isinstance(line, tuple):
+                self._line_chunks(chunks, *line)
+            else:
+                self._line_chunks(chunks, line)
+        if not chunks:
+            return
 
-        pattern = re.compile(r'(\d+\.+\s?)|(\(.+?\))|(\{.+?\})|([^\s(){}\[\]]+)|(\s+)')
+        self.text_area.config(state=tk.NORMAL)
+        self.text_area.insert(tk.END, *chunks)
+        self.text_area.config(state=tk.DISABLED)
 
-        # We still need to know if it's white or black for the move boxes
-        # If the override is a line tag, we assume white by default unless we check the text
-        is_white = "black" not in (tag_override or "").lower()
+    def _line_chunks(self, chunks, move_text, tag_override=""):
+        """Adds the text and tags of one line to chunks (text, tags, text, tags, ...)."""
+        tag_override = tag_override or ""
+        # Tags for every segment: the line tag colors the whole row
+        line_tags = (tag_override,) if tag_override.startswith("line_") else ()
 
-        for match in pattern.finditer(str(move_text)):
+        for match in self.TOKEN_PATTERN.finditer(str(move_text)):
             move_num, variation, comment, move, whitespace = match.groups()
 
-            # Collect tags for this specific segment
-            tags = []
-            if tag_override and tag_override.startswith("line_"):
-                tags.append(tag_override)
-
             if move_num:
-                tags.append("move_num")
-                self.text_area.insert(tk.END, move_num, tuple(tags))
+                chunks += [move_num, line_tags + ("move_num",)]
             elif variation:
-                tags.append("variation")
-                self.text_area.insert(tk.END, variation, tuple(tags))
+                chunks += [variation, line_tags + ("variation",)]
             elif comment:
-                tags.append("comment")
-                self.text_area.insert(tk.END, f"{comment} ", tuple(tags))
+                chunks += [f"{comment} ", line_tags + ("comment",)]
             elif move:
                 # Add the specific move box tag
-                if "move" in tag_override:
-                    tags.append(tag_override)
-                self.text_area.insert(tk.END, f" {move} ", tuple(tags))
+                chunks += [f" {move} ", line_tags + ((tag_override,) if "move" in tag_override else ())]
             elif whitespace:
-                self.text_area.insert(tk.END, whitespace, tuple(tags))
+                chunks += [whitespace, line_tags]
 
         # Apply the line tag to the trailing newline as well to avoid white gaps
-        end_index = self.text_area.index("end-1c")
-        if tag_override and tag_override.startswith("line_"):
-            self.text_area.insert(tk.END, "\n", tag_override)
-        else:
-            self.text_area.insert(tk.END, "\n")
-
-        self.text_area.config(state=tk.DISABLED)
+        chunks += ["\n", line_tags]
 
     def delete(self, first, last=None):
         """ Deletes lines from the text area. """
@@ -1455,6 +1860,10 @@ class MoveListController:
     def update_view(self, game, move_list):
         raise NotImplementedError
 
+    def update_node(self, node):
+        """Refreshes the view after the comment or variations of node changed."""
+        raise NotImplementedError
+
     def set_selection(self, index, game):
         raise NotImplementedError
 
@@ -1476,6 +1885,7 @@ class LegacyMoveListController(MoveListController):
         if not self.app.game:
             return
         self.app.move_tags = []
+        lines = []
         for i, node in enumerate(self.app.move_list):
             prev_board = node.parent.board()
             move_num = (i // 2) + 1
@@ -1511,7 +1921,14 @@ class LegacyMoveListController(MoveListController):
                 current_tag = "line_minor"
             # The widget's insert method now uses this tag to color the move
             self.app.move_tags.append(current_tag)
-            self.widget.insert(tk.END, full_line, tag_override=current_tag)
+            lines.append((full_line, current_tag))
+
+        # One insert for the whole game
+        self.widget.insert_many(lines)
+
+    def update_node(self, node):
+        # The lines are cheap to build, so the list is simply rebuilt
+        self.update_view(self.app.game, self.app.move_list)
 
     def set_selection(self, index, game):
         if 0 <= index < self.widget.size():
@@ -1534,6 +1951,12 @@ class PrettyMoveListController(MoveListController):
         self.widget.set_highlights(self.app.top_5_major_set, self.app.top_5_minor_set)
         self.widget.load_pgn(game)
 
+    def update_node(self, node):
+        # Only the blocks that show the node are redrawn; a reload is needed if the tree changed shape
+        self.widget.set_highlights(self.app.top_5_major_set, self.app.top_5_minor_set)
+        if not self.widget.refresh_node(node):
+            self.widget.load_pgn(self.app.game)
+
     def set_selection(self, index, game):
         # get move self.current_move_index from self.game
         # pass this move to self.move_list_widget.highlight_node(node)
@@ -1791,10 +2214,203 @@ class TouchFileDialog(tk.Toplevel):
         if self.result:
             self.destroy()
             
+class VirtualGameList(tk.Frame):
+    """
+    A list of games that only draws the rows that are visible, on one canvas.
+    Opening it costs the same for 10 or 100k games: there is no widget per game,
+    the checkbox states are kept in a bytearray and the row texts are made when drawn.
+    header_views: objects with .headers (games or GameStubs, see game_header_views)
+    row_text(index, view): the text of a row
+    checkable: rows get a checkbox, a click toggles it; otherwise a click selects the row
+    on_activate(index): called on double-click
+    Typing in the filter entry shows only the rows that contain the text.
+    """
+    ROW_HEIGHT = 24
+    CHECK_SIZE = 14
+    FILTER_DELAY_MS = 200
+
+    def __init__(self, master, header_views, row_text, checkable=False, on_activate=None,
+                 selected_index=None, bg="white", select_bg="#0078D7", font=('Consolas', 10), **kwargs):
+        super().__init__(master, bg=bg, **kwargs)
+        self.header_views = header_views
+        self.row_text = row_text
+        self.checkable = checkable
+        self.on_activate = on_activate
+        self.bg = bg
+        self.select_bg = select_bg
+        self.font = font
+
+        self.checked = bytearray(len(header_views))
+        self.visible_indices = range(len(header_views))  # game indices that pass the filter
+        self.selected_index = selected_index
+        self.top = 0  # pixel offset of the first visible pixel
+        self.drag_data = {"start_y": 0, "last_y": 0, "is_dragging": False}
+        self.filter_job = None
+
+        # --- Filter entry ---
+        filter_frame = tk.Frame(self, bg=bg)
+        filter_frame.pack(fill=tk.X, pady=(0, 4))
+        tk.Label(filter_frame, text="Filter:", bg=bg).pack(side=tk.LEFT, padx=(0, 5))
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add("write", self._schedule_filter)
+        tk.Entry(filter_frame, textvariable=self.filter_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.count_label = tk.Label(filter_frame, bg=bg, text=f"{len(header_views)} games")
+        self.count_label.pack(side=tk.RIGHT, padx=5)
+
+        # --- Canvas + scrollbar ---
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0, height=15 * self.ROW_HEIGHT)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<ButtonPress-1>", self._start_drag)
+        self.canvas.bind("<B1-Motion>", self._do_drag)
+        self.canvas.bind("<ButtonRelease-1>", self._on_release)
+        self.canvas.bind("<Double-Button-1>", self._on_double_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll_pixels(int(-e.delta / 120) * 3 * self.ROW_HEIGHT))
+        self.canvas.bind("<Button-4>", lambda e: self.scroll_pixels(-3 * self.ROW_HEIGHT))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll_pixels(3 * self.ROW_HEIGHT))
+
+    # --- Drawing ---
+
+    def _content_height(self):
+        return len(self.visible_indices) * self.ROW_HEIGHT
+
+    def _clamp_top(self):
+        max_top = max(0, self._content_height() - self.canvas.winfo_height())
+        self.top = max(0, min(self.top, max_top))
+
+    def redraw(self):
+        """ Draws only the rows inside the viewport. """
+        self.canvas.delete("row")
+        self._clamp_top()
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        first = self.top // self.ROW_HEIGHT
+        last = min(len(self.visible_indices), (self.top + height) // self.ROW_HEIGHT + 1)
+        text_x = 5
+        for position in range(first, last):
+            index = self.visible_indices[position]
+            y = position * self.ROW_HEIGHT - self.top
+            is_selected = index == self.selected_index
+            if is_selected:
+                self.canvas.create_rectangle(0, y, width, y + self.ROW_HEIGHT, fill=self.select_bg, width=0, tags="row")
+            self.canvas.create_text(text_x, y + self.ROW_HEIGHT // 2, anchor="w", font=self.font, tags="row",
+                                    text=self.row_text(index, self.header_views[index]),
+                                    fill="white" if is_selected else "black")
+            if self.checkable:
+                x0 = width - self.CHECK_SIZE - 12
+                y0 = y + (self.ROW_HEIGHT - self.CHECK_SIZE) // 2
+                self.canvas.create_rectangle(x0, y0, x0 + self.CHECK_SIZE, y0 + self.CHECK_SIZE,
+                                             outline="black", fill="white", tags="row")
+                if self.checked[index]:
+                    self.canvas.create_line(x0 + 3, y0 + 7, x0 + 6, y0 + 11, x0 + 12, y0 + 3,
+                                            width=2, fill="#107010", tags="row")
+        # Scrollbar shows the visible part of the whole list
+        total = self._content_height()
+        if total > 0:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + height) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    # --- Scrolling ---
+
+    def scroll_pixels(self, delta):
+        self.top += delta
+        self.redraw()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * self._content_height())
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            step = self.canvas.winfo_height() if args[2] == "pages" else self.ROW_HEIGHT
+            self.top += amount * step
+        self.redraw()
+
+    def scroll_to(self, index):
+        """ Scrolls the game with this index (if it passes the filter) into the middle of the view. """
+        try:
+            position = self.visible_indices.index(index)
+        except ValueError:
+            return
+        self.top = position * self.ROW_HEIGHT - self.canvas.winfo_height() // 2
+        self.redraw()
+
+    # --- Touch / mouse ---
+
+    def _row_at(self, y):
+        position = (self.top + y) // self.ROW_HEIGHT
+        if 0 <= position < len(self.visible_indices):
+            return self.visible_indices[position]
+        return None
+
+    def _start_drag(self, event):
+        self.drag_data["start_y"] = event.y_root
+        self.drag_data["last_y"] = event.y_root
+        self.drag_data["is_dragging"] = False
+
+    def _do_drag(self, event):
+        MIN_DRAG_DISTANCE = 5
+        if not self.drag_data["is_dragging"]:
+            if abs(event.y_root - self.drag_data["start_y"]) <= MIN_DRAG_DISTANCE:
+                return
+            self.drag_data["is_dragging"] = True
+        self.scroll_pixels(self.drag_data["last_y"] - event.y_root)
+        self.drag_data["last_y"] = event.y_root
+
+    def _on_release(self, event):
+        if self.drag_data["is_dragging"]:
+            self.drag_data["is_dragging"] = False
+            return
+        index = self._row_at(event.y)
+        if index is None:
+            return
+        if self.checkable:
+            self.checked[index] ^= 1
+        self.selected_index = index
+        self.redraw()
+
+    def _on_double_click(self, event):
+        index = self._row_at(event.y)
+        if index is not None and self.on_activate:
+            self.on_activate(index)
+
+    # --- Filter ---
+
+    def _schedule_filter(self, *args):
+        # Wait until typing pauses: filtering a big database takes a moment
+        if self.filter_job:
+            self.after_cancel(self.filter_job)
+        self.filter_job = self.after(self.FILTER_DELAY_MS, self.apply_filter)
+
+    def apply_filter(self):
+        self.filter_job = None
+        text = self.filter_var.get().strip().lower()
+        if text:
+            self.visible_indices = [i for i, view in enumerate(self.header_views)
+                                    if text in self.row_text(i, view).lower()]
+        else:
+            self.visible_indices = range(len(self.header_views))
+        self.count_label.config(text=f"{len(self.visible_indices)} of {len(self.header_views)} games"
+                                if text else f"{len(self.header_views)} games")
+        self.top = 0
+        self.redraw()
+
+    # --- Checkboxes ---
+
+    def invert(self):
+        """ Inverts the checkboxes of the rows that pass the filter. """
+        for index in self.visible_indices:
+            self.checked[index] ^= 1
+        self.redraw()
+
+
 class GameChooserDialog(tk.Toplevel):
     """
     A Toplevel dialog for selecting a game from a PGN list,
-    featuring touch-friendly canvas scrolling.
+    featuring touch-friendly scrolling (see VirtualGameList).
     """
 
     def __init__(self, master, all_games, current_game_index, switch_callback):
@@ -1807,16 +2423,6 @@ class GameChooserDialog(tk.Toplevel):
         # Callback function from the main class (e.g., self._switch_to_game)
         self.switch_callback = switch_callback
 
-        # --- Internal State ---
-        self.selected_index = None
-        self.drag_data = {
-            "_start_y": 0,
-            "_last_y": 0,
-            "_is_dragging": False,
-            "selected_label": None
-        }
-        self.game_labels = []
-
         # --- UI Setup ---
         self.title("Choose Game")
         self.transient(master)  # Ensures the dialog stays on top of the master
@@ -1828,107 +2434,44 @@ class GameChooserDialog(tk.Toplevel):
         # Wait until the dialog is destroyed
         self.master.wait_window(self)
 
+    @staticmethod
+    def _row_text(i, game):
+        white = game.headers.get("White", "???")
+        black = game.headers.get("Black", "???")
+        result = game.headers.get("Result", "*-*")
+        event_name = game.headers.get("Event", "Untitled")
+        return f"Game {i + 1}: {white} - {black} ({result}) | {event_name}"
+
     def _build_ui(self, master):
         """Builds the entire user interface within the Toplevel."""
 
         tk.Label(self, text="Select a game from the list:", font=('Arial', 10, 'bold')).pack(padx=10, pady=5)
 
-        listbox_frame = tk.Frame(self, padx=10, pady=5)
-        listbox_frame.pack(fill='both', expand=True)
-
-        # 1. Create the Canvas (the viewport)
-        self.game_canvas = tk.Canvas(listbox_frame, borderwidth=0, highlightthickness=0, height=15 * 25)
-        self.game_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        # 2. Create Scrollbar and link it to the Canvas
-        scrollbar = tk.Scrollbar(listbox_frame, orient=tk.VERTICAL, command=self.game_canvas.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.game_canvas.config(yscrollcommand=scrollbar.set)
-
-        # 3. Create Inner Frame (the scrollable content container)
-        self.canvas_inner_frame = tk.Frame(self.game_canvas)
+        self.game_list = VirtualGameList(
+            self, game_header_views(self.all_games), self._row_text,
+            on_activate=self.select_game_and_close,
+            selected_index=self.current_game_index if 0 <= self.current_game_index < len(self.all_games) else None)
+        self.game_list.pack(fill='both', expand=True, padx=10, pady=5)
 
-        # 4. Attach the Inner Frame to the Canvas
-        self.canvas_window_id = self.game_canvas.create_window(
-            (0, 0),
-            window=self.canvas_inner_frame,
-            anchor="nw",
-            tags="inner_frame"
-        )
+        # Buttons at the bottom
+        button_frame = tk.Frame(self, pady=10)
+        button_frame.pack()
 
-        # --- Bindings and Populating ---
-        self._populate_and_bind_content()
-        self._setup_global_bindings()
+        tk.Button(button_frame, text="Select Game", command=self.select_game_and_close, width=15,
+                  bg='#d9ffc7').pack(side=tk.LEFT, padx=10)
+        tk.Button(button_frame, text="Cancel", command=self.destroy, width=15, bg='#ffe0e0').pack(side=tk.LEFT,
+                                                                                                  padx=10)
         self._center_and_focus(master)
-
-    # --- HELPER FUNCTIONS (Now class methods) ---
-
-    def update_scroll_region(self, event=None):
-        """Adjusts the inner frame width and the Canvas scrollregion."""
-        self.game_canvas.update_idletasks()
-        self.game_canvas.itemconfig(self.canvas_window_id, width=self.game_canvas.winfo_width())
-        bbox = self.game_canvas.bbox("all")
-        if bbox:
-            canvas_height = self.game_canvas.winfo_height()
-            if bbox[3] > canvas_height:
-                self.game_canvas.config(scrollregion=bbox)
-            else:
-                # Content is smaller than viewport: disable scrolling
-                self.game_canvas.config(scrollregion=(0, 0, bbox[2], canvas_height))
-
-    def start_scroll(self, event):
-        """Registers the start position (absolute Y) of the drag."""
-        self.drag_data["_start_y"] = event.y_root
-        self.drag_data["_is_dragging"] = False
-        return "break"
-
-    def do_scroll(self, event):
-        """Calculates the delta and scrolls the Canvas content."""
-        MIN_DRAG_DISTANCE = 5
-        if not self.drag_data["_is_dragging"]:
-            if abs(event.y_root - self.drag_data["_start_y"]) > MIN_DRAG_DISTANCE:
-                self.drag_data["_is_dragging"] = True
-                self.drag_data["_last_y"] = event.y_root
-            else:
-                return
-
-        delta = self.drag_data["_last_y"] - event.y_root
-        self.game_canvas.yview_scroll(int(delta / 4), "units")
-        self.drag_data["_last_y"] = event.y_root
-
-        # Clear visual selection during scrolling
-        if self.drag_data["selected_label"]:
-            self.drag_data["selected_label"].config(background='white', foreground='black')
-            self.drag_data["selected_label"] = None
-
-        return "break"
-
-    def on_release_or_select(self, event):
-        """Handles item selection if it was a click (not a scroll)."""
-        if self.drag_data["_is_dragging"]:
-            self.drag_data["_is_dragging"] = False
-            return
-
-        # Clear previous visual selections
-        for lbl in self.game_labels:
-            lbl.config(background='white', foreground='black')
-        self.drag_data["selected_label"] = None
-
-        widget_clicked = event.widget
-        if hasattr(widget_clicked, 'game_index'):
-            # Select the label visually
-            widget_clicked.config(background='#0078D7', foreground='white')
-            self.drag_data["selected_label"] = widget_clicked
-
-        self.drag_data["_is_dragging"] = False
+        # Scroll to the current game
+        self.game_list.scroll_to(self.current_game_index)
 
     def select_game_and_close(self, selected_index=None):
         """Handles the selection and closes the dialog."""
 
         if selected_index is not None:
             final_index = selected_index
-        elif self.drag_data["selected_label"]:
-            final_index = self.drag_data["selected_label"].game_index
+        elif self.game_list.selected_index is not None:
+            final_index = self.game_list.selected_index
         else:
             messagebox.showwarning("Selection Error", "Please select a game from the list.", parent=self.master)
             return
@@ -1939,71 +2482,6 @@ class GameChooserDialog(tk.Toplevel):
 
         self.destroy()  # Close the dialog
 
-    # --- POPULATE AND BIND METHODS ---
-
-    def _populate_and_bind_content(self):
-        """Fills the list with labels and binds local events."""
-
-        for i, game in enumerate(self.all_games):
-            white = game.headers.get("White", "???")
-            black = game.headers.get("Black", "???")
-            result = game.headers.get("Result", "*-*")
-            event_name = game.headers.get("Event", "Untitled")
-
-            list_item = f"Game {i + 1}: {white} - {black} ({result}) | {event_name}"
-
-            lbl = ttk.Label(
-                self.canvas_inner_frame,
-                text=list_item,
-                font=('Consolas', 10),
-                anchor='w',
-                padding=(5, 2),
-                background='white',
-                cursor='hand2'
-            )
-            lbl.pack(fill=tk.X, pady=0)
-            lbl.game_index = i
-
-            # Bind touch events
-            lbl.bind("<ButtonPress-1>", self.start_scroll)
-            lbl.bind("<B1-Motion>", self.do_scroll)
-            lbl.bind("<ButtonRelease-1>", self.on_release_or_select)
-            # Bind double-click to select action
-            lbl.bind('<Double-Button-1>', lambda e, index=i: self.select_game_and_close(index))
-
-            self.game_labels.append(lbl)
-
-        # Pre-selection and scrolling
-        if 0 <= self.current_game_index < len(self.game_labels):
-            pre_selected_label = self.game_labels[self.current_game_index]
-            pre_selected_label.config(background='#0078D7', foreground='white')
-            self.drag_data["selected_label"] = pre_selected_label
-
-            self.update_idletasks()
-            # Scroll to the selected game's position
-            self.game_canvas.yview_moveto(pre_selected_label.winfo_y() / self.game_canvas.winfo_reqheight())
-
-        # Buttons at the bottom
-        button_frame = tk.Frame(self, pady=10)
-        button_frame.pack()
-
-        tk.Button(button_frame, text="Select Game", command=self.select_game_and_close, width=15,
-                  bg='#d9ffc7').pack(side=tk.LEFT, padx=10)
-        tk.Button(button_frame, text="Cancel", command=self.destroy, width=15, bg='#ffe0e0').pack(side=tk.LEFT,
-                                                                                                  padx=10)
-
-    def _setup_global_bindings(self):
-        """Binds events to the canvas and the window."""
-        self.game_canvas.bind('<Configure>', self.update_scroll_region)
-        self.game_canvas.bind("<ButtonPress-1>", self.start_scroll)
-        self.game_canvas.bind("<B1-Motion>", self.do_scroll)
-        self.game_canvas.bind("<ButtonRelease-1>", self.on_release_or_select)
-        # Bind mouse wheel for desktop users
-        self.game_canvas.bind_all('<MouseWheel>',
-                                  lambda e: self.game_canvas.yview_scroll(int(-1 * (e.delta / 120)), "units"))
-
-        self.update_scroll_region()  # Initial call
-
     def _center_and_focus(self, master):
         """Centers the dialog on the master window."""
         self.update_idletasks()
@@ -2019,15 +2497,19 @@ COMPACT_HEIGHT_THRESHOLD = 1000
 
 
 class AnalysisProgressUI:
-    def __init__(self, parent, title="Database Analysis"):
+    def __init__(self, parent, title="Database Analysis", modal=True, cancel_text="Stop All",
+                 confirm_text="Stop the entire analysis process?"):
         self.window = tk.Toplevel(parent)
         self.window.title(title)
         self.window.geometry("450x250")
         self.window.resizable(False, False)
+        self.modal = modal
+        self.confirm_text = confirm_text
 
         # Ensure the window stays on top and centers relative to parent
         self.window.transient(parent)
-        self.window.grab_set()
+        if modal:
+            self.window.grab_set()
 
         # Styling based on your app's theme could be added here
         self.window.configure(bg="#f8f9fa")
@@ -2051,7 +2533,7 @@ class AnalysisProgressUI:
 
         # Cancel flag and button
         self.is_cancelled = False
-        self.cancel_button = tk.Button(self.window, text="Stop All",
+        self.cancel_button = tk.Button(self.window, text=cancel_text,
                                        command=self.request_cancel,
                                        bg="#e74c3c", fg="white", font=("Segoe UI", 9, "bold"),
                                        activebackground="#c0392b", padx=20)
@@ -2059,7 +2541,7 @@ class AnalysisProgressUI:
 
     def request_cancel(self):
         """ Callback for the stop button. """
-        if messagebox.askyesno("Confirm", "Stop the entire analysis process?"):
+        if self.confirm_text is None or messagebox.askyesno("Confirm", self.confirm_text):
             self.is_cancelled = True
             self.status_label.config(text="Stopping... please wait.")
 
@@ -2083,13 +2565,792 @@ class AnalysisProgressUI:
 
     def destroy(self):
         """ Safely close the window. """
-        self.window.grab_release()
+        if self.modal:
+            self.window.grab_release()
         self.window.destroy()
 
+
+class PGNLoadWorker:
+    """
+    Parses all games of a PGN file (or PGN string) on a background thread.
+    The thread never touches Tk: parsed games go into a queue.Queue that is polled
+    with root.after(), so on_games/on_progress/on_done always run on the main thread.
+    on_games(list_of_games) is called with the games parsed since the previous poll,
+    on_progress(games_read, position, total) after every poll and
+    on_done(status, error) once, with status "done", "cancelled" or "error".
+    With headers_only=True the games are delivered as GameStubs (see LazyGameList).
+    For files, spans[game] = (offset, length) holds the byte range each game was read from,
+    so an unchanged game can be copied as-is when the file is saved (see ChessAnnotatorApp.write_pgn_games).
+    """
+    POLL_MS = 50
+    MAX_GAMES_PER_POLL = 500  # keeps a single poll short, so the UI stays responsive
+
+    def __init__(self, root, filepath=None, pgn_content=None, on_games=None, on_progress=None, on_done=None,
+                 headers_only=False):
+        self.root = root
+        self.filepath = filepath
+        self.headers_only = headers_only  # deliver GameStubs instead of parsed games (database mode)
+        self.pgn_content = pgn_content
+        self.on_games = on_games
+        self.on_progress = on_progress
+        self.on_done = on_done
+
+        self.queue = queue.Queue()
+        self.is_cancelled = False
+        self.is_finished = False
+        self.games_read = 0
+        self.position = 0
+        self.spans = {}
+        if filepath:
+            self.total = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+        else:
+            self.total = len(pgn_content or "")
+
+    def start(self):
+        load_thread = threading.Thread(target=self._run)
+        load_thread.daemon = True
+        load_thread.start()
+        self.root.after(self.POLL_MS, self._poll)
+
+    def cancel(self):
+        """ Stops the parser after the game it is currently reading. """
+        self.is_cancelled = True
+
+    def abandon(self):
+        """
+        Stops the parser for good when a new load replaces this one: the callbacks are dropped,
+        so games that are still queued (and the final on_done) never reach the app.
+        """
+        self.on_games = self.on_progress = self.on_done = None
+        self.cancel()
+
+    def _run(self):
+        """ Worker thread: read games until EOF or cancel. """
+        try:
+            if self.filepath:
+                self._read_file_games()
+            else:
+                stream = StringIO(self.pgn_content or "")
+                while not self.is_cancelled:
+                    game = chess.pgn.read_game(stream)
+                    if game is None:
+                        break
+                    self.queue.put(("game", (game, None), stream.tell()))
+            self.queue.put(("done", None, self.total))
+        except Exception as e:
+            traceback.print_exc()
+            self.queue.put(("error", e, None))
+
+    def _read_file_games(self):
+        r"""
+        Splits the file into game spans first (PGNFile.spans) and parses each of them,
+        which gives the exact byte span of every game.
+        The games must be the ones chess.pgn.read_game finds in the whole file:
+
+        >>> pgn = '\ufeff[Event "a"]\n[Site "b"]\n\n1. e4 ; {x\n*\n\n[Event "c"]\n\n1. d4 *\n'
+        >>> with tempfile.TemporaryDirectory() as folder:
+        ...     path = os.path.join(folder, "bom.pgn")
+        ...     with open(path, 'w', encoding='utf-8') as f:
+        ...         _ = f.write(pgn)
+        ...     with PGNFile(path) as pgn_file:
+        ...         span_games = [pgn_file.read_game(*span) for span in pgn_file.spans()]
+        >>> stream = StringIO(pgn)
+        >>> games = list(iter(lambda: chess.pgn.read_game(stream), None))
+        >>> [game.headers["Event"] for game in span_games] == [game.headers["Event"] for game in games]
+        True
+        >>> len(span_games)
+        2
+        """
+        with PGNFile(self.filepath) as pgn:
+            for offset, length in pgn.spans():
+                if self.is_cancelled:
+                    break
+                position = offset + length
+                if self.headers_only:
+                    stub = pgn.stub(offset, length)
+                    if stub is not None:
+                        self.queue.put(("game", (stub, None), position))
+                    continue
+                stream = StringIO(pgn.text(offset, length))
+                games = []
+                while game := chess.pgn.read_game(stream):
+                    games.append(game)
+                # A span is only usable if it holds exactly one game
+                span = (offset, length) if len(games) == 1 else None
+                for game in games:
+                    self.queue.put(("game", (game, span), position))
+
+    def _poll(self):
+        """ Main thread: hand the parsed games to the app in batches. """
+        games = []
+        finished = None
+        try:
+            while len(games) < self.MAX_GAMES_PER_POLL:
+                kind, payload, position = self.queue.get_nowait()
+                if kind == "game":
+                    game, span = payload
+                    games.append(game)
+                    if span is not None:
+                        self.spans[game] = span
+                    self.position = position
+                else:
+                    finished = (kind, payload)
+                    if position is not None:
+                        self.position = position
+                    break
+        except queue.Empty:
+            pass
+
+        try:
+            if games:
+                self.games_read += len(games)
+                if self.on_games:
+                    self.on_games(games)
+            if self.on_progress:
+                self.on_progress(self.games_read, self.position, self.total)
+            if finished:
+                self.is_finished = True
+                status = finished[0]
+                if status == "done" and self.is_cancelled:
+                    status = "cancelled"
+                if self.on_done:
+                    self.on_done(status, finished[1])
+                return
+            self.root.after(self.POLL_MS, self._poll)
+        except tk.TclError:
+            # The window was closed while loading
+            self.is_cancelled = True
+
+
+class EngineSuggestionWorker:
+    """
+    Runs the multi-PV search of the engine suggestion dialog on a background thread with its
+    own event loop (engine.analysis), so the Tk main loop keeps running while the engine thinks.
+    Like PGNLoadWorker the results go through a queue that is polled with root.after:
+    on_update(lines, depth) is called on the Tk thread every time all lines reached a new depth,
+    on_done(error) once when the search ends (error is None if it ended normally or was stopped).
+    stop() ends the search at once.
+    """
+    POLL_MS = 100
+
+    def __init__(self, root, board, num_moves, depth, open_engine, on_update=None, on_done=None):
+        """ open_engine: coroutine function that starts and configures the engine. """
+        self.root = root
+        self.board = board.copy()
+        # There can't be more lines than legal moves
+        self.num_moves = max(1, min(num_moves, self.board.legal_moves.count()))
+        self.depth = depth
+        self.open_engine = open_engine
+        self.on_update = on_update
+        self.on_done = on_done
+
+        self.queue = queue.Queue()
+        self.is_stopped = False
+        self.loop = None
+        self.analysis = None
+
+    def start(self):
+        search_thread = threading.Thread(target=self._run)
+        search_thread.daemon = True
+        search_thread.start()
+        self.root.after(self.POLL_MS, self._poll)
+
+    def stop(self):
+        """ Stops the engine search; callable from the Tk thread. """
+        self.is_stopped = True
+        loop, analysis = self.loop, self.analysis
+        if loop is not None and analysis is not None:
+            try:
+                loop.call_soon_threadsafe(analysis.stop)
+            except RuntimeError:
+                pass  # the loop has already finished
+
+    def _run(self):
+        """ Worker thread: the event loop lives as long as the search. """
+        try:
+            asyncio.run(self._search())
+            self.queue.put(("done", None))
+        except Exception as e:
+            traceback.print_exc()
+            self.queue.put(("done", e))
+
+    async def _search(self):
+        self.loop = asyncio.get_running_loop()
+        engine = await self.open_engine()
+        try:
+            lines = {}  # multipv number -> latest complete info of that line
+            reported_depth = 0
+            with await engine.analysis(self.board, chess.engine.Limit(depth=self.depth),
+                                       multipv=self.num_moves) as analysis:
+                self.analysis = analysis
+                if self.is_stopped:
+                    analysis.stop()
+                async for info in analysis:
+                    if self.is_stopped:
+                        break
+                    # Bounds are only half results; wait for the exact score of the line
+                    if ("pv" not in info or "score" not in info or "depth" not in info
+                            or info.get("lowerbound") or info.get("upperbound")):
+                        continue
+                    lines[info.get("multipv", 1)] = info
+                    depth = min(entry["depth"] for entry in lines.values())
+                    if len(lines) == self.num_moves and depth > reported_depth:
+                        reported_depth = depth
+                        self.queue.put(("update", ([lines[k] for k in sorted(lines)], depth)))
+        finally:
+            self.analysis = None
+            await engine.quit()
+
+    def _poll(self):
+        """ Main thread: only the newest update matters, older ones are skipped. """
+        update, finished, error = None, False, None
+        try:
+            while True:
+                kind, payload = self.queue.get_nowait()
+                if kind == "update":
+                    update = payload
+                else:
+                    finished, error = True, payload
+                    break
+        except queue.Empty:
+            pass
+
+        try:
+            if update is not None and self.on_update:
+                self.on_update(*update)
+            if finished:
+                if self.on_done:
+                    self.on_done(error)
+                return
+            self.root.after(self.POLL_MS, self._poll)
+        except tk.TclError:
+            # The dialog was closed
+            self.stop()
+
+
+UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def _ends_in_brace_comment(line, in_comment):
+    """
+    True if a {comment} is still open at the end of a movetext line.
+    Comments don't nest, the first '}' closes one; braces after a ';' (rest-of-line comment)
+    and on '%' escape lines are text.
+    """
+    if not in_comment and line.startswith(b"%"):
+        return False
+    position = 0
+    while True:
+        if in_comment:
+            end = line.find(b"}", position)
+            if end < 0:
+                return True
+            in_comment, position = False, end + 1
+        else:
+            brace = line.find(b"{", position)
+            semicolon = line.find(b";", position)
+            if brace < 0 or 0 <= semicolon < brace:
+                return False
+            in_comment, position = True, brace + 1
+
+
+def _iter_game_lines(lines):
+    r"""
+    Groups byte lines into games (lists of lines); the game boundaries of all PGN readers.
+    A game starts at a tag line ('[...') that follows movetext, or at a second [Event tag
+    for games without moves. '[' inside a {comment} spanning several lines is not a boundary.
+    The empty lines after a game belong to that game. A UTF-8 BOM before the first tag is skipped.
+
+    >>> pgn = b'\xef\xbb\xbf[Event "a"]\n[Site "b"]\n\n1. e4 e5 *\n\n[Event "c"]\n\n1. d4 *\n'
+    >>> [len(game) for game in _iter_game_lines(pgn.splitlines(keepends=True))]
+    [5, 3]
+    >>> pgn = b'[Event "a"]\n\n1. e4 ; a {brace\n*\n\n[Event "b"]\n\n1. d4 *\n\n[Event "c"]\n\n1. c4 *\n'
+    >>> [len(game) for game in _iter_game_lines(pgn.splitlines(keepends=True))]
+    [5, 4, 3]
+    """
+    game_lines = []
+    in_movetext = False
+    seen_event = False
+    in_comment = False
+    for line in lines:
+        tag_line = line[len(UTF8_BOM):] if line.startswith(UTF8_BOM) else line
+        if not in_comment and tag_line.startswith(b"["):
+            is_event = tag_line.startswith(b"[Event ")
+            if game_lines and (in_movetext or (is_event and seen_event)):
+                yield game_lines
+                game_lines = []
+                in_movetext = False
+                seen_event = False
+            seen_event = seen_event or is_event
+        elif line.strip():
+            in_movetext = True
+            if in_comment or b"{" in line:
+                in_comment = _ends_in_brace_comment(line, in_comment)
+        game_lines.append(line)
+    if any(line.strip() for line in game_lines):
+        yield game_lines
+
+
+def parse_split_size(text):
+    """
+    Parses the answer of the split dialog: '20' -> (20, None) games per part,
+    '10MB' / '500 kb' -> (None, bytes) per part. Returns None if it can't be read.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*(kb|mb|gb)?\s*", (text or "").lower())
+    if not match or int(match.group(1)) < 1:
+        return None
+    number, unit = int(match.group(1)), match.group(2)
+    if unit is None:
+        return number, None
+    return None, number * {"kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3}[unit]
+
+
+class GameStub:
+    """
+    A game of a large database that has not been parsed: only its byte span in the file
+    and the header tags needed for lists, sorting and merging.
+    Like chess.pgn.Game it has a .headers attribute, so header-only code works on both.
+    """
+    __slots__ = ("offset", "length", "headers")
+    STUB_TAGS = ("Event", "Site", "Date", "Round", "Board", "White", "Black", "Result",
+                 "WhiteElo", "BlackElo", "ECO", "Opening")
+    TAG_PATTERN = re.compile(rb'^\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]', re.MULTILINE)
+
+    def __init__(self, offset, length, headers):
+        self.offset = offset
+        self.length = length
+        self.headers = headers
+
+    @classmethod
+    def from_raw(cls, offset, raw_game, length=None):
+        """
+        Reads the tags with a regex, which is much faster than chess.pgn.read_headers.
+        raw_game may be just the tag lines of the game if its length is given.
+        """
+        headers = {}
+        for match in cls.TAG_PATTERN.finditer(raw_game):
+            tag = match.group(1).decode('ascii', errors='replace')
+            if tag in cls.STUB_TAGS:
+                headers[tag] = match.group(2).decode('utf-8', errors='replace').replace('\\"', '"')
+        if not headers and not raw_game.lstrip().startswith(b"["):
+            return None  # no game, just text between games
+        return cls(offset, len(raw_game) if length is None else length, headers)
+
+
+class LazyGameList:
+    """
+    Replaces the list self.all_games for large files (database mode).
+    Every slot holds a GameStub or a parsed chess.pgn.Game. Indexing parses a stub on demand,
+    the parsed games are kept in a small LRU. Games that are edited are pinned (the Game
+    replaces the stub in its slot) so the changes stay in memory until they are saved.
+    """
+    CACHE_SIZE = 32
+
+    def __init__(self, filepath, slots=None):
+        self.filepath = filepath
+        self.slots = slots if slots is not None else []
+        self.cache = OrderedDict()  # stub -> parsed game (LRU)
+        self.stub_of = {}           # parsed game -> (stub, slot index it was read from), for pin()
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __getitem__(self, index):
+        slot = self.slots[index]
+        if isinstance(slot, GameStub):
+            return self.materialize(slot, index)
+        return slot
+
+    def __setitem__(self, index, game):
+        self.slots[index] = game
+
+    def __iter__(self):
+        # Parses every game (through the LRU): only for operations that really need the moves
+        for index in range(len(self.slots)):
+            yield self[index]
+
+    def append(self, game):
+        self.slots.append(game)
+
+    def extend(self, games):
+        self.slots.extend(games)
+
+    def pop(self, index):
+        slot = self.slots.pop(index)
+        return self.materialize(slot) if isinstance(slot, GameStub) else slot
+
+    def sort(self, key=None, reverse=False):
+        """ Sorts on the slots: key gets a stub or a game, both with .headers. """
+        self.slots.sort(key=key, reverse=reverse)
+
+    def reorder(self, permutation):
+        """ Puts the slots in the order of permutation (a list of old indices). """
+        self.slots = [self.slots[i] for i in permutation]
+
+    def compress(self, keep_mask):
+        """ Keeps only the slots whose entry in keep_mask is set, in one pass. """
+        self.slots = list(itertools.compress(self.slots, keep_mask))
+
+    def materialize(self, stub, index=None):
+        """
+        Returns the parsed game for a stub, parsing it from the file if it is not in the LRU.
+        index (the slot of the stub, if known) lets pin() find the slot without a search.
+        """
+        game = self.cache.get(stub)
+        if game is not None:
+            self.cache.move_to_end(stub)
+            if index is not None:
+                self.stub_of[game] = (stub, index)
+            return game
+        with PGNFile(self.filepath) as pgn:
+            game = pgn.read_game(stub.offset, stub.length)
+        if game is None:
+            raise ValueError(f"No game found at offset {stub.offset} of {self.filepath}")
+        self.cache[stub] = game
+        self.stub_of[game] = (stub, index)
+        if len(self.cache) > self.CACHE_SIZE:
+            old_stub, old_game = self.cache.popitem(last=False)
+            self.stub_of.pop(old_game, None)
+        return game
+
+    def pin(self, game):
+        """ Keeps a parsed game in memory: it replaces its stub in the list. """
+        stub, index = self.stub_of.pop(game, (None, None))
+        if stub is None:
+            return
+        self.cache.pop(stub, None)
+        if index is None or index >= len(self.slots) or self.slots[index] is not stub:
+            # Read without its slot, or the list was sorted or filtered since: search it
+            try:
+                index = self.slots.index(stub)
+            except ValueError:
+                return  # the game was removed from the list in the meantime
+        self.slots[index] = game
+
+    def unpin(self, spans, keep=None):
+        """
+        After a save: every pinned game (except keep) becomes a stub again,
+        spans maps game/stub -> (offset, length) in the file that was just written.
+        """
+        for index, slot in enumerate(self.slots):
+            offset, length = spans[slot]
+            if isinstance(slot, GameStub):
+                slot.offset, slot.length = offset, length
+            elif slot is not keep:
+                headers = {tag: slot.headers[tag] for tag in GameStub.STUB_TAGS if tag in slot.headers}
+                self.slots[index] = GameStub(offset, length, headers)
+        self.cache.clear()
+        self.stub_of.clear()
+
+
+class PGNIndex:
+    """
+    Sidecar index '<file>.pgni' next to a PGN file: every span the scan of PGNFile finds
+    (offset, length, fingerprint of its tag lines), so spans() gives the same result with or
+    without it, plus the numbers of the spans that hold a game. Game k is the k-th GameStub
+    of the file, the numbering of database mode and the browser; a list of parsed games
+    (chess.pgn.read_game on every span) can number them differently, so it isn't used there.
+    It is only used while size and mtime of the PGN file match the ones stored in it.
+    PGNFile writes it on the first full scan of a file; saving in the editor writes a new one.
+
+    Layout: HEADER, then offsets and lengths (int64) and fingerprints (crc32, uint32) of the
+    spans, then the span numbers of the games (int64), so loading is four array reads.
+    """
+    SUFFIX = ".pgni"
+    MAGIC = b"PGNI"
+    VERSION = 3
+    HEADER = struct.Struct("<4sIqqqq")  # magic, version, size, mtime_ns, span count, game count
+    # Tag lines (and the empty lines before them) at the start of a game
+    TAG_BLOCK = re.compile(rb'(?:[ \t\r\n]*\[[^\n]*\n?)*')
+
+    _loaded = {}  # path -> PGNIndex, so a reader that opens the file per game doesn't reload it
+
+    def __init__(self, filepath, size, mtime_ns):
+        self.filepath = os.path.abspath(filepath)
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.offsets = array.array('q')
+        self.lengths = array.array('q')
+        self.fingerprints = array.array('I')
+        self.games = array.array('q')  # game k -> its span number
+
+    def __len__(self):
+        """ The number of games. """
+        return len(self.games)
+
+    def span(self, n):
+        """ (offset, length) of span n (a game or text between games). """
+        return self.offsets[n], self.lengths[n]
+
+    def game_span(self, k):
+        """ (offset, length) of game k. """
+        return self.span(self.games[k])
+
+    def find(self, offset):
+        """ Number of the first span that starts at or after offset. """
+        return bisect.bisect_left(self.offsets, offset)
+
+    def add(self, offset, length, header_bytes):
+        """ Adds the next span; it is a game if it has tag lines (like GameStub.from_raw). """
+        if header_bytes.strip():
+            self.games.append(len(self.offsets))
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.fingerprints.append(self.fingerprint(header_bytes))
+
+    @staticmethod
+    def fingerprint(header_bytes):
+        return zlib.crc32(header_bytes.strip())
+
+    @classmethod
+    def header_bytes(cls, raw_game):
+        """ The tag lines of a game (bytes), the part the fingerprint is taken from. """
+        return raw_game[:cls.TAG_BLOCK.match(raw_game).end()]
+
+    @classmethod
+    def path_for(cls, filepath):
+        return str(filepath) + cls.SUFFIX
+
+    @staticmethod
+    def _stat(filepath):
+        stat = os.stat(filepath)
+        return stat.st_size, stat.st_mtime_ns
+
+    def is_valid(self):
+        try:
+            return self._stat(self.filepath) == (self.size, self.mtime_ns)
+        except OSError:
+            return False
+
+    @classmethod
+    def load(cls, filepath):
+        """ The index of filepath, or None if there is none or it is out of date. """
+        filepath = os.path.abspath(filepath)
+        index = cls._loaded.get(filepath)
+        if index is not None and index.is_valid():
+            return index
+        cls._loaded.pop(filepath, None)
+        try:
+            size, mtime_ns = cls._stat(filepath)
+            with open(cls.path_for(filepath), 'rb') as f:
+                magic, version, stored_size, stored_mtime, count, game_count = cls.HEADER.unpack(
+                    f.read(cls.HEADER.size))
+                if (magic, version, stored_size, stored_mtime) != (cls.MAGIC, cls.VERSION, size, mtime_ns):
+                    return None
+                index = cls(filepath, size, mtime_ns)
+                index.offsets.fromfile(f, count)
+                index.lengths.fromfile(f, count)
+                index.fingerprints.fromfile(f, count)
+                index.games.fromfile(f, game_count)
+        except (OSError, EOFError, struct.error):
+            return None
+        cls._loaded[filepath] = index
+        return index
+
+    def save(self):
+        """ Writes the sidecar file; an index that can't be written is only a missed speedup. """
+        try:
+            with open(self.path_for(self.filepath), 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.size, self.mtime_ns,
+                                         len(self.offsets), len(self.games)))
+                self.offsets.tofile(f)
+                self.lengths.tofile(f)
+                self.fingerprints.tofile(f)
+                self.games.tofile(f)
+            self._loaded[self.filepath] = self
+        except OSError as e:
+            print(f"Could not store the game index: {e}")
+
+
+class PGNFile:
+    """
+    Shared read access to a PGN file for all readers of the suite (editor, viewer, browser).
+    The file is memory-mapped; games are found as byte spans with the boundaries of
+    _iter_game_lines and decoded one game at a time (utf-8, errors='replace'), so no reader
+    needs the whole file as a string and all of them read a game the same way.
+    With a valid sidecar index (PGNIndex) the spans come from the index instead of a scan.
+
+        with PGNFile(path) as pgn:
+            for stub in pgn.stubs():            # header tags only
+                game = pgn.read_game(stub.offset, stub.length)
+    """
+    ENCODING = "utf-8"
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        stat = os.fstat(self._file.fileno())
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        # An empty file can't be mapped
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _lines(self, start):
+        """ The lines from start on, as byte slices of the map. """
+        data, position = self.data, start
+        while position < self.size:
+            end = data.find(b"\n", position)
+            end = self.size if end < 0 else end + 1
+            yield data[position:end]
+            position = end
+
+    @property
+    def index(self):
+        """ The sidecar index if it matches this file, else None. """
+        index = PGNIndex.load(self.filepath)
+        if index is not None and (index.size, index.mtime_ns) == (self.size, self.mtime_ns):
+            return index
+        return None
+
+    def spans(self, start=0):
+        """
+        Yields (offset, length) of every game from byte offset start on.
+        Without an index the file is scanned; a complete scan from the start writes the index.
+        """
+        index = self.index
+        if index is not None:
+            for n in range(index.find(start), len(index.offsets)):
+                yield index.span(n)
+            return
+        new_index = PGNIndex(self.filepath, self.size, self.mtime_ns) if start == 0 else None
+        if start == 0 and self.data[:len(UTF8_BOM)] == UTF8_BOM:
+            # The first game starts after the BOM, so its tag lines are read like all others
+            start = len(UTF8_BOM)
+        position = start
+        for game_lines in _iter_game_lines(self._lines(start)):
+            length = sum(len(line) for line in game_lines)
+            if new_index is not None:
+                new_index.add(position, length, self.header_bytes(position, length))
+            yield position, length
+            position += length
+        if new_index is not None:
+            new_index.save()
+
+    def raw(self, offset, length):
+        return self.data[offset:offset + length]
+
+    def header_bytes(self, offset, length):
+        """ Only the tag lines of a game, without touching its moves. """
+        end = PGNIndex.TAG_BLOCK.match(self.data, offset, offset + length).end()
+        return self.data[offset:end]
+
+    def text(self, offset, length):
+        """ The game text, decoded the same way by every reader. """
+        return self.raw(offset, length).decode(self.ENCODING, errors='replace')
+
+    def read_game(self, offset, length):
+        """ Parses one game; None if the span holds no game. """
+        return chess.pgn.read_game(StringIO(self.text(offset, length)))
+
+    def stub(self, offset, length):
+        """ GameStub of the game in a span, from its tag lines only (None if it holds no game). """
+        return GameStub.from_raw(offset, self.header_bytes(offset, length), length)
+
+    def stubs(self, start=0):
+        """ Yields a GameStub (span and header tags, no parsing) for every game from start on. """
+        for offset, length in self.spans(start):
+            stub = self.stub(offset, length)
+            if stub is not None:
+                yield stub
+
+    def game_at(self, offset):
+        """
+        The game that starts at (or is the first after) a byte offset, e.g. an offset from
+        the database browser index: (stub, game), or (None, None) if there is none.
+        """
+        for stub in self.stubs(offset):
+            return stub, self.read_game(stub.offset, stub.length)
+        return None, None
+
+    def game_number(self, k):
+        """
+        Game k of the file through the index, without scanning: (stub, game), or (None, None)
+        if there is no valid index or its fingerprint doesn't match the game (then the index is dropped).
+        """
+        index = self.index
+        if index is None or not 0 <= k < len(index):
+            return None, None
+        offset, length = index.game_span(k)
+        header = self.header_bytes(offset, length)
+        if PGNIndex.fingerprint(header) != index.fingerprints[index.games[k]]:
+            print(f"The game index of {self.filepath} is out of date, it will be rebuilt.")
+            PGNIndex._loaded.pop(index.filepath, None)
+            try:
+                os.remove(PGNIndex.path_for(index.filepath))
+            except OSError:
+                pass
+            return None, None
+        return GameStub.from_raw(offset, header, length), self.read_game(offset, length)
+
+
+def read_game_at(filepath, offset):
+    """ Parses only the game at (or the first after) a byte offset of a file, see PGNFile.game_at. """
+    with PGNFile(filepath) as pgn:
+        return pgn.game_at(offset)
+
+
+def game_header_views(games):
+    """
+    Objects with a .headers attribute for every game in the list, in order,
+    without parsing the games of a LazyGameList.
+    """
+    return games.slots if isinstance(games, LazyGameList) else games
+
+
+# bytes.translate table that turns a 0/1 mask into its inverse
+INVERT_MASK = bytes([1, 0]) + bytes(254)
+
+# Sort orders of the Sort menu: the header tags, most significant first
+SORT_ORDERS = {
+    "date": ("Date",),
+    "white": ("White",),
+    "black": ("Black",),
+    "site": ("Site", "Date"),
+    "event": ("Event", "Date"),
+    "round": ("Event", "Round", "Board"),
+}
+
+
+def header_sort_key(tag, value):
+    """
+    Sortable key for one header value.
+    Date: (year, month, day) with 0 for '??', so '2023.??.??' comes before '2023.01.05'.
+    Round/Board: the numbers in it, so round 10 comes after round 9 and '3.2' after '3.1'.
+    Everything else: the lower-case text.
+    """
+    value = (value or "").strip()
+    if tag == "Date":
+        parts = (value.split(".") + ["", "", ""])[:3]
+        return tuple(int(part) if part.isdigit() else 0 for part in parts)
+    if tag in ("Round", "Board"):
+        return tuple(int(number) for number in re.findall(r"\d+", value))
+    return value.lower()
+
+
+def sort_permutation(header_views, tags):
+    """
+    Decorate-sort-undecorate: builds the key table once from the headers and returns the
+    permutation (list of old indices in the new order). Stable, so equal keys keep their order.
+    """
+    keys = [tuple(header_sort_key(tag, view.headers.get(tag, "")) for tag in tags) for view in header_views]
+    return sorted(range(len(keys)), key=keys.__getitem__)
+
+
 class ChessAnnotatorApp:
     def __init__(self, master, pgn_game, engine_name, hide_file_load = False, image_manager = None, square_size = 75,
                  current_game_index = -1, piece_set = "", board="Standard", swap_colours = False, call_back = None,
-                 engine_depth=17, config={}):
+                 engine_depth=17, config={}, game_offset=None):
         self.last_filepath = None
         print("parameters:",pgn_game, engine_name, hide_file_load, image_manager, square_size, current_game_index, piece_set, board)
         self.config = config  # Keep a reference to the config
@@ -2116,6 +3377,19 @@ class ChessAnnotatorApp:
 
         # --- Data Initialization ---
         self.all_games = []      # List of all chess.pgn.Game objects in the PGN file
+        self.pgn_loader = None   # PGNLoadWorker while a file is parsed in the background
+        self.is_loading = False  # True until the loader has delivered all games
+        self.partial_load = False  # True if loading was stopped: all_games is only a part of the file
+        self.load_progress = None
+        self.load_shown = False
+        # Incremental save: unchanged games are copied from the file they were read from
+        self.game_spans = {}       # game -> (offset, length) in span_source
+        self.span_source = None    # (path, size, mtime) of the file the spans refer to
+        self.dirty_games = set()   # games that were opened or changed since they were read/saved
+        # Games opened by byte offset (open_game_at, _open_indexed_game): offset -> game,
+        # until the loader has found their index
+        self.pending_games = {}
+        self.pgn_index = None      # sidecar index (.pgni) of the file that is loading, if it was up to date
         try:
             self.current_game_index = int(current_game_index) # Index of the current game in all_games
         except:
@@ -2129,6 +3403,8 @@ class ChessAnnotatorApp:
         self.stored_moves = []
         self.top_5_major_set = {}
         self.top_5_minor_set = {}
+        self._update_state_job = None  # pending after_idle render pass (see schedule_update_state)
+        self._ui_inputs = {}           # part of the UI -> the inputs it was last drawn with
 
         # Store button references for robust access
         self.insert_edit_comment_button = None
@@ -2182,13 +3458,12 @@ class ChessAnnotatorApp:
         self.set_screen_position(master)
         self.set_filepath(pgn_game)
 
-        if not(pgn_game is None or len(pgn_game) == 0):
-            try:
-                with open(pgn_game, 'r', encoding='utf-8') as f:
-                    pgn_content = f.read()
-                self._load_game_from_content(pgn_content)
-            except Exception as e:
-                messagebox.showerror("Loading Error", f"Could not read the file: {e}", parent=self.master)
+        if not(pgn_game is None or len(pgn_game) == 0) and game_offset is not None:
+            # Deep link: only the game at the byte offset is read, the rest is indexed in the background
+            self.open_game_at(pgn_game, game_offset, self.current_game_index)
+        elif not(pgn_game is None or len(pgn_game) == 0):
+            # Parsed in the background; the requested game is shown as soon as it is read
+            self._start_pgn_loader(filepath=pgn_game)
         else:
             # Initialize UI status with the sample game
             self._load_game_from_content(self.sample_pgn)
@@ -2408,11 +3683,13 @@ class ChessAnnotatorApp:
         sort_menu.add_command(label="Black Player", command=lambda: self.sort_pgn_file("black"))
         sort_menu.add_command(label="Site", command=lambda: self.sort_pgn_file("site"))
         sort_menu.add_command(label="Event", command=lambda: self.sort_pgn_file("event"))
+        sort_menu.add_command(label="Event, Round, Board", command=lambda: self.sort_pgn_file("round"))
 
         # Add the sort_menu as a cascade to the file_menu
         db_menu.add_cascade(label="Sort DB by...", menu=sort_menu)
 
         db_menu.add_command(label="Analyse DB", command=self.handle_analyze_db_button)
+        db_menu.add_command(label="Classify All Openings", command=self.handle_classify_all_button)
         db_menu.add_separator()
         db_menu.add_command(label="Merge DB", command=self.merge_pgn_file)
         db_menu.add_command(label="Manage DB", command=self.manage_pgn_file)
@@ -2549,6 +3826,10 @@ class ChessAnnotatorApp:
                 # User clicked 'Cancel' or closed the dialog -> Stop the closing process
                 return
 
+        # Stop a background load that is still running
+        if self.pgn_loader is not None:
+            self.pgn_loader.cancel()
+
         # 1. Save general settings/preferences
         self.save_preferences_class()
 
@@ -2641,7 +3922,7 @@ class ChessAnnotatorApp:
 
         new_index = self.current_game_index + direction
 
-        if 0 <= new_index < len(self.all_games):
+        if 0 <= new_index < self._game_count():
             self._switch_to_game(new_index)
         else:
             messagebox.showinfo("Navigation", "This is the beginning or end of the PGN collection.", parent=self.master)
@@ -2653,15 +3934,62 @@ class ChessAnnotatorApp:
         if 0 <= index < len(self.all_games):
             self.store_meta_data()
             self.current_game_index = index
-            self.game = self.all_games[index]
+            self._show_game(self.all_games[index])
+        elif self.is_loading and not self._open_indexed_game(index):
+            messagebox.showinfo("Navigation", f"Game {index + 1} has not been loaded yet, please wait.",
+                                parent=self.master)
+
+    def _game_count(self):
+        """ Number of games; while a database is still loading, the sidecar index already knows it. """
+        if self.is_loading and self.pgn_index is not None and isinstance(self.all_games, LazyGameList):
+            return max(len(self.all_games), len(self.pgn_index))
+        return len(self.all_games)
+
+    def _open_indexed_game(self, index):
+        """
+        Database mode, the loader hasn't reached game index yet: reads it through the sidecar
+        index (PGNIndex) and places it like a game opened by offset (see open_game_at).
+        """
+        if self.pgn_index is None or not isinstance(self.all_games, LazyGameList):
+            return False
+        if not 0 <= index < len(self.pgn_index):
+            return False
+        # A game that was opened before and is still waiting keeps its changes
+        game = self.pending_games.get(self.pgn_index.game_span(index)[0])
+        if game is None:
+            try:
+                with PGNFile(self.all_games.filepath) as pgn:
+                    stub, game = pgn.game_number(index)
+            except OSError as e:
+                print(f"Could not read game {index + 1}: {e}")
+                return False
+            if game is None:
+                return False
+            self.pending_games[stub.offset] = game
+        self.store_meta_data()
+        self.current_game_index = index
+        self._show_game(game)
+        return True
+
+    def _show_game(self, game):
+        """ Makes game the current game and redraws everything for it. """
+        self.game = game
+        # Edits only happen to the current game, so every opened game is written out again on save
+        self._mark_game_dirty(self.game)
 
-            self.init_move_list()
+        self.init_move_list()
 
-            self._update_meta_entries()
-            self.analyze_eval_changes()
-            self._populate_move_listbox()
-            self.show_clear_variation_button()
-            self.update_state()
+        self._update_meta_entries()
+        self.analyze_eval_changes()
+        self._populate_move_listbox()
+        self.show_clear_variation_button()
+        self.update_state()
+
+    def _mark_game_dirty(self, game):
+        """ The game has to be exported on the next save; in database mode it also stays in memory. """
+        self.dirty_games.add(game)
+        if isinstance(self.all_games, LazyGameList):
+            self.all_games.pin(game)
 
     def init_move_list(self):
         # Reset moves and position
@@ -2687,7 +4015,7 @@ class ChessAnnotatorApp:
         """
         Updates the status of the buttons in the 'Game' menu and the game numbers.
         """
-        total_games = len(self.all_games)
+        total_games = self._game_count()
 
         # Update Game number label
         game_text = f"Game # {self.current_game_index + 1} of {total_games}" if total_games > 0 else "No Game Loaded"
@@ -2785,11 +4113,58 @@ class ChessAnnotatorApp:
         if new_width > 0:
             self.comment_display.config(wraplength=new_width)
 
-    def display_game_externally(self, file_path, game_index):
+    def display_game_externally(self, file_path, game_index, offset=None):
+        if offset is None and game_index > 0 and os.path.getsize(file_path) > self.DATABASE_MODE_MIN_SIZE:
+            # The sidecar index knows where the game starts: no need to wait for the loader.
+            # Only for database mode, where game_index counts GameStubs like the index does
+            index = PGNIndex.load(file_path)
+            if index is not None and game_index < len(index):
+                offset = index.game_span(game_index)[0]
+        if offset is not None:
+            self.open_game_at(file_path, offset, game_index)
+            return
         self.current_game_index = game_index
-        with open(file_path, 'r', encoding='utf-8') as f:
-            pgn_content = f.read()
-            self._load_game_from_content(pgn_content)
+        self._start_pgn_loader(filepath=file_path)
+
+    def open_game_at(self, file_path, offset, game_index=-1):
+        """
+        Deep link (e.g. from the database browser): reads and shows only the game at a byte
+        offset, so it appears at once even in a very large file. The file is then indexed in
+        the background in database mode (headers only): neighbouring games are parsed when
+        they are opened. game_index is only used until the index has found the game.
+        """
+        try:
+            stub, game = read_game_at(file_path, int(offset))
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Loading Error", f"Could not read the game: {e}", parent=self.master)
+            return
+        if game is None:
+            # Nothing at that offset (file changed?): fall back to loading by index
+            self.display_game_externally(file_path, game_index)
+            return
+
+        self.set_filepath(file_path)
+        self._start_pgn_loader(filepath=file_path, database_mode=True)
+        self.pending_games[int(offset)] = game
+        self.load_shown = True
+        self.current_game_index = game_index
+        self._show_game(game)
+
+    def _place_pending_games(self, first_index, slots):
+        """
+        Puts the games opened by offset in their slots once the background index reaches them:
+        the first game that starts at or after the offset (the browser offset may point
+        to the blank lines before the game).
+        """
+        for index, slot in enumerate(slots, start=first_index):
+            if not self.pending_games:
+                return
+            offset = min(self.pending_games)
+            if isinstance(slot, GameStub) and slot.offset >= offset:
+                game = self.pending_games.pop(offset)
+                self.all_games[index] = game
+                if self.game is game:
+                    self.current_game_index = index
 
     def force_restart(self):
         """
@@ -2819,11 +4194,30 @@ class ChessAnnotatorApp:
         parts = name.replace(",", " ").split()
         return parts[0].strip().lower() if parts else ""
 
+    def _game_header_key(self, game):
+        """ Key used to recognize the same game: normalized (white surname, black surname, date). """
+        return (self._get_surname(game.headers.get("White", "")),
+                self._get_surname(game.headers.get("Black", "")),
+                game.headers.get("Date", "").strip())
+
+    @staticmethod
+    def _game_moves_key(game):
+        """
+        Hash of the main line, catches duplicates whose headers differ (typo in a name, missing date).
+        Games without moves return None: they would all match each other.
+        """
+        moves = " ".join(move.uci() for move in game.mainline_moves())
+        if not moves:
+            return None
+        return hashlib.blake2b(moves.encode("ascii"), digest_size=16).digest()
+
     def merge_pgn_file(self):
         """
         Merges games from an external PGN file into the current list, 
         matching by players and date, then merging comments for duplicates.
         """
+        if self._is_busy_loading():
+            return
         if not hasattr(self, 'all_games'):
             self.all_games = []
 
@@ -2845,36 +4239,55 @@ class ChessAnnotatorApp:
             "Merge Comments",
             "Do you want to merge comments for duplicate games?"
         )
+        match_by_moves = messagebox.askyesno(
+            "Match Moves",
+            "Also treat games with identical moves as duplicates (even if the headers differ)?"
+        )
 
         duplicates_count = 0
         new_games_count = 0
 
+        # Build the indexes once; the first game with a key wins (same as the old linear scan)
+        header_index = {}
+        for g in game_header_views(self.all_games):
+            header_index.setdefault(self._game_header_key(g), g)
+        moves_index = {}
+        if match_by_moves:
+            for g in game_header_views(self.all_games):
+                # In database mode the game is parsed (through the LRU) only to hash its moves
+                parsed = self.all_games.materialize(g) if isinstance(g, GameStub) else g
+                moves_key = self._game_moves_key(parsed)
+                if moves_key is not None:
+                    moves_index.setdefault(moves_key, g)
+
         try:
-            with open(file_to_merge, 'r', encoding='utf-8', errors='replace') as f:
-                while True:
-                    new_game = chess.pgn.read_game(f)
+            with PGNFile(file_to_merge) as pgn:
+                for stub in pgn.stubs():
+                    new_game = pgn.read_game(stub.offset, stub.length)
                     if new_game is None:
-                        break
-
-                    # Extract keys for comparison
-                    w_new = self._get_surname(new_game.headers.get("White", ""))
-                    b_new = self._get_surname(new_game.headers.get("Black", ""))
-                    d_new = new_game.headers.get("Date", "").strip()
+                        continue
 
-                    # Identify a match using normalized surnames
-                    match = next((g for g in self.all_games if
-                                  self._get_surname(g.headers.get("White", "")) == w_new and
-                                  self._get_surname(g.headers.get("Black", "")) == b_new and
-                                  g.headers.get("Date", "").strip() == d_new), None)
+                    # Identify a match using normalized surnames and date, then (optionally) the moves
+                    header_key = self._game_header_key(new_game)
+                    match = header_index.get(header_key)
+                    moves_key = self._game_moves_key(new_game) if match_by_moves else None
+                    if match is None and moves_key is not None:
+                        match = moves_index.get(moves_key)
 
                     if match:
                         # If duplicate, copy comments from the new game to the existing one
                         if do_merge_comments:
+                            if isinstance(match, GameStub):
+                                match = self.all_games.materialize(match)
                             self._merge_game_comments(match, new_game)
+                            self._mark_game_dirty(match)
                         duplicates_count += 1
                     else:
-                        # New game: add to the list
+                        # New game: add to the list and to the indexes
                         self.all_games.append(new_game)
+                        header_index[header_key] = new_game
+                        if moves_key is not None:
+                            moves_index[moves_key] = new_game
                         new_games_count += 1
                     self.is_dirty = True
 
@@ -2936,35 +4349,33 @@ class ChessAnnotatorApp:
 
     def sort_pgn_file(self, property):
         """
-        Sorts self.all_games based on the provided property.
-        Handles compound sorting for 'site' and 'event'.
+        Sorts self.all_games based on the provided property (see SORT_ORDERS).
+        Only the headers are used: a key table is built once, sorted into a permutation
+        and the permutation is applied to the list, so no game has to be parsed.
         """
+        if self._is_busy_loading():
+            return
         if not hasattr(self, 'all_games') or not self.all_games:
             return
+        tags = SORT_ORDERS.get(property)
+        if tags is None:
+            return
 
-        # Helper to get header value safely
-        def get_h(game, tag):
-            return game.headers.get(tag, "").strip().lower()
-
-        if property == "date":
-            # Simple date sort (PGN date format YYYY.MM.DD sorts well as string)
-            self.all_games.sort(key=lambda g: get_h(g, "Date"))
-
-        elif property == "white":
-            self.all_games.sort(key=lambda g: get_h(g, "White"))
-
-        elif property == "black":
-            self.all_games.sort(key=lambda g: get_h(g, "Black"))
+        permutation = sort_permutation(game_header_views(self.all_games), tags)
+        if permutation == list(range(len(permutation))):
+            return  # already in this order
 
-        elif property == "site":
-            # Sort by Site, then by Date
-            self.all_games.sort(key=lambda g: (get_h(g, "Site"), get_h(g, "Date")))
+        if isinstance(self.all_games, LazyGameList):
+            self.all_games.reorder(permutation)
+        else:
+            self.all_games = [self.all_games[i] for i in permutation]
 
-        elif property == "event":
-            # Sort by Event, then by Date
-            self.all_games.sort(key=lambda g: (get_h(g, "Event"), get_h(g, "Date")))
+        # Keep the current game selected at its new position
+        if 0 <= self.current_game_index < len(permutation):
+            self.current_game_index = permutation.index(self.current_game_index)
+            self._update_game_navigation_state()
 
-        # Mark the database as modified
+        # Mark the database as modified (only the order changed: saving copies the games as they are)
         self.is_dirty = True
 
         # Optional: Refresh the UI if a list is visible
@@ -2976,6 +4387,8 @@ class ChessAnnotatorApp:
         Opens a window to manage the games in self.all_games with checkboxes
         to remove, keep (leave), or invert selections.
         """
+        if self._is_busy_loading():
+            return
         if not hasattr(self, 'all_games') or not self.all_games:
             messagebox.showwarning("Warning", "No games in database to manage.")
             return
@@ -2995,73 +4408,54 @@ class ChessAnnotatorApp:
         tk.Label(manage_win, text=f"Total Games: {len(self.all_games)}",
                  font=("Segoe UI", 12, "bold"), bg=header_color, fg=text_on_dark, pady=10).pack(fill=tk.X)
 
-        # --- Scrollable List Container ---
-        container = tk.Frame(manage_win, bg="white", relief=tk.SOLID, borderwidth=1)
-        container.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-
-        canvas = tk.Canvas(container, bg="white", highlightthickness=0)
-        # Using the thick scrollbar style defined earlier
-        scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview, style="Thick.Vertical.TScrollbar")
-        scrollable_frame = tk.Frame(canvas, bg="white")
-
-        scrollable_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-        canvas_win = canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.bind("<Configure>", lambda e: canvas.itemconfig(canvas_win, width=e.width))
-
-        canvas.configure(yscrollcommand=scrollbar.set)
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        # Track checkbox states
-        # Using a list of BooleanVars to link with checkboxes
-        check_vars = []
-
-        for i, game in enumerate(self.all_games):
-            var = tk.BooleanVar(value=False)
-            check_vars.append(var)
-
-            row = tk.Frame(scrollable_frame, bg="white")
-            row.pack(fill=tk.X, pady=2, padx=5)
-
-            # Extract headers for display
+        # --- Game list: only the visible rows are drawn, checkbox states live in a bytearray ---
+        def row_text(i, game):
             w = game.headers.get("White", "Unknown")
             b = game.headers.get("Black", "Unknown")
             res = game.headers.get("Result", "*")
+            return f"{i + 1:03d}. {w} - {b} ({res})"
 
-            lbl_text = f"{i + 1:03d}. {w} - {b} ({res})"
-
-            # Checkbox at the end of the row
-            tk.Label(row, text=lbl_text, bg="white", font=("Segoe UI", 10)).pack(side=tk.LEFT, padx=5)
-            tk.Checkbutton(row, variable=var, bg="white", activebackground="white").pack(side=tk.RIGHT, padx=10)
+        game_list = VirtualGameList(manage_win, game_header_views(self.all_games), row_text, checkable=True,
+                                    font=("Segoe UI", 10), relief=tk.SOLID, borderwidth=1)
+        game_list.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
         # --- Button Actions ---
-        def get_selected_indices():
-            return [i for i, var in enumerate(check_vars) if var.get()]
-
         def do_remove():
-            indices = get_selected_indices()
-            if not indices: return
-            if messagebox.askyesno("Confirm", f"Remove {len(indices)} selected games?"):
-                # Delete from end to start to avoid index shifts
-                for i in sorted(indices, reverse=True):
-                    self.all_games.pop(i)
+            count = game_list.checked.count(1)
+            if not count: return
+            if messagebox.askyesno("Confirm", f"Remove {count} selected games?", parent=manage_win):
+                # Keep everything that is not checked, in one pass
+                self._apply_game_mask(game_list.checked.translate(INVERT_MASK))
                 manage_win.destroy()
                 self._update_after_manage()
-                self.is_dirty = True
 
         def do_leave():
-            indices = get_selected_indices()
-            if not indices: return
-            if messagebox.askyesno("Confirm", f"Keep only {len(indices)} selected games and remove others?"):
-                # Rebuild list with only selected items
-                self.all_games = [self.all_games[i] for i in indices]
+            count = game_list.checked.count(1)
+            if not count: return
+            if messagebox.askyesno("Confirm", f"Keep only {count} selected games and remove others?",
+                                   parent=manage_win):
+                self._apply_game_mask(game_list.checked)
                 manage_win.destroy()
                 self._update_after_manage()
-                self.is_dirty = True
+
+        def do_write_copy():
+            count = game_list.checked.count(1)
+            if not count: return
+            filepath = filedialog.asksaveasfilename(
+                defaultextension=".pgn", filetypes=[("PGN files", "*.pgn"), ("All files", "*.*")],
+                title="Write Selected Games To", parent=manage_win,
+                initialdir=os.path.dirname(self.last_filepath) if self.last_filepath else None)
+            if not filepath: return
+            try:
+                self.store_meta_data()
+                views = itertools.compress(game_header_views(self.all_games), game_list.checked)
+                self._write_game_views(filepath, views)
+                messagebox.showinfo("Done", f"{count} games written to\n{filepath}", parent=manage_win)
+            except Exception as e:
+                messagebox.showerror("Error", f"Could not write the games: {e}", parent=manage_win)
 
         def do_invert():
-            for var in check_vars:
-                var.set(not var.get())
+            game_list.invert()
 
         # --- Bottom Button Frame ---
         btn_frame = tk.Frame(manage_win, bg=bg_color)
@@ -3074,6 +4468,35 @@ class ChessAnnotatorApp:
                                                                                  padx=5)
         tk.Button(btn_frame, text="Remove Selected", command=do_remove, **btn_style).pack(side=tk.LEFT, expand=True,
                                                                                           fill=tk.X, padx=5)
+        tk.Button(btn_frame, text="Keep Selected", command=do_leave, **btn_style).pack(side=tk.LEFT, expand=True,
+                                                                                       fill=tk.X, padx=5)
+        tk.Button(btn_frame, text="Write Selected To...", command=do_write_copy, **btn_style).pack(
+            side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+
+    def _apply_game_mask(self, keep_mask):
+        """
+        Keeps the games whose entry in keep_mask (bytearray, 1 = keep) is set, in one pass.
+        The kept games are not touched, so saving still copies them as raw bytes.
+        """
+        current = self.current_game_index
+        keep_current = 0 <= current < len(keep_mask) and keep_mask[current]
+        if isinstance(self.all_games, LazyGameList):
+            self.all_games.compress(keep_mask)
+        else:
+            self.all_games = list(itertools.compress(self.all_games, keep_mask))
+        self.is_dirty = True
+
+        if keep_current:
+            # The current game moves up by the number of removed games before it
+            self.current_game_index = keep_mask.count(1, 0, current)
+            self._update_game_navigation_state()
+        elif self.all_games:
+            self._switch_to_game(0)
+        else:
+            self.game = None
+            self.current_game_index = -1
+            self.move_list = []
+            self.update_state()
 
     def _update_after_manage(self):
         """ Helper to refresh the main app state after modifying all_games. """
@@ -3082,6 +4505,11 @@ class ChessAnnotatorApp:
         if hasattr(self, 'update_stats'): self.update_stats()
 
     def split_pgn_file(self):
+        """
+        Splits the loaded PGN file into parts, by number of games or by size.
+        The games are copied byte for byte (no parsing, comments and formatting stay as they are)
+        and streamed straight into the zip entries or plain files.
+        """
         # Basic check if a file was previously loaded
         if not hasattr(self, 'last_filepath') or not self.last_filepath:
             messagebox.showwarning("Warning", "No PGN file loaded to split.")
@@ -3090,59 +4518,88 @@ class ChessAnnotatorApp:
         directory = os.path.dirname(self.last_filepath)
         base_name = os.path.splitext(os.path.basename(self.last_filepath))[0]
 
-        # 1. Ask for the number of games per file
+        # 1. Ask for the number of games (or the size) per file
         # Defaulting to 20 as requested
-        n = simpledialog.askinteger("Split PGN", "Number of games per file:",
-                                    initialvalue=20, minvalue=1)
-        if not n: return
-
-        # 2. Ask for the zip filename
-        zip_name = simpledialog.askstring("Zip Name", "Enter name for the zip file:",
-                                          initialvalue=f"{base_name}_split.zip")
-        if not zip_name: return
-        if not zip_name.endswith('.zip'): zip_name += '.zip'
-
-        zip_path = os.path.join(directory, zip_name)
+        answer = simpledialog.askstring("Split PGN", "Number of games per file,\nor a size per file (e.g. 10MB):",
+                                        initialvalue="20")
+        if not answer: return
+        split_size = parse_split_size(answer)
+        if split_size is None:
+            messagebox.showerror("Error", f"'{answer}' is not a number of games or a size like 10MB.")
+            return
+        games_per_part, bytes_per_part = split_size
+
+        # 2. Zip file or plain files in a folder
+        use_zip = messagebox.askyesno("Split PGN", "Write the parts into a zip file?\n(No: plain PGN files in a folder)")
+        if use_zip:
+            zip_name = simpledialog.askstring("Zip Name", "Enter name for the zip file:",
+                                              initialvalue=f"{base_name}_split.zip")
+            if not zip_name: return
+            if not zip_name.endswith('.zip'): zip_name += '.zip'
+            target_path = os.path.join(directory, zip_name)
+        else:
+            folder_name = simpledialog.askstring("Folder Name", "Enter name for the output folder:",
+                                                 initialvalue=f"{base_name}_split")
+            if not folder_name: return
+            target_path = os.path.join(directory, folder_name)
 
         try:
-            with open(self.last_filepath, 'r', encoding='utf-8') as pgn_file:
-                # Prepare to write to zip
-                with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zip_out:
-                    game_count = 0
-                    file_index = 1
-                    current_batch = []
-
-                    while True:
-                        # Read game by game
-                        game = chess.pgn.read_game(pgn_file)
-                        if game is None:
-                            # Handle the last remaining batch
-                            if current_batch:
-                                self._write_batch_to_zip(zip_out, current_batch, file_index, base_name)
-                            break
-
-                        current_batch.append(str(game))
-                        game_count += 1
-
-                        # If batch is full, write it and reset
-                        if len(current_batch) >= n:
-                            self._write_batch_to_zip(zip_out, current_batch, file_index, base_name)
-                            current_batch = []
-                            file_index += 1
-
-            messagebox.showinfo("Done", f"Successfully split into {file_index} files inside:\n{zip_path}")
+            self.master.config(cursor="watch")
+            self.master.update_idletasks()
+            file_index = self._split_pgn_stream(self.last_filepath, target_path, base_name,
+                                                games_per_part, bytes_per_part, use_zip)
+            messagebox.showinfo("Done", f"Successfully split into {file_index} files inside:\n{target_path}")
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to split PGN: {e}")
-
-    def _write_batch_to_zip(self, zip_obj, batch, index, base_name):
-        """
-        Helper to write a list of games into a single PGN file inside a zip.
-        """
-        file_in_zip = f"{base_name}_{index:03d}.pgn"
-        # Combine games with double newlines (PGN standard)
-        content = "\n\n".join(batch)
-        zip_obj.writestr(file_in_zip, content)
+        finally:
+            self.master.config(cursor="")
+
+    def _split_pgn_stream(self, source_path, target_path, base_name, games_per_part=None, bytes_per_part=None,
+                          use_zip=True):
+        """
+        Copies the raw games of source_path into numbered parts. A part is closed when it holds
+        games_per_part games or has reached bytes_per_part bytes (a game is never cut in two).
+        Returns the number of parts written.
+        """
+        zip_out = zipfile.ZipFile(target_path, 'w', zipfile.ZIP_DEFLATED) if use_zip else None
+        if not use_zip:
+            os.makedirs(target_path, exist_ok=True)
+        part = None
+        file_index = 0
+        games_in_part = bytes_in_part = 0
+        needs_separator = False
+        try:
+            with PGNFile(source_path) as pgn:
+                for offset, length in pgn.spans():
+                    raw_game = pgn.raw(offset, length)
+                    if part is None:
+                        file_index += 1
+                        part_name = f"{base_name}_{file_index:03d}.pgn"
+                        if use_zip:
+                            part = zip_out.open(part_name, 'w', force_zip64=True)
+                        else:
+                            part = open(os.path.join(target_path, part_name), 'wb')
+                        games_in_part = bytes_in_part = 0
+                    elif needs_separator:
+                        # Keep the empty line between games (PGN standard)
+                        part.write(b"\n")
+                    part.write(raw_game)
+                    needs_separator = not (raw_game.endswith(b"\n\n") or raw_game.endswith(b"\n\r\n"))
+                    games_in_part += 1
+                    bytes_in_part += len(raw_game)
+
+                    # If the part is full, close it; the next game opens a new one
+                    if (games_per_part and games_in_part >= games_per_part) or \
+                            (bytes_per_part and bytes_in_part >= bytes_per_part):
+                        part.close()
+                        part = None
+        finally:
+            if part is not None:
+                part.close()
+            if zip_out is not None:
+                zip_out.close()
+        return file_index
 
     def load_pgn_file(self):
         """
@@ -3163,15 +4620,15 @@ class ChessAnnotatorApp:
         self.master.wait_window(dialog)
         if dialog.result:
             self.set_filepath(dialog.result)
-            with open(self.last_filepath, 'r', encoding='utf-8') as f:
-                pgn_content = f.read()
             self.current_game_index = 0
-            self._load_game_from_content(pgn_content)
+            self._start_pgn_loader(filepath=self.last_filepath)
 
     def save_pgn_file(self):
         """
         Saves all games in self.all_games to a PGN file, preserving order.
         """
+        if self._is_busy_loading():
+            return
         # Check if the list exists and is not empty
         if not hasattr(self, 'all_games') or not self.all_games:
             messagebox.showwarning("Save Failed", "No games in the database to save.", parent=self.master)
@@ -3193,6 +4650,11 @@ class ChessAnnotatorApp:
             initialfile=initial_file # Pre-fill the last used filename
         )
 
+        if filepath and self.partial_load and os.path.abspath(filepath) == os.path.abspath(self.last_filepath or ""):
+            if not messagebox.askyesno("Partially Loaded",
+                                       f"Only {len(self.all_games)} games of this file were loaded.\n"
+                                       "Overwrite the file with these games only?", parent=self.master):
+                return
         if filepath:
             try:
                 # Important: Ensure the current active game in the UI is updated
@@ -3200,15 +4662,8 @@ class ChessAnnotatorApp:
                 # 1. Update the game's headers with the modified meta-tags from the UI
                 self.store_meta_data()
 
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    # We use FileExporter for clean PGN formatting
-                    for game in self.all_games:
-                        # Export each game one by one
-                        exporter = chess.pgn.FileExporter(f)
-                        game.accept(exporter)
-                        # Add extra newlines between games for readability
-                        f.write("\n\n")
-                    self.is_dirty = False
+                self.write_pgn_games(filepath)
+                self.is_dirty = False
                 self.set_filepath(filepath)
 
                 messagebox.showinfo("Save Complete", f"Database successfully saved ({len(self.all_games)} games).", parent=self.master)
@@ -3223,6 +4678,10 @@ class ChessAnnotatorApp:
         if not hasattr(self, 'all_games') or not self.all_games:
             messagebox.showwarning("Save Failed", "No games in the database to save.", parent=self.master)
             return
+        # Never write back an incomplete game list (still loading or loading was stopped)
+        if self.is_loading or self.partial_load:
+            print("not stored, the PGN file was not loaded completely:", filepath)
+            return False
 
         try:
                 # Important: Ensure the current active game in the UI is updated
@@ -3230,49 +4689,248 @@ class ChessAnnotatorApp:
                 # 1. Update the game's headers with the modified meta-tags from the UI
                 self.store_meta_data()
 
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    # We use FileExporter for clean PGN formatting
-                    for game in self.all_games:
-                        # Export each game one by one
-                        exporter = chess.pgn.FileExporter(f)
-                        game.accept(exporter)
-                        # Add extra newlines between games for readability
-                        f.write("\n\n")
-                    self.is_dirty = False
+                self.write_pgn_games(filepath)
+                self.is_dirty = False
                 self.set_filepath(filepath)
-                print("saved all to:", filepath)
+                return True
 
         except Exception as e:
                 messagebox.showerror("Saving Error", f"Could not save the database: {e}", parent=self.master)
+        return False
+
+    @staticmethod
+    def _file_signature(filepath):
+        """ (path, size, mtime): if any of these changed, the stored game spans can't be trusted. """
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns
+
+    def write_pgn_games(self, filepath):
+        """
+        Writes self.all_games to filepath, atomically (temp file in the same folder + os.replace).
+        Games that were not opened or changed since loading are copied byte for byte from
+        the file they were read from; only the other games are exported again.
+        """
+        new_spans, copied = self._write_game_views(filepath, game_header_views(self.all_games))
+        print(f"saved {len(self.all_games)} games ({copied} copied unchanged) to: {filepath}")
+
+        # The saved file is now the source of every game; only the current game can still change
+        self.game_spans = new_spans
+        self.span_source = self._file_signature(filepath)
+        self.dirty_games = {self.game} if self.game is not None else set()
+        if isinstance(self.all_games, LazyGameList):
+            # Release the saved games, they can be parsed again from the new file
+            self.all_games.filepath = filepath
+            self.all_games.unpin(new_spans, keep=self.game)
+            self.game_spans = {}
+
+    def _write_game_views(self, filepath, views):
+        """
+        Writes the games (or GameStubs) in views to filepath, atomically.
+        Returns (new_spans, copied): the span of every game in the new file and
+        the number of games that were copied as raw bytes.
+        """
+        source = self.span_source
+        if source is None or self._file_signature(source[0]) != source:
+            # The file changed on disk (or the games came from a string): export everything
+            source = None
+            if isinstance(self.all_games, LazyGameList):
+                raise IOError(f"{self.all_games.filepath} was changed by another program, "
+                              "the games that were not opened can't be read anymore.")
+        dirty_games = self.dirty_games | {self.game}
+        new_spans = {}
+        new_index = []  # (offset, length, tag lines) per game, for the sidecar index
+        copied = 0
+        directory = os.path.dirname(os.path.abspath(filepath))
+        fd, temp_path = tempfile.mkstemp(suffix=".pgn.tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as out, (PGNFile(source[0]) if source else StringIO()) as src:
+                position = 0
+                for game in views:
+                    if isinstance(game, GameStub):
+                        span = (game.offset, game.length)
+                    else:
+                        span = self.game_spans.get(game) if source else None
+                    if span is not None and game not in dirty_games:
+                        data = src.raw(*span)
+                        if not (data.endswith(b"\n\n") or data.endswith(b"\n\r\n")):
+                            # Keep the empty line between games (PGN standard)
+                            data += b"\n" if data.endswith(b"\n") else b"\n\n"
+                        copied += 1
+                    else:
+                        # We use the exporter for clean PGN formatting, plus an empty line between games
+                        exporter = chess.pgn.StringExporter(headers=True, variations=True, comments=True)
+                        data = (game.accept(exporter) + "\n\n").encode('utf-8')
+                    out.write(data)
+                    new_spans[game] = (position, len(data))
+                    new_index.append((position, len(data), PGNIndex.header_bytes(data)))
+                    position += len(data)
+                out.flush()
+                os.fsync(out.fileno())
+            # mkstemp creates the file private; keep the permissions of the file we replace
+            if os.path.exists(filepath):
+                os.chmod(temp_path, os.stat(filepath).st_mode & 0o7777)
+            else:
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(temp_path, 0o666 & ~umask)
+            os.replace(temp_path, filepath)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        # The spans are known, so the next open doesn't have to scan the new file
+        stat = os.stat(filepath)
+        index = PGNIndex(filepath, stat.st_size, stat.st_mtime_ns)
+        for offset, length, header in new_index:
+            index.add(offset, length, header)
+        index.save()
+        return new_spans, copied
 
     def _load_game_from_content(self, pgn_content):
         """
-        Reads all games from the PGN content, stores them, and switches to the first game.
+        Reads all games from the PGN content, stores them, and switches to the current game.
+        Parsing runs in the background (see _start_pgn_loader).
+        """
+        self._start_pgn_loader(pgn_content=pgn_content)
+
+    # Files larger than this get a progress window while loading
+    LOAD_PROGRESS_MIN_SIZE = 1024 * 1024
+    # Files larger than this are opened in database mode: games are parsed when they are opened
+    DATABASE_MODE_MIN_SIZE = 64 * 1024 * 1024
+
+    def _start_pgn_loader(self, filepath=None, pgn_content=None, database_mode=None):
         """
+        Starts parsing a PGN file (or string) on a background thread.
+        The game at self.current_game_index is shown as soon as it has been parsed;
+        the other games are added while the user can already work with it.
+        database_mode: None decides on the file size.
+        """
+        if self.pgn_loader is not None:
+            # The callbacks are the same methods the new loader uses: the old one must stay silent
+            self.pgn_loader.abandon()
+        self._close_load_progress()
+
+        self.is_loading = True
+        self.partial_load = False
+        self.load_shown = False
+        self.dirty_games = set()
+        self.pending_games = {}
+        # Only set when it is already up to date; the loader writes it on a first full read
+        self.pgn_index = PGNIndex.load(filepath) if filepath else None
         try:
-            pgn = StringIO(pgn_content)
-            self.all_games = []
-            while True:
-                game = chess.pgn.read_game(pgn)
-                if game is None:
-                    break
+            if database_mode is None:
+                database_mode = bool(filepath) and os.path.getsize(filepath) > self.DATABASE_MODE_MIN_SIZE
+            database_mode = database_mode and bool(filepath)
+            self.all_games = LazyGameList(filepath) if database_mode else []
+            # The callbacks pass the loader on, so only the current load can place the pending game
+            loader = PGNLoadWorker(self.master, filepath=filepath, pgn_content=pgn_content,
+                                   on_games=lambda games: self._on_games_loaded(games, loader),
+                                   on_progress=self._on_load_progress,
+                                   on_done=lambda status, error: self._on_load_finished(status, error, loader),
+                                   headers_only=database_mode)
+            self.pgn_loader = loader
+            # The loader fills the spans while reading; they are valid as long as the file is unchanged
+            self.game_spans = self.pgn_loader.spans
+            self.span_source = self._file_signature(filepath) if filepath else None
+        except Exception as e:
+            self.is_loading = False
+            messagebox.showerror("Loading Error", f"Could not read the file: {e}", parent=self.master)
+            return
+
+        if self.pgn_loader.total > self.LOAD_PROGRESS_MIN_SIZE:
+            self.load_progress = AnalysisProgressUI(self.master, title="Loading PGN", modal=False,
+                                                    cancel_text="Stop Loading", confirm_text=None)
+            name = os.path.basename(filepath) if filepath else "PGN"
+            self.load_progress.db_label.config(text=f"Reading {name}")
+            self.load_progress.status_label.config(text="0 games read")
+            self.load_progress.progress_bar.config(maximum=self.pgn_loader.total, value=0)
+        self.pgn_loader.start()
+
+    def _on_games_loaded(self, games, loader=None):
+        """ Called (on the Tk thread) with every batch of parsed games. """
+        first_index = len(self.all_games)
+        self.all_games.extend(games)
+        if self.pending_games and loader is self.pgn_loader:
+            self._place_pending_games(first_index, games)
+        if not self.load_shown and 0 <= self.current_game_index < len(self.all_games):
+            # The requested game is available: show it right away
+            self.load_shown = True
+            self._switch_to_game(self.current_game_index)
+        else:
+            self._update_game_navigation_state()
+            self.next_game_button.config(
+                state=tk.NORMAL if 0 <= self.current_game_index < self._game_count() - 1 else tk.DISABLED)
+
+    def _on_load_progress(self, games_read, position, total):
+        if self.load_progress is None:
+            return
+        if self.load_progress.is_cancelled and self.pgn_loader is not None:
+            self.pgn_loader.cancel()
+        self.load_progress.status_label.config(text=f"{games_read} games read")
+        if total:
+            self.load_progress.progress_bar.config(value=min(position, total))
+
+    def _close_load_progress(self):
+        if self.load_progress is not None:
+            try:
+                self.load_progress.destroy()
+            except tk.TclError:
+                pass
+            self.load_progress = None
+
+    def _on_load_finished(self, status, error, loader=None):
+        """ Called once when the background loader stops (done, cancelled or error). """
+        is_current_load = loader is self.pgn_loader
+        self._close_load_progress()
+        self.pgn_loader = None
+        self.is_loading = False
+
+        if status == "error":
+            messagebox.showerror("Error", f"Error reading PGN: {error}", parent=self.master)
+            # Games read before the error are kept, but must not overwrite the file
+            self.partial_load = True
+        elif status == "cancelled":
+            self.partial_load = True
+            messagebox.showwarning("Loading Stopped",
+                                   f"Loading was stopped after {len(self.all_games)} games.\n"
+                                   "Saving will only write these games.", parent=self.master)
+
+        if self.pending_games and is_current_load:
+            # Games opened by offset that were not found by the index: keep them at the end
+            for offset, game in sorted(self.pending_games.items(), key=lambda item: item[0]):
+                print(f"Game at offset {offset} not found in the index, appended.")
                 self.all_games.append(game)
+                if self.game is game:
+                    self.current_game_index = len(self.all_games) - 1
+            self.pending_games = {}
 
-            if not self.all_games:
+        if not self.all_games:
+            if status != "error":
                 messagebox.showerror("Error", "Could not read PGN. Invalid game or empty file.", parent=self.master)
-                self.game = None
-                self.current_game_index = -1
-                self.move_list = []
-                self.update_state() # Reset UI
-                return
+            self.game = None
+            self.current_game_index = -1
+            self.move_list = []
+            self.update_state() # Reset UI
+            return
+
+        if not self.load_shown:
             if self.current_game_index >= len(self.all_games):
                 self.current_game_index = len(self.all_games) - 1
-            # Switch to the first game
+            # Switch to the current game
+            self.load_shown = True
             self._switch_to_game(self.current_game_index)
+        else:
+            self.update_state()
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Error reading PGN: {e}", parent=self.master)
-
+    def _is_busy_loading(self):
+        """ Database-wide operations have to wait until all games are loaded. """
+        if self.is_loading:
+            messagebox.showinfo("Loading", "The PGN file is still being loaded, please wait.", parent=self.master)
+            return True
+        return False
 
     # --- UI Component Setup ---
 
@@ -3541,7 +5199,7 @@ class ChessAnnotatorApp:
         """ Callback for the TouchMoveListColor widget. """
         if self.current_move_index != index:
             self.current_move_index = index
-            self.update_state()  # Updates your board and logic
+            self.schedule_update_state()  # Updates your board and logic
 
     def _on_pretty_move_selected(self, node, type_label):
         """ Callback for the PrettyMoveListColor widget. """
@@ -3552,7 +5210,7 @@ class ChessAnnotatorApp:
 
             if self.current_move_index != move_index:
                 self.current_move_index = move_index
-                self.update_state()  # Board updates to this specific position
+                self.schedule_update_state()  # Board updates to this specific position
         elif type_label == "Variant":
             # Step 1 - Identify all nodes in the chain that need promotion
             promotion_path = []
@@ -3725,34 +5383,64 @@ class ChessAnnotatorApp:
         if len(self.move_list) > 0:
             self.current_move_index = -1
             self.move_list_widget.scroll_to_start()
-            self.update_state()
+            self.schedule_update_state()
 
     def go_forward_move(self):
         """ Go to the next move. """
         if self.current_move_index < len(self.move_list) - 1:
             self.current_move_index += 1
-            self.update_state()
+            self.schedule_update_state()
 
     def go_back_move(self):
         """ Go to the previous move. """
         if self.current_move_index > -1:
             self.current_move_index -= 1
-            self.update_state()
+            self.schedule_update_state()
 
     def go_last_move(self):
         """ Go to the last move. """
         if len(self.move_list) > 0:
             self.current_move_index = len(self.move_list) - 1
-            self.update_state()
+            self.schedule_update_state()
 
     # --- Update Functions ---
 
-    def update_state(self):
+    def schedule_update_state(self):
+        """
+        Used by navigation: the new position is only recorded, the UI follows in one
+        after_idle pass. Holding an arrow key or swiping then redraws once for the latest
+        position instead of once per step.
+        """
+        # The board itself is kept current, code that runs before the pass may use it
+        self.board = self._get_board_at_index(self.current_move_index)
+        if self._update_state_job is None:
+            self._update_state_job = self.master.after_idle(self._run_scheduled_update_state)
+
+    def _run_scheduled_update_state(self):
+        self._update_state_job = None
+        self.update_state(only_changed=True)
+
+    def _ui_part_changed(self, part, inputs, only_changed):
+        """True if a part of the UI has to be drawn (always, unless only_changed and same inputs)."""
+        if only_changed and self._ui_inputs.get(part) == inputs:
+            return False
+        self._ui_inputs[part] = inputs
+        return True
+
+    def update_state(self, only_changed=False):
         """
         Updates all UI components based on the current move index.
+        With only_changed (the coalesced navigation pass) parts whose inputs did not
+        change since the last pass are left alone, e.g. the game buttons when only the ply moved.
         """
+        # A direct call replaces a pending pass
+        if self._update_state_job is not None:
+            self.master.after_cancel(self._update_state_job)
+            self._update_state_job = None
+
         if not self.game:
             # If no game is loaded, ensure a clean start
+            self._ui_inputs = {}
             self.board = chess.Board()
             self.update_board_display()
             self.notation_label.config(text="No Game Loaded")
@@ -3768,38 +5456,50 @@ class ChessAnnotatorApp:
 
         self.board = self._get_board_at_index(self.current_move_index)
 
-        self.update_board_display()
-        self.update_move_listbox_selection()
-        self.update_move_notation()
-        self.update_comment_display()
-        self._update_game_navigation_state() # Update game navigation as well
-        # Update Variations-Menu buttons using entryconfig
-        prev_alternative_state = tk.NORMAL if len(self.stored_moves) > 0 else tk.DISABLED
-
-        # Index 0 is "Previous Game", Index 1 is "Next Game"
-        if self.variations_menu:
-            self.variations_menu.entryconfig(0, state=prev_alternative_state)
-            self.variations_menu.entryconfig(1, state=prev_alternative_state)
-
-
-        # Update move navigation button states
-        self.prev_button.config(state=tk.NORMAL if self.current_move_index > -1 else tk.DISABLED)
-        self.first_button.config(state=tk.NORMAL if self.current_move_index > -1 else tk.DISABLED)
-        self.next_button.config(state=tk.NORMAL if self.current_move_index < len(self.move_list) - 1 else tk.DISABLED)
-        self.last_button.config(state=tk.NORMAL if self.current_move_index < len(self.move_list) - 1 else tk.DISABLED)
-        self.prev_game_button.config(state=tk.NORMAL if self.current_game_index > 0 and len(self.all_games) > 1 else tk.DISABLED)
-        self.next_game_button.config(state=tk.NORMAL if self.current_game_index < len(self.all_games) - 1 and len(self.all_games) > 1 else tk.DISABLED)
+        # 1. The position: board, move list selection, notation, comment and variation buttons
+        current_node = self._get_current_node()
+        if self._ui_part_changed("position", (self.game, current_node), only_changed):
+            self.update_board_display()
+            self.update_move_listbox_selection()
+            self.update_move_notation()
+            self.update_comment_display()
+            self.update_variation_buttons(current_node)
+
+        # 2. Game navigation: label, menu and buttons
+        game_count = self._game_count()
+        game_inputs = (self.current_game_index, game_count)
+        if self._ui_part_changed("games", game_inputs, only_changed):
+            self._update_game_navigation_state() # Update game navigation as well
+            self.prev_game_button.config(state=tk.NORMAL if self.current_game_index > 0 and game_count > 1 else tk.DISABLED)
+            self.next_game_button.config(state=tk.NORMAL if self.current_game_index < game_count - 1 and game_count > 1 else tk.DISABLED)
+
+        # 3. Update Variations-Menu buttons using entryconfig
+        has_stored_moves = len(self.stored_moves) > 0
+        if self._ui_part_changed("variations", has_stored_moves, only_changed):
+            prev_alternative_state = tk.NORMAL if has_stored_moves else tk.DISABLED
+
+            # Index 0 is "Previous Game", Index 1 is "Next Game"
+            if self.variations_menu:
+                self.variations_menu.entryconfig(0, state=prev_alternative_state)
+                self.variations_menu.entryconfig(1, state=prev_alternative_state)
+
+        # 4. Update move navigation button states
+        if self._ui_part_changed("moves", (self.current_move_index, len(self.move_list)), only_changed):
+            self.prev_button.config(state=tk.NORMAL if self.current_move_index > -1 else tk.DISABLED)
+            self.first_button.config(state=tk.NORMAL if self.current_move_index > -1 else tk.DISABLED)
+            self.next_button.config(state=tk.NORMAL if self.current_move_index < len(self.move_list) - 1 else tk.DISABLED)
+            self.last_button.config(state=tk.NORMAL if self.current_move_index < len(self.move_list) - 1 else tk.DISABLED)
 
         # Annotation buttons are active if a node is selected (current_move_index >= -1)
         annotation_state = tk.NORMAL if self.current_move_index >= -1 else tk.DISABLED
-
-        if self.insert_edit_comment_button:
-            self.insert_edit_comment_button.config(state=annotation_state)
-        if self.delete_comment_button:
-            self.delete_comment_button.config(state=annotation_state)
-        if self.manage_variations_button:
-            self.manage_variations_button.config(state=annotation_state)
-        self.update_variation_buttons(self._get_current_node())
+        if self._ui_part_changed("annotation", annotation_state, only_changed):
+            if self.insert_edit_comment_button:
+                self.insert_edit_comment_button.config(state=annotation_state)
+            if self.delete_comment_button:
+                self.delete_comment_button.config(state=annotation_state)
+            if self.manage_variations_button:
+                self.manage_variations_button.config(state=annotation_state)
+        # Also resets the variant mode of the move list, so it runs on every pass
         self.show_clear_variation_button()
 
 
@@ -3838,34 +5538,7 @@ class ChessAnnotatorApp:
         if index < 0 or index >= len(self.move_list):
             return
 
-        node = self.move_list[index]
-        prev_board = node.parent.board()
-
-        # Generate the new text for the item
-        move_num = (index // 2) + 1
-
-        # Determine prefix
-        if prev_board.turn == chess.WHITE:
-            prefix = f"{move_num}. "
-        else:
-            prefix = f"{move_num}... " if index % 2 == 1 else "    "
-
-        try:
-            san_move = prev_board.san(node.move)
-        except:
-             san_move = node.move.uci()
-
-        comment_text = f" ({node.comment.strip()})" if node.comment and node.comment.strip() else ""
-        variation_indicator = f" [+ {len(node.variations)} V]" if len(node.variations) > 0 else ""
-
-        new_list_item_text = f"{prefix}{san_move}{comment_text}{variation_indicator}"
-
-        line_number = index + 1
-        # remove the old line
-        self.move_list_widget.delete(line_number)
-        # Add the new text on the right position
-        self.move_list_widget.insert(index, new_list_item_text, tag_override=self.move_tags[index])
-        self._populate_move_listbox()
+        self.move_list_widget.update_node(self.move_list[index])
         self.update_state()
 
 
@@ -3912,7 +5585,6 @@ class ChessAnnotatorApp:
             node.comment = new_comment
             if self.current_move_index != -1: # Only update listbox item if it's not the root
                 self.update_listbox_item(self.current_move_index)
-                self._populate_move_listbox()
             self.update_comment_display()
             dialog.destroy()
 
@@ -3933,25 +5605,85 @@ class ChessAnnotatorApp:
         self.master.wait_window(dialog)
 
     def handle_classify_opening_button(self):
-        # 1. Initialize once in your app
-        self.classifier = OpeningClassifier("eco.json")
+        # 1. The classifier is loaded once per process
+        self.classifier = OpeningClassifier.get("eco.json")
 
         # 2. Use it whenever a game is loaded or a move is made
-        opening_info = self.classifier.annotate_opening(self.game)
+        node, opening_info = self.classifier.classify(self.game)
 
-        if opening_info:
+        if node and opening_info:
+            if self.classifier.annotate_node(node, opening_info):
+                self.move_list_widget.update_node(node)
             self.update_state()
-            self._populate_move_listbox()
             self.is_dirty = True
         else:
             #self.eco_label.config(text="ECO: ---")
             #self.opening_name_label.config(text="Unknown Opening")
             pass
 
+    # Games classified per step of the "Classify All Openings" loop (between two UI updates)
+    CLASSIFY_BATCH_SIZE = 200
+
+    def handle_classify_all_button(self):
+        """
+        Annotates the opening of every game in the database and fills in missing ECO/Opening headers.
+        Runs in batches with after(), so the progress window stays responsive and can be stopped.
+        """
+        if self._is_busy_loading():
+            return
+        if not self.all_games:
+            messagebox.showwarning("Warning", "No games in database to classify.", parent=self.master)
+            return
+        self.store_meta_data()
+        self.classifier = OpeningClassifier.get("eco.json")
+        total = len(self.all_games)
+        progress = AnalysisProgressUI(self.master, title="Classify Openings", cancel_text="Stop",
+                                      confirm_text=None)
+        progress.progress_bar.config(maximum=total, value=0)
+        state = {"index": 0, "changed": 0}
+        start_time = time.perf_counter()
+
+        def classify_batch():
+            end = min(state["index"] + self.CLASSIFY_BATCH_SIZE, total)
+            for index in range(state["index"], end):
+                game = self.all_games[index]
+                node, opening_info = self.classifier.classify(game)
+                if not opening_info:
+                    continue
+                changed = self.classifier.annotate_node(node, opening_info)
+                for tag, value in (("ECO", opening_info["code"]), ("Opening", opening_info["name"])):
+                    if game.headers.get(tag, "?") in ("", "?"):
+                        game.headers[tag] = value
+                        changed = True
+                if changed:
+                    self._mark_game_dirty(game)
+                    state["changed"] += 1
+            state["index"] = end
+            progress.progress_bar.config(value=end)
+            progress.status_label.config(text=f"{end} of {total} games, {state['changed']} changed")
+
+            if end < total and not progress.is_cancelled:
+                self.master.after(1, classify_batch)
+                return
+            progress.destroy()
+            elapsed = time.perf_counter() - start_time
+            print(f"classified {end} games in {elapsed:.2f} s")
+            if state["changed"]:
+                self.is_dirty = True
+                self._populate_move_listbox()
+                self.update_state()
+            messagebox.showinfo("Done", f"Openings classified: {end} games, {state['changed']} changed.",
+                                parent=self.master)
+
+        progress.db_label.config(text="Classifying openings...")
+        self.master.after(1, classify_batch)
+
     def handle_analyze_db_button(self):
         """
         Starts a sequential analysis of all games in the loaded database.
         """
+        if self._is_busy_loading():
+            return
         if not self.all_games:
             messagebox.showwarning("Analysis", "No games loaded in the database to analyze.")
             return
@@ -3961,8 +5693,28 @@ class ChessAnnotatorApp:
         if not messagebox.askyesno("Analyze Database", msg):
             return
 
-        sf_path = self.ENGINE_PATH
-        self.classifier = OpeningClassifier("eco.json")
+        self.classifier = OpeningClassifier.get("eco.json")
+
+        # Finished games are journaled next to the PGN file, so the run can be resumed after a stop or crash
+        journal = AnalysisJournal(self.last_filepath) if self.last_filepath and os.path.isfile(self.last_filepath) else None
+        done_indices = set()
+        if journal and journal.exists():
+            entries = journal.read()
+            if entries and messagebox.askyesno(
+                    "Resume Analysis",
+                    f"A previous analysis of this file stopped after {len(entries)} games.\n"
+                    "Resume it? (No: start again from the first game)"):
+                done_indices = self._apply_analysis_journal(entries)
+            else:
+                journal.remove()
+
+        # Optional wall-clock budget: every game gets an equal share of the time that is left
+        games_to_do = len(self.all_games) - len(done_indices)
+        hours = simpledialog.askfloat("Time Budget",
+                                      f"Hours for the analysis of {games_to_do} games\n(Cancel: no limit):",
+                                      minvalue=0.01, parent=self.master)
+        deadline = time.monotonic() + hours * 3600 if hours else None
+        games_started = 0
 
         # We use an index to track which game we are currently analyzing
         self.current_db_analysis_index = 0
@@ -3978,9 +5730,14 @@ class ChessAnnotatorApp:
 
         def analyze_next_game():
             """Helper function to analyze the next game in the list."""
+            nonlocal games_started
+            # Skip the games that were finished in a previous run
+            while self.current_db_analysis_index in done_indices:
+                self.current_db_analysis_index += 1
             if self.current_db_analysis_index < len(self.all_games):
                 # 1. Select the game
                 current_game = self.all_games[self.current_db_analysis_index]
+                self._mark_game_dirty(current_game)
                 # 2. Annotate opening (fast, so we do it on the main thread)
                 self.classifier.annotate_opening(current_game)
 
@@ -3989,6 +5746,12 @@ class ChessAnnotatorApp:
                 black = current_game.headers.get("Black", "Unknown")
                 game_desc = f"Game {self.current_db_analysis_index + 1} of {len(self.all_games)}\n{white} vs {black}"
 
+                time_budget = None
+                if deadline is not None:
+                    time_budget = max(0.0, deadline - time.monotonic()) / max(1, games_to_do - games_started)
+                    game_desc += f" ({time_budget:.0f} s)"
+                games_started += 1
+
                 self.analyzer = AnalysisManager(
                     root=self.master,
                     pgn_game=current_game,
@@ -3996,7 +5759,8 @@ class ChessAnnotatorApp:
                     on_finished_callback=go_to_next_game,
                     depth_limit=self.engine_depth,
                     db_info=game_desc  # Pass the game-info,
-                    , check_previous=True,external_progress_ui = ui_bridge
+                    , check_previous=True,external_progress_ui = ui_bridge,
+                    time_budget=time_budget
                 )
                 self.analyzer.start()
                 self.is_dirty = True
@@ -4006,21 +5770,74 @@ class ChessAnnotatorApp:
                 self.update_state()
                 self._populate_move_listbox()
                 messagebox.showinfo("Analysis Complete", "All games in the database have been analyzed.")
+                finish_journal()
 
         def go_to_next_game():
+            # Checkpoint: the game is complete, write it to the journal before anything else
+            if journal and self.analyzer.completed:
+                game = self.all_games[self.current_db_analysis_index]
+                try:
+                    journal.append(self.current_db_analysis_index, self._game_header_key(game), game)
+                except OSError as e:
+                    print(f"Could not write the analysis journal: {e}")
             # Check if the user pressed 'Stop All' in the UI
             if self.current_db_analysis_index >= len(self.all_games) or analysis_ui.is_cancelled:
                 analysis_ui.destroy()
                 messagebox.showinfo("Finished", "Analysis process completed or stopped.")
+                finish_journal()
                 return
             """Callback that triggers the next game analysis."""
             self.current_db_analysis_index += 1
             # Use after(100) to give the UI a tiny bit of breathing room between games
             self.master.after(100, analyze_next_game)
 
+        def finish_journal():
+            """ Merge the analyzed games into the PGN file (one rewrite); then the journal is not needed anymore. """
+            if not journal or not journal.exists():
+                return
+            if messagebox.askyesno("Save Analysis",
+                                   f"Write the analyzed games into {os.path.basename(self.last_filepath)} now?\n"
+                                   "(No: they stay in the journal and the analysis can be resumed later)",
+                                   parent=self.master):
+                if self.store_pgn_file(self.last_filepath):
+                    journal.remove()
+
         # Start the first game
         analyze_next_game()
 
+    def _apply_analysis_journal(self, entries):
+        """
+        Puts the analyzed games of a previous run back into the database.
+        An entry is matched on its index, or on the players and date if the list changed.
+        Returns the set of indices that are done.
+        """
+        by_key = None
+        views = game_header_views(self.all_games)
+        done = set()
+        for entry in entries:
+            key = tuple(entry.get("key", ()))
+            index = entry.get("index", -1)
+            if not (0 <= index < len(views) and self._game_header_key(views[index]) == key):
+                if by_key is None:
+                    by_key = {}
+                    for i, view in enumerate(views):
+                        by_key.setdefault(self._game_header_key(view), i)
+                index = by_key.get(key)
+                if index is None:
+                    print("Journal entry without matching game:", key)
+                    continue
+            game = chess.pgn.read_game(StringIO(entry.get("pgn", "")))
+            if game is None:
+                continue
+            self.all_games[index] = game
+            self._mark_game_dirty(game)
+            done.add(index)
+        if done:
+            self.is_dirty = True
+            if self.current_game_index in done:
+                self._switch_to_game(self.current_game_index)
+        return done
+
     def _clear_variations_func(self):
         """
         Clears all side-variations from every move in the mainline,
@@ -4075,7 +5892,7 @@ class ChessAnnotatorApp:
             self._populate_move_listbox()
             print("Analysis successfully integrated into the UI.")
 
-        self.classifier = OpeningClassifier("eco.json")
+        self.classifier = OpeningClassifier.get("eco.json")
         self.classifier.annotate_opening(self.game)
 
         # Create the manager and start
@@ -4105,7 +5922,6 @@ class ChessAnnotatorApp:
             node.comment = ""
             if self.current_move_index != -1: # Only update listbox item if it's not the root
                 self.update_listbox_item(self.current_move_index)
-                self._populate_move_listbox()
             self.update_comment_display()
             messagebox.showinfo("Commentary", f"Commentary deleted for {current_move_text}.", parent=self.master)
         else:
@@ -4157,72 +5973,48 @@ class ChessAnnotatorApp:
 
         return engine
 
-    async def _get_engine_suggestions(self, board: chess.Board, num_moves: int, depth: int) -> list | None:
+    def _format_suggestion(self, board: chess.Board, entry: dict, depth: int) -> dict:
         """
-        Communicates with the Stockfish engine to get the top 'num_moves' variations.
-        Returns a list of dictionaries with move info or None on error.
+        Turns one line of the engine (an info dict with score and pv) into a suggestion
+        for the dialog: the first move and the principal variation in SAN.
         """
-        engine = None
-
-        try:
-            # Try to launch the engine
-            engine = await self.get_engine( self.ENGINE_PATH, 8)
-
-            # Set the engine hash table size (optional, but good practice)
-            await engine.configure({"Hash": 16})
+        score = entry.get("score")
+        score_str = self._format_score(score, board.turn) if score else "N/A"
 
-            # Analyze the position
-            info = await engine.analyse(board, chess.engine.Limit(depth=depth), multipv=num_moves)
+        # Get the principal variation (PV) as a list of moves
+        pv: list[chess.Move] = entry.get("pv", [])
 
-            suggestions = []
-            for entry in info:
-                # Ensure the entry has a Principal Variation (PV)
-                if not entry.get("pv"):
-                    continue
-
-                score = entry.get("score")
-                score_str = self._format_score(score, board.turn) if score else "N/A"
-
-                # Get the principal variation (PV) as a list of moves
-                pv: list[chess.Move] = entry.get("pv", [])
-
-                # Convert the first move to SAN for easy reading
-                first_move_san = board.san(pv[0])
+        # Convert the first move to SAN for easy reading
+        first_move_san = board.san(pv[0])
 
-                # Convert the rest of the PV to SAN string for display
-                pv_board = board.copy()
-                pv_notation = ""
-                for i, move in enumerate(pv):
-                    move_num = (board.fullmove_number * 2 - (0 if board.turn == chess.WHITE else 1) + i + 1) // 2
+        # Convert the rest of the PV to SAN string for display
+        pv_board = board.copy()
+        pv_notation = ""
+        for i, move in enumerate(pv):
+            move_num = (board.fullmove_number * 2 - (0 if board.turn == chess.WHITE else 1) + i + 1) // 2
 
-                    if pv_board.turn == chess.WHITE:
-                        pv_notation += f" {move_num}. "
-                    elif i == 0:
-                        pv_notation += f" {move_num}... "
+            if pv_board.turn == chess.WHITE:
+                pv_notation += f" {move_num}. "
+            elif i == 0:
+                pv_notation += f" {move_num}... "
 
-                    pv_notation += pv_board.san(move)
-                    pv_board.push(move)
+            pv_notation += pv_board.san(move)
+            pv_board.push(move)
 
-                suggestions.append({
-                    'move_san': first_move_san,
-                    'pv': pv,
-                    'score_str': score_str,
-                    'depth': depth,
-                    'pv_notation': pv_notation.strip()
-                })
-
-            return suggestions
+        return {
+            'move_san': first_move_san,
+            'pv': pv,
+            'score_str': score_str,
+            'depth': depth,
+            'pv_notation': pv_notation.strip()
+        }
 
-        except FileNotFoundError:
-            messagebox.showerror("Engine Error", f"Stockfish engine not found at path: {self.ENGINE_PATH}. Please check the path and permissions.", parent=self.master)
-            return None
-        except Exception as e:
-            messagebox.showerror("Engine Error", f"An error occurred while communicating with the engine: {e}", parent=self.master)
-            return None
-        finally:
-            # IMPORTANT: Always close the engine process
-            if engine:
-                await engine.quit()
+    async def _open_suggestion_engine(self):
+        """ Starts the engine for the suggestion dialog (runs on the EngineSuggestionWorker loop). """
+        engine = await self.get_engine(self.ENGINE_PATH, 8)
+        # Set the engine hash table size (optional, but good practice)
+        await engine.configure({"Hash": 16})
+        return engine
 
     # --- New Variation Logic ---
 
@@ -4242,31 +6034,16 @@ class ChessAnnotatorApp:
             messagebox.showinfo("Information", "Game is over. Cannot add new variations.", parent=self.master)
             return
 
-        # 1. Get suggestions from the engine (Blocking call)
-        # Note: Tkinter UI will freeze during this time. For a large app, use threading.
-        self.engine_status_label = tk.Label(self.master, text="Analyzing... Please wait...", fg="red")
-        self.engine_status_label.pack(side=tk.BOTTOM, fill=tk.X)
-        self.master.update()
-
-        suggestions = asyncio.run(self._get_engine_suggestions(
-            current_board,
-            num_moves=self.ENGINE_MULTI_PV,
-            depth=self.ENGINE_DEPTH
-        ))
-        #remove analyze-label
-        self.engine_status_label.destroy()
-
-        if not suggestions:
-            # Error message is handled inside _get_engine_suggestions
-            return
-
-        # 2. Open a selection dialog
+        # 1. Open the dialog right away; the engine fills it while it searches (EngineSuggestionWorker)
+        suggestions = []
         dialog = tk.Toplevel(self.master)
         dialog.title("Engine Suggestions (Depth " + str(self.ENGINE_DEPTH) + ")")
         dialog.transient(self.master)
         dialog.grab_set()
 
-        tk.Label(dialog, text=f"Top {len(suggestions)} suggested moves for {current_board.turn}:", font=('Arial', 10, 'bold')).pack(padx=10, pady=5)
+        tk.Label(dialog, text=f"Top {self.ENGINE_MULTI_PV} suggested moves for {current_board.turn}:", font=('Arial', 10, 'bold')).pack(padx=10, pady=5)
+        status_label = tk.Label(dialog, text="Starting engine...", fg="red")
+        status_label.pack(padx=10)
 
         listbox_frame = tk.Frame(dialog, padx=10, pady=5)
         listbox_frame.pack(fill='both', expand=True)
@@ -4278,18 +6055,55 @@ class ChessAnnotatorApp:
         suggestion_listbox = tk.Listbox(
             listbox_frame,
             yscrollcommand=scrollbar.set,
-            height=min(len(suggestions), 10),
+            height=min(self.ENGINE_MULTI_PV, 10),
             width=80,
             font=('Consolas', 10)
         )
         suggestion_listbox.pack(side=tk.LEFT, fill='both', expand=True)
         scrollbar.config(command=suggestion_listbox.yview)
 
-        # Populate Listbox
-        for i, sug in enumerate(suggestions):
-            # Format: [Rank] [SAN Move] (Score) | [Principal Variation]
-            list_item = f"[{i+1}.] {sug['move_san']} ({sug['score_str']}) | {sug['pv_notation']}"
-            suggestion_listbox.insert(tk.END, list_item)
+        # 2. Live updates: the list is refilled with every depth the engine completes
+        user_picked = [False]  # True once the user has selected a line
+
+        def on_pick(event):
+            user_picked[0] = True
+
+        suggestion_listbox.bind("<<ListboxSelect>>", on_pick)
+
+        def show_lines(lines, depth):
+            # The lines are ranked again at every depth, so the selection follows its first move, not its row
+            selection = suggestion_listbox.curselection()
+            selected_move = suggestions[selection[0]]['pv'][:1] if selection and selection[0] < len(suggestions) else None
+            suggestions[:] = [self._format_suggestion(current_board, entry, depth) for entry in lines]
+            suggestion_listbox.delete(0, tk.END)
+            for i, sug in enumerate(suggestions):
+                # Format: [Rank] [SAN Move] (Score) | [Principal Variation]
+                list_item = f"[{i+1}.] {sug['move_san']} ({sug['score_str']}) | {sug['pv_notation']}"
+                suggestion_listbox.insert(tk.END, list_item)
+            if not user_picked[0]:
+                # Nothing picked yet: the best line
+                rows = [0] if suggestions else []
+            else:
+                # The line the user picked, or no selection if the engine dropped its move
+                rows = [i for i, sug in enumerate(suggestions) if selected_move and sug['pv'][:1] == selected_move][:1]
+            for row in rows:
+                suggestion_listbox.selection_set(row)
+                suggestion_listbox.see(row)
+            status_label.config(text=f"Depth {depth} of {self.ENGINE_DEPTH}... (a line can be added at any time)")
+
+        def search_done(error):
+            if error is not None:
+                if isinstance(error, FileNotFoundError):
+                    messagebox.showerror("Engine Error", f"Stockfish engine not found at path: {self.ENGINE_PATH}. Please check the path and permissions.", parent=self.master)
+                else:
+                    messagebox.showerror("Engine Error", f"An error occurred while communicating with the engine: {error}", parent=self.master)
+                dialog.destroy()
+                return
+            depth = suggestions[0]['depth'] if suggestions else 0
+            status_label.config(text=f"Depth {depth}: search finished", fg="black")
+
+        worker = EngineSuggestionWorker(self.master, current_board, self.ENGINE_MULTI_PV, self.ENGINE_DEPTH,
+                                        self._open_suggestion_engine, on_update=show_lines, on_done=search_done)
 
         # 3. Handle selection
         def select_and_add():
@@ -4298,6 +6112,8 @@ class ChessAnnotatorApp:
                 messagebox.showwarning("Warning", "Please select a move to add as a variation.", parent=self.master)
                 return
 
+            # The line as it is now: the search stops at once
+            worker.stop()
             selected_index = selection[0]
             selected_sug = suggestions[selected_index]
 
@@ -4346,6 +6162,8 @@ class ChessAnnotatorApp:
 
         tk.Button(button_frame, text="Add Selected Variation", command=select_and_add, width=25, bg='#d9ffc7').pack(side=tk.LEFT, padx=10)
         tk.Button(button_frame, text="Cancel", command=dialog.destroy, width=25, bg='#ffe0e0').pack(side=tk.LEFT, padx=10)
+        # However the dialog is closed, the engine stops
+        dialog.bind("<Destroy>", lambda event: worker.stop() if event.widget is dialog else None)
 
         # Center the dialog
         self.master.update_idletasks()
@@ -4355,6 +6173,7 @@ class ChessAnnotatorApp:
         position_y = self.master.winfo_y() + (self.master.winfo_height() // 2) - (dialog_height // 2)
         dialog.geometry(f'+{position_x}+{position_y}')
 
+        worker.start()
         self.master.wait_window(dialog)
 
     def update_meta_header(self):
@@ -4911,6 +6730,9 @@ def parse_args():
                         help="Set the square-size for the board",
                         type=int,
                         default=None)
+    parser.add_argument("--benchmark_eco",
+                        help="Measure the opening classification speed on this PGN file and exit",
+                        default=None)
     return parser.parse_args()
 # ----------------------------------------------------------------------
 # 1. PIECE IMAGE MANAGER (THE FACTORY/SINGLETON)
@@ -5010,6 +6832,9 @@ class PieceImageManager1:
 # Main execution block
 if __name__ == "__main__":
     args = parse_args()
+    if args.benchmark_eco:
+        benchmark_opening_classifier(args.benchmark_eco)
+        sys.exit(0)
     preferences = load_preferences()
 
     last_pgn_file = preferences.get("last_pgn_filepath", "")
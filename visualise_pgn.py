@@ -12,11 +12,12 @@ from PIL import Image, ImageTk
 from pathlib import Path
 import json
 from pgn_editor.pgn_editor import ChessAnnotatorApp, Tooltip, TouchMoveListColor, TouchFileDialog
-from pgn_editor.pgn_editor import GameChooserDialog, BOARD_THEMES, SettingsDialog
+from pgn_editor.pgn_editor import GameChooserDialog, BOARD_THEMES, SettingsDialog, PGNLoadWorker, read_game_at
 from pgn_entry.pgn_entry import PGNEntryApp, PieceImageManager1
 import cairosvg
 from io import BytesIO
 import traceback
+from collections import OrderedDict
 
 # --- PGN DATA FOR DEMONSTRATION ---
 PGN_WITH_EVENTS = """
@@ -185,16 +186,33 @@ def get_full_move_text(node):
     else:
         return f"{move_number}...{san_move}"
 
+def _new_move_row_map():
+    """
+    Row <-> ply model of a formatted snippet (rows as shown in the move list,
+    so entries with a newline count as several rows).
+      ply_of_row: for every row the ply of the first move on it, or of the last move
+                  above it for comment/variation rows (None before the first move)
+      row_of_ply: ply -> row that shows the move
+    Plies are 0-based game indices: (move_number - 1) * 2, +1 for Black.
+    """
+    return {"ply_of_row": [], "row_of_ply": {}}
+
+
 def _format_pgn_history(move_list):
     """
     Formats a list of move data into a multi-line PGN snippet for display,
     including starting notation for Black, comments, and variations.
+    Returns (rows, number of moves, row map); see _new_move_row_map for the map.
     """
+    row_map = _new_move_row_map()
     if not move_list:
-        return "Starting position (first move of the game)."
+        row_map["ply_of_row"].append(None)
+        return ["Starting position (first move of the game)."], 0, row_map
 
     output = []
     current_line = ""
+    rows_before = 0  # listbox rows of the entries already in output
+    row_of_ply = row_map["row_of_ply"]
 
     # Determine if the sequence starts with Black
     starts_with_black = move_list[0]['player'] == chess.BLACK
@@ -215,6 +233,7 @@ def _format_pgn_history(move_list):
             # Start of White's move: New line or add White's move
             if current_line:
                 output.append(current_line.strip())
+                rows_before += output[-1].count('\n') + 1
             current_line = f"{move_number}.{move_san}"
         else:  # player == chess.BLACK
             if i == 0 and starts_with_black:
@@ -223,6 +242,9 @@ def _format_pgn_history(move_list):
             else:
                 # Add Black's move
                 current_line += f" {move_san}".replace('\n',  ' ')
+        # The move ends up on the last row of the entry built so far
+        row_of_ply[(move_number - 1) * 2 + (0 if player == chess.WHITE else 1)] = \
+            rows_before + current_line.count('\n')
 
         # --- 3. Add Variations (these are stored separately) ---
         if move.get('variations'):
@@ -258,8 +280,100 @@ def _format_pgn_history(move_list):
                 current_line += "\n(" + str(variation) + ")"
     if current_line:
         output.append(current_line.strip())
+        rows_before += output[-1].count('\n') + 1
+
+    # Fill the row -> ply side; rows without a move belong to the move above them
+    first_ply_on_row = {}
+    for ply, row in row_of_ply.items():
+        if row not in first_ply_on_row or ply < first_ply_on_row[row]:
+            first_ply_on_row[row] = ply
+    ply = None
+    for row in range(rows_before):
+        ply = first_ply_on_row.get(row, ply)
+        row_map["ply_of_row"].append(ply)
+
+    return output, it+1, row_map
+
+
+def collect_significant_events(game):
+    """
+    Walks the main line of a game and returns one event dict per move that has an
+    evaluation comment (score = advantage lost by the mover, fen = position before the move).
+    Used by the viewer and by the headless diagram renderer.
+    """
+    events = []
+    board = game.board()
+    prev_eval_cp = 0
+    # List of ALL moves, including the move that caused the event
+    moves_made_so_far = []
+
+    # Iterate over the main line
+    for node in game.mainline():
+        if node.move is None:
+            continue
 
-    return output, it+1
+        eval_before_cp = prev_eval_cp
+        eval_after_cp = get_cp_from_comment(node.comment)
+
+        fen_before_move = board.fen()
+        move_number = board.fullmove_number
+        player_who_moved = board.turn
+
+        # --- SAN CONVERSION ---
+        move_san = None
+        try:
+            move_san = board.san(node.move)
+        except Exception as e:
+            print(f"Warning: Error during SAN conversion for move {move_number} ({e})")
+            continue
+
+        # Add the data of the MOVE that was just checked to the history
+        move_data = {
+            'move_number': move_number,
+            'player': player_who_moved,
+            'san': move_san,
+            'comment': node.comment,
+            'variations': node.variations,
+            # This is the 0-based index in the complete move list
+            'full_move_index': len(moves_made_so_far)
+        }
+        moves_made_so_far.append(move_data)
+
+        # --- EVENT CALCULATION ---
+        if eval_after_cp is not None:
+            if player_who_moved == chess.WHITE:
+                # Loss of advantage for White is (Previous Eval - New Eval)
+                event_score = abs(eval_before_cp - eval_after_cp)
+                player_str = "White"
+            else:
+                # Loss of advantage for Black is (New Eval - Previous Eval)
+                event_score = eval_after_cp - eval_before_cp
+                player_str = "Black"
+
+            events.append({
+                'score': event_score,
+                'fen': fen_before_move,
+                'move_text': f"{move_number}. {'. ...' if player_who_moved == chess.BLACK else ''}{move_san}",
+                'player': player_str,
+                'eval_before': eval_before_cp / 100.0,
+                'eval_after': eval_after_cp / 100.0,
+                'full_move_history': list(moves_made_so_far),
+                'move_index': len(moves_made_so_far) - 1  # Index of the move
+            })
+            #print("event", 'score', event_score,'eval_before', eval_before_cp / 100.0,'eval_after', eval_after_cp / 100.0)
+
+        # --- EXECUTE MOVE AND TRACK EVALUATION ---
+        try:
+            board.push(node.move)
+        except Exception as e:
+            print(f"!!! ERROR !!! Cannot execute move '{move_san}' on the board: {e}")
+            return events
+
+        if eval_after_cp is not None:
+            # For the next move, the 'eval_after' of this move becomes the 'prev_eval'
+            prev_eval_cp = eval_after_cp
+
+    return events
 
 
 def select_key_positions(all_events):
@@ -360,16 +474,23 @@ class PieceImageManager:
     Now supports original image storage to allow dynamic resizing for miniatures.
     """
 
-    def __init__(self, square_size, image_dir_path, set_identifier="staunty"):
+    # Upper bound for the miniature cache: 12 piece symbols in a handful of sizes
+    # (tab miniatures, variation boards, the 600px zoom window, ...)
+    MINI_CACHE_MAX_ENTRIES = 96
+
+    def __init__(self, square_size, image_dir_path, set_identifier="staunty", mini_cache_size=None):
         self.square_size = square_size
         self.image_dir_path = image_dir_path
         self.set_identifier = str(set_identifier)
+        self.mini_cache_size = mini_cache_size or self.MINI_CACHE_MAX_ENTRIES
 
         # New: Store the raw PIL images separately
         self.pil_images = {}
         # Caches for PhotoImages
         self.images = {}  # Main board cache
-        self.mini_cache = {}  # Miniature board cache
+        self.mini_cache = OrderedDict()  # Miniature board cache, (symbol, size) -> PhotoImage in LRU order
+        self.mini_cache_hits = 0
+        self.mini_cache_misses = 0
 
         self.piece_map = {
             'K': 'wK', 'Q': 'wQ', 'R': 'wR', 'B': 'wB', 'N': 'wN', 'P': 'wP',
@@ -384,7 +505,7 @@ class PieceImageManager:
         """
         self.pil_images = {}
         self.images = {}
-        self.mini_cache = {}
+        self.clear_miniature_cache()
 
         for symbol, base_prefix in self.piece_map.items():
             filename_prefix = f"{base_prefix}"
@@ -415,19 +536,43 @@ class PieceImageManager:
     def get_miniature_image(self, symbol, size):
         """
         Returns a scaled PhotoImage for the miniature board.
-        Caches the result to avoid repeated resizing.
-        """
-        cache_key = f"{symbol}_{size}"
-        if cache_key not in self.mini_cache:
-            if symbol in self.pil_images:
-                # Scale the stored original PIL image
-                orig_pil = self.pil_images[symbol]
-                scaled_pil = orig_pil.resize((size, size), Image.Resampling.LANCZOS)
-                self.mini_cache[cache_key] = ImageTk.PhotoImage(scaled_pil)
-            else:
-                return None
+        Caches the result to avoid repeated resizing; the cache is a bounded LRU,
+        so sizes that are no longer used (old window sizes, zoom popups) get released.
+        """
+        cache_key = (symbol, size)
+        img = self.mini_cache.get(cache_key)
+        if img is not None:
+            self.mini_cache_hits += 1
+            self.mini_cache.move_to_end(cache_key)
+            return img
+
+        if symbol not in self.pil_images:
+            return None
+
+        self.mini_cache_misses += 1
+        # Scale the stored original PIL image
+        orig_pil = self.pil_images[symbol]
+        scaled_pil = orig_pil.resize((size, size), Image.Resampling.LANCZOS)
+        img = ImageTk.PhotoImage(scaled_pil)
+        self.mini_cache[cache_key] = img
+
+        # Evict the least recently used entries. Dropping the last reference lets
+        # ImageTk delete the underlying Tk image; canvases that still show an
+        # evicted image keep their own reference until they are redrawn.
+        while len(self.mini_cache) > self.mini_cache_size:
+            self.mini_cache.popitem(last=False)
 
-        return self.mini_cache[cache_key]
+        return img
+
+    def clear_miniature_cache(self):
+        """Releases all scaled miniature images and resets the statistics."""
+        self.mini_cache = OrderedDict()
+        self.mini_cache_hits = 0
+        self.mini_cache_misses = 0
+
+    def get_cache_stats(self):
+        """Returns (hits, misses, entries) of the miniature cache."""
+        return self.mini_cache_hits, self.mini_cache_misses, len(self.mini_cache)
 
 class ChessMiniature(tk.Canvas):
     """
@@ -478,6 +623,16 @@ class ChessMiniature(tk.Canvas):
         self.current_index = 0
         self._update_current_board()
 
+    def clear(self):
+        """ Removes the variation and empties the canvas (used when the widget is reused). """
+        self.base_board = None
+        self.current_board = None
+        self.moves = []
+        self.current_index = 0
+        self.delete("all")
+        self.piece_image_refs = []
+        if self.zoom_win is not None and self.zoom_win.winfo_exists():
+            self._on_close_zoom()
 
     def _on_button_down(self, event):
         """
@@ -540,6 +695,12 @@ class ChessMiniature(tk.Canvas):
             self.current_index -= 1
             self._update_current_board()
 
+    def set_colors(self, color_light, color_dark):
+        """ New board theme; a pooled miniature is reused after a theme change. """
+        self.color_light = color_light
+        self.color_dark = color_dark
+        self.draw_board()
+
     def draw_board(self):
         """ Renders the current position on the main miniature canvas. """
         if self.current_board:
@@ -600,6 +761,9 @@ class ChessMiniature(tk.Canvas):
             target_canvas.create_rectangle(x1, y1, x1 + sq_size, y1 + sq_size, fill=color, outline="")
 
         # 2. Draw Pieces
+        # Keep references on the canvas itself: the image manager may evict these
+        # images from its LRU cache while this canvas is still showing them.
+        target_canvas.piece_image_refs = []
         for square, piece in board.piece_map().items():
             rank, file = chess.square_rank(square), chess.square_file(square)
             cx = (file * sq_size) + (sq_size // 2)
@@ -609,6 +773,7 @@ class ChessMiniature(tk.Canvas):
             img = self.image_manager.get_miniature_image(piece.symbol(), sq_size)
             if img:
                 target_canvas.create_image(cx, cy, image=img)
+                target_canvas.piece_image_refs.append(img)
 
 class TouchMoveList(tk.Frame):
     """
@@ -820,8 +985,10 @@ class ChessEventViewer:
     """
     Tkinter application to display the top events from an analyzed PGN.
     """
+    # Maximum number of event tabs kept (hidden) for reuse by the next game
+    TAB_POOL_SIZE = 8
 
-    def __init__(self, master, pgn_string, square_size, image_manager, default_pgn_dir, lastLoadedPgnPath, engine_path, piece_set, board="Standard", engine_depth=17, current_game_index=0):
+    def __init__(self, master, pgn_string, square_size, image_manager, default_pgn_dir, lastLoadedPgnPath, engine_path, piece_set, board="Standard", engine_depth=17, current_game_index=0, game_offset=None):
         if image_manager is None:
             base_path = Path(__file__).parent.resolve()
             full_image_path = base_path / IMAGE_DIRECTORY.strip("/")
@@ -836,7 +1003,7 @@ class ChessEventViewer:
         self.swap_colours = False
         self.current_move_index = None
         self.game = None
-        self.board_canvases = []
+        self.board_canvases = {}
         self.tab_data = {}
         self.current_board_canvas = None
         self.num_events = None
@@ -847,11 +1014,10 @@ class ChessEventViewer:
         self.default_pgn_string = pgn_string
         self.lastLoadedPgnPath = lastLoadedPgnPath
 
-        self.comment_widgets = []
-        self.variation_widgets = []
-        self.move_display_widgets = []
-        self.miniature_widgets = []
-        self.miniboards = []
+        # Pool of event-tab frames (and their built widget trees) that is reused for every game
+        self.tab_pool = []
+        self.tab_views = {}
+        self.empty_event_frame = None
         self.init_tab_variables()
 
         # Variable to hold the selected file path for display
@@ -860,15 +1026,20 @@ class ChessEventViewer:
         master.protocol("WM_DELETE_WINDOW", self.on_closing)
 
         self.current_game_index = current_game_index
+        # Byte offset of the game to open first (deep link from the database browser), or None
+        self.game_offset = game_offset
+        self.pending_offset = None
         self.num_games = 0
         self.game_counter_var = tk.StringVar(value=f"Game 1 of {self.num_games}")
         self.game_descriptions = []
         self.selected_game_var = tk.StringVar(value=None)
+        self.pgn_loader = None  # PGNLoadWorker while a file is parsed in the background
+        self.load_start_index = 0
+        self.load_shown = False
 
         self.current_game_moves = []
 
         self.move_listbox = None
-        self.move_listboxes = []
         self.current_movelistbox = None
         self.current_tab = 0
 
@@ -955,6 +1126,9 @@ class ChessEventViewer:
             BOARD_THEMES[0]  # Gebruik Standard als fallback
         )
         self.color_light, self.color_dark = (self.selected_theme["light"], self.selected_theme["dark"])
+        # The pooled tabs keep their miniatures, give them the new colours too
+        for view in self.tab_views.values():
+            view['mini_board'].set_colors(self.color_light, self.color_dark)
 
     # --- Menu Logic ---
 
@@ -1240,25 +1414,11 @@ class ChessEventViewer:
         Receives the index directly from TouchMoveList.
         """
         try:
-            # 1. Search upwards to find the move line (using your existing logic)
-            target_move_number = None
-
-            # We use our new .get() method on the custom widget
-            for i in range(listbox_index, -1, -1):
-                line_content = self.current_movelistbox.get(i).strip()
-
-                # Check for move number (e.g., "1." or "12.")
-                move_match = re.match(r'^(\d+)\.', line_content)
-
-                if move_match:
-                    target_move_number = int(move_match.group(1))
-                    break
+            # 1. Look the row up in the row map of the tab (comment rows map to the move above)
+            real_move_index = self._ply_of_row(listbox_index)
 
             # 2. Process results
-            if target_move_number is not None:
-                # Calculate move index (assuming 2 moves per full move number)
-                # This matches your original logic: (target - 1) * 2
-                real_move_index = (target_move_number - 1) * 2
+            if real_move_index is not None:
                 self.display_diagram_move(real_move_index)
             else:
                 print("No valid move found for this selection.")
@@ -1313,29 +1473,13 @@ class ChessEventViewer:
             # 2. Clear existing selections
             self.current_movelistbox.selection_clear(0, tk.END)
 
-            # 3. Search upwards to find the move line
-            target_move_number = None
-
-            # Loop backwards from the clicked index to the beginning (index 0)
-            for i in range(listbox_index, -1, -1):
-                line_content = self.current_movelistbox.get(i).strip()
-
-                # Check if the line starts with a number followed by a period
-                # (e.g., "1." or "12.")
-                move_match = re.match(r'^(\d+)\.', line_content)
-
-                if move_match:
-                    # This is the move line!
-                    target_move_number = int(move_match.group(1))
-
-                    break
+            # 3. Find the move of the clicked row (comment/variation rows map to the move above)
+            real_move_index = self._ply_of_row(listbox_index)
 
             # 4. Process results
-            if target_move_number is not None:
+            if real_move_index is not None:
 
                 # update board position
-
-                real_move_index = (target_move_number - 1) * 2
                 self.display_diagram_move(real_move_index)
 
             else:
@@ -1408,15 +1552,17 @@ class ChessEventViewer:
             chess_move = chess_move - 1
         # A. Deselect all selected items
         self.current_movelistbox.selection_clear(0, tk.END)
-        for diagram_move in self.get_info_current_listbox()["move_index_map"]:
-            if diagram_move[0]==chess_move:
-                index_to_select = diagram_move[1]
-
-                # B. Select the item on the specific index (i)
-                self.current_movelistbox.selection_set(index_to_select)
-
-                # C. Scroll the Listbox so that the selected item will be visible
-                self.current_movelistbox.see(index_to_select)
+        info = self.get_info_current_listbox()
+        index_to_select = info["row_of_ply"].get(real_move_index)
+        if index_to_select is None:
+            # Not in the list as a ply of its own: fall back to the row of the move number
+            index_to_select = info["row_of_move_number"].get(chess_move)
+        if index_to_select is not None:
+            # B. Select the item on the specific index (i)
+            self.current_movelistbox.selection_set(index_to_select)
+
+            # C. Scroll the Listbox so that the selected item will be visible
+            self.current_movelistbox.see(index_to_select)
         # Clear the entire self.current_board_canvas
         self.current_board_canvas.delete("all")
         # Initialize the board with the FEN BEFORE the event
@@ -1451,72 +1597,55 @@ class ChessEventViewer:
         # Final Layering
         self.current_board_canvas.tag_raise("highlight")
 
+    def _current_row_map(self):
+        """Row map of the current tab (built by _format_pgn_history), empty if there is none."""
+        tab = self.tab_data.get(self.current_tab) if self.current_tab is not None else None
+        if tab and tab.get("row_map"):
+            return tab["row_map"]
+        return _new_move_row_map()
+
+    def _ply_of_row(self, listbox_index):
+        """Ply shown on a row of the current move list, None for an unknown row."""
+        ply_of_row = self.get_info_current_listbox()["ply_of_row"]
+        if 0 <= listbox_index < len(ply_of_row):
+            return ply_of_row[listbox_index]
+        return None
+
     def get_info_current_listbox(self):
         """
-        Analyzes the custom TouchMoveList and returns information about
-        the move numbers and their corresponding row indices.
+        Returns information about the move numbers of the current TouchMoveList
+        and their corresponding row indices, taken from the row map of the tab.
         """
         if self.current_movelistbox_info is not None:
             return self.current_movelistbox_info
-        # Initialization
-        min_move_number = float('inf')
-        max_move_number = float('-inf')
-        move_index_map = []  # List of (move_number, listbox_index) pairs
-        moves_added = []
-        last_index = 0
-        first_is_black = False
-
-        # Regex to match a move number (e.g., "1." or "12.")
-        move_pattern = re.compile(r'^(\d+)\.')
-
-        # Iterate over all rows in the TouchMoveList
-        # Note: self.current_movelistbox now refers to your TouchMoveList instance
-        for i in range(self.current_movelistbox.size()):
-            # Get content using the .get(i) method we added to the custom class
-            line_content = self.current_movelistbox.get(i).strip()
-
-            if i == 0 and "..." in line_content:
-                first_is_black = True
-
-            if not line_content:
-                continue
-
-            # Check for a move number pattern
-            match = move_pattern.match(line_content)
-
-            if match:
-                move_number = int(match.group(1))
-
-                # Add to the mapping if not already processed
-                if move_number not in moves_added:
-                    move_index_map.append((move_number, i))
-                    moves_added.append(move_number)
-
-                # Update min and max trackers
-                if move_number < min_move_number:
-                    min_move_number = move_number
-                if move_number > max_move_number:
-                    max_move_number = move_number
-
-                # Calculate the ply index (0-based index for the chess engine)
-                splits = line_content.split()  # Using split() handles multiple spaces
-                last_index = (move_number - 1) * 2
-
-                # If the line contains 3 parts (e.g., "1. e4 e5"), it ends on Black's move (+1)
-                # If it contains only 2 parts (e.g., "1. e4"), it ends on White's move (+0)
-                if len(splits) == 3:
-                    last_index += 1
-
-        # Reset defaults if no moves were found
-        if not move_index_map:
+        row_map = self._current_row_map()
+        row_of_ply = row_map["row_of_ply"]
+
+        # move number -> first row that shows it
+        row_of_move_number = {}
+        for ply in sorted(row_of_ply):
+            row_of_move_number.setdefault(ply // 2 + 1, row_of_ply[ply])
+
+        if row_of_ply:
+            min_move_number = min(row_of_move_number)
+            max_move_number = max(row_of_move_number)
+            last_index = max(row_of_ply)
+            first_is_black = min(row_of_ply) % 2 == 1
+        else:
+            # Reset defaults if no moves were found
             min_move_number = 0
             max_move_number = 0
+            last_index = 0
+            first_is_black = False
 
         # Cache the results in the instance variable
         self.current_movelistbox_info = {
             'min_move_number': min_move_number,
             'max_move_number': max_move_number,
-            'move_index_map': move_index_map,
+            'move_index_map': sorted(row_of_move_number.items()),  # (move_number, listbox_index) pairs
+            'row_of_move_number': row_of_move_number,
+            'row_of_ply': row_of_ply,
+            'ply_of_row': row_map["ply_of_row"],
             'last_index': last_index,
             "first_is_black": first_is_black
         }
@@ -1538,7 +1667,6 @@ class ChessEventViewer:
             self.current_game_moves,
             self._on_move_tapped
         )
-        self.move_listboxes.append(self.touch_move_list)
         self.touch_move_list.set_font_size(12)
 
         # 2. Place it in the grid (replacing the old listbox and scrollbar code)
@@ -1923,6 +2051,8 @@ class ChessEventViewer:
         # 3. Update the status variable
         self.current_tab = new_index
         new_tab = self.current_tab
+        # Build the tab content now if this is the first time it is shown
+        self._ensure_tab_built(new_tab)
         self.set_tab_variables(new_tab)
         # 4. Update the UI and log the change
         print(f"Tab changed. New index: {self.current_tab}")
@@ -1952,6 +2082,34 @@ class ChessEventViewer:
 
         self.display_diagram_move(self.current_move_index)
 
+        # Prefetch the neighbouring tabs when the UI is idle, so swiping to them is instant
+        generation = self.tab_generation
+        self.master.after_idle(lambda: self._prefetch_adjacent_tabs(generation))
+
+    def _ensure_tab_built(self, tab_index):
+        """
+        Builds the full content of a placeholder tab (boards, move list, miniature)
+        the first time it is needed. Returns True if the tab had to be built.
+        """
+        event_data = self.pending_tab_events.pop(tab_index, None)
+        if event_data is None:
+            return False
+        self._add_event_tab(tab_index + 1, event_data)
+        return True
+
+    def _prefetch_adjacent_tabs(self, generation):
+        """
+        Builds (at most) one not-yet-built neighbour of the current tab per idle callback.
+        """
+        if generation != self.tab_generation or not self.notebook.winfo_exists():
+            return
+        for neighbour in (self.current_tab + 1, self.current_tab - 1):
+            if neighbour in self.pending_tab_events:
+                self._ensure_tab_built(neighbour)
+                # Reschedule for the other neighbour
+                self.master.after_idle(lambda: self._prefetch_adjacent_tabs(generation))
+                return
+
     def set_tab_variables(self, new_tab):
         try:
             self.current_board_canvas = self.board_canvases[new_tab]
@@ -1966,14 +2124,21 @@ class ChessEventViewer:
             pass
 
     def init_tab_variables(self):
-        self.board_canvases = []
-        self.comment_widgets = []
-        self.miniature_widgets = []
-        self.miniboards = []
-        self.variation_widgets = []
-        self.move_display_widgets = []
-        self.move_listboxes = []
-        self.right_pane_widgets = []
+        # All per-tab widgets are keyed by the zero-based tab index, because tabs
+        # are built lazily and not necessarily in order.
+        self.board_canvases = {}
+        self.comment_widgets = {}
+        self.miniature_widgets = {}
+        self.miniboards = {}
+        self.variation_widgets = {}
+        self.move_display_widgets = {}
+        self.move_listboxes = {}
+        self.right_pane_widgets = {}
+        # Placeholder frames (one per notebook tab) and the data of tabs not built yet
+        self.tab_frames = {}
+        self.pending_tab_events = {}
+        # Incremented for every new game, so queued prefetches of an old game are ignored
+        self.tab_generation = getattr(self, 'tab_generation', 0) + 1
     def _create_meta_info_widgets(self, parent_frame):
         """
         CREATES the static Label widgets for the PGN metadata fields.
@@ -2104,7 +2269,7 @@ class ChessEventViewer:
         if file_path.is_file():
             print("SUCCESS: File found and is a valid file. Loading data.")
 
-            self._read_file_and_analyze(clean_path, self.current_game_index)
+            self._read_file_and_analyze(clean_path, self.current_game_index, self.game_offset)
 
             # Update the path string
             self.set_filepath(clean_path)
@@ -2151,13 +2316,7 @@ class ChessEventViewer:
             return []
         else:
             game = games[0]
-            if self.num_games == 1:
-                # hide the navigation-panel
-                self.nav_panel.pack_forget()
-            else:
-                # show the navigation-panel
-                NAV_PACK_ARGS = {'side': tk.TOP, 'fill': tk.X, 'pady': 5}
-                self.nav_panel.pack(**NAV_PACK_ARGS)
+            self._update_nav_panel_visibility()
         self.game = game
         return self.get_all_significant_events_game(game)
 
@@ -2170,78 +2329,7 @@ class ChessEventViewer:
         for move in game.mainline_moves():
             self.all_moves_chess.append(move)
 
-        events = []
-        board = game.board()
-        prev_eval_cp = 0
-        # List of ALL moves, including the move that caused the event
-        moves_made_so_far = []
-
-        # Iterate over the main line
-        for node in game.mainline():
-            if node.move is None:
-                continue
-
-            eval_before_cp = prev_eval_cp
-            eval_after_cp = get_cp_from_comment(node.comment)
-
-            fen_before_move = board.fen()
-            move_number = board.fullmove_number
-            player_who_moved = board.turn
-
-            # --- SAN CONVERSION ---
-            move_san = None
-            try:
-                move_san = board.san(node.move)
-            except Exception as e:
-                print(f"Warning: Error during SAN conversion for move {move_number} ({e})")
-                continue
-
-            # Add the data of the MOVE that was just checked to the history
-            move_data = {
-                'move_number': move_number,
-                'player': player_who_moved,
-                'san': move_san,
-                'comment': node.comment,
-                'variations': node.variations,
-                # This is the 0-based index in the complete move list
-                'full_move_index': len(moves_made_so_far)
-            }
-            moves_made_so_far.append(move_data)
-
-            # --- EVENT CALCULATION ---
-            if eval_after_cp is not None:
-                if player_who_moved == chess.WHITE:
-                    # Loss of advantage for White is (Previous Eval - New Eval)
-                    event_score = abs(eval_before_cp - eval_after_cp)
-                    player_str = "White"
-                else:
-                    # Loss of advantage for Black is (New Eval - Previous Eval)
-                    event_score = eval_after_cp - eval_before_cp
-                    player_str = "Black"
-
-                events.append({
-                    'score': event_score,
-                    'fen': fen_before_move,
-                    'move_text': f"{move_number}. {'. ...' if player_who_moved == chess.BLACK else ''}{move_san}",
-                    'player': player_str,
-                    'eval_before': eval_before_cp / 100.0,
-                    'eval_after': eval_after_cp / 100.0,
-                    'full_move_history': list(moves_made_so_far),
-                    'move_index': len(moves_made_so_far) - 1  # Index of the move
-                })
-                #print("event", 'score', event_score,'eval_before', eval_before_cp / 100.0,'eval_after', eval_after_cp / 100.0)
-
-            # --- EXECUTE MOVE AND TRACK EVALUATION ---
-            try:
-                board.push(node.move)
-            except Exception as e:
-                print(f"!!! ERROR !!! Cannot execute move '{move_san}' on the board: {e}")
-                return events
-
-            if eval_after_cp is not None:
-                # For the next move, the 'eval_after' of this move becomes the 'prev_eval'
-                prev_eval_cp = eval_after_cp
-
+        events = collect_significant_events(game)
         return events, game
 
 
@@ -2281,58 +2369,137 @@ class ChessEventViewer:
         self.num_events = len(self.sorted_events)
         self.populate_event_tabs(self.sorted_events)
 
-    def _read_file_and_analyze(self, filepath, start_index = 0):
-        """Reads the PGN-content of the file and start the analysis."""
+    def _update_nav_panel_visibility(self):
+        if self.num_games == 1:
+            # hide the navigation-panel
+            self.nav_panel.pack_forget()
+        else:
+            # show the navigation-panel
+            NAV_PACK_ARGS = {'side': tk.TOP, 'fill': tk.X, 'pady': 5}
+            self.nav_panel.pack(**NAV_PACK_ARGS)
+
+    def _read_file_and_analyze(self, filepath, start_index = 0, start_offset = None):
+        """
+        Reads the PGN-content of the file and start the analysis.
+        The file is parsed on a background thread (PGNLoadWorker); the game at start_index
+        is analyzed as soon as it has been read, the rest is added while loading continues.
+        With start_offset (byte offset of the game) that game is read on its own and analyzed
+        before the loader starts. Escape stops the loading.
+        """
+        if self.pgn_loader is not None:
+            # Its games and on_done (unbinding Escape) must not reach the new load
+            self.pgn_loader.abandon()
+        self.all_games = []
+        self.game_descriptions = []
+        self.load_start_index = start_index
+        self.load_shown = False
+        self.pending_offset = None
+        if start_offset is not None:
+            try:
+                stub, game = read_game_at(filepath, int(start_offset))
+            except (OSError, ValueError) as e:
+                print(f"Could not read the game at offset {start_offset}: {e}")
+                game = None
+            if game is not None:
+                # The loader only has to find out the index of this game
+                self.load_shown = True
+                self.pending_offset = int(start_offset)
+                self._analyze_game(game, start_index, filepath)
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                # Read the complete content of the PGN-file
-                pgn_content = f.read()
-
-            # Use io.StringIO to handle the string like it is a file
-            pgn_io = io.StringIO(pgn_content)
-            self.all_games = []
-            self.game_descriptions = []
-
-            # --- 1. Read ALL games from the PGN file ---
-            while game := chess.pgn.read_game(pgn_io):
-                self.all_games.append(game)
-                self.game_descriptions.append(
-                    game.headers.get("White")+"-"+game.headers.get("Black")+"("+game.headers.get("Result")+")")
-
-            # --- 2. Check and Analyze the First Game ---
-            if self.all_games:
-                first_game = self.all_games[start_index]
-
-                # Define the Exporter: Set headers, VARIATIONS and COMMENTS to True
-                exporter = chess.pgn.StringExporter(
-                    headers=True,
-                    variations=True,
-                    comments=True
-                )
+            # The callbacks pass the loader on, so only the current load can match the pending offset
+            loader = PGNLoadWorker(self.master, filepath=filepath,
+                                   on_games=lambda games: self._on_games_loaded(games, filepath, loader),
+                                   on_progress=self._on_load_progress,
+                                   on_done=lambda status, error: self._on_load_finished(status, error, filepath))
+            self.pgn_loader = loader
+        except Exception as e:
+            traceback.print_exc()
+            error_message = f"ERROR: Failed to read PGN file: {e}"
+            print(error_message)
+            self.pgn_filepath.set(error_message)
+            self._clear_content_frame()
+            return
+        self.master.bind("<Escape>", self._cancel_loading)
+        self.pgn_loader.start()
+
+    def _cancel_loading(self, event=None):
+        if self.pgn_loader is not None:
+            print("Loading of the PGN file stopped by the user.")
+            self.pgn_loader.cancel()
+
+    def _on_games_loaded(self, games, filepath, loader=None):
+        """ Called on the Tk thread with each batch of games parsed by the background loader. """
+        for game in games:
+            if self.pending_offset is not None and loader is self.pgn_loader:
+                # The game opened by offset: the first game that starts at or after it
+                span = loader.spans.get(game)
+                if span is not None and span[0] >= self.pending_offset:
+                    self.pending_offset = None
+                    self.current_game_index = len(self.all_games)
+            self.all_games.append(game)
+            self.game_descriptions.append(
+                game.headers.get("White")+"-"+game.headers.get("Black")+"("+game.headers.get("Result")+")")
+        self.num_games = len(self.game_descriptions)
 
-                # Convert back the found game (including variants/comments)
-                single_pgn_string = first_game.accept(exporter)
+        # --- Analyze the requested game as soon as it is available ---
+        if not self.load_shown and self.load_start_index < len(self.all_games):
+            self.load_shown = True
+            self._analyze_loaded_game(self.load_start_index, filepath)
 
-                # Reset the current game index to the first game
-                self.current_game_index = start_index
+    def _analyze_loaded_game(self, index, filepath):
+        self._analyze_game(self.all_games[index], index, filepath)
 
-                # Do the analysis of the first game
-                self.do_new_analysis(single_pgn_string)
-                self.lastLoadedPgnPath = filepath
+    def _analyze_game(self, first_game, index, filepath):
+        # Define the Exporter: Set headers, VARIATIONS and COMMENTS to True
+        exporter = chess.pgn.StringExporter(
+            headers=True,
+            variations=True,
+            comments=True
+        )
 
-            else:
-                print("Error: the PGN-file does not contain playable games.")
-                # Handle error state: clear path and content
-                self.pgn_filepath.set("Error: PGN file contains no games.")
-                self._clear_content_frame()
-                self.all_games = [] # Ensure the list is empty if no games found
+        # Convert back the found game (including variants/comments)
+        single_pgn_string = first_game.accept(exporter)
 
-        except Exception as e:
-            traceback.print_exc()
-            error_message = f"ERROR: Failed to read PGN file: {e}"
+        # Reset the current game index to the first game
+        self.current_game_index = index
+
+        # Do the analysis of the first game
+        self.do_new_analysis(single_pgn_string)
+        self.lastLoadedPgnPath = filepath
+
+    def _on_load_progress(self, games_read, position, total):
+        file_name = os.path.basename(self.pgn_filepath.get())
+        percentage = int(100 * position / total) if total else 100
+        self.game_counter_var.set(
+            f"Game {self.current_game_index + 1} of {games_read} in {file_name} (loading {percentage}%)")
+
+    def _on_load_finished(self, status, error, filepath):
+        self.pgn_loader = None
+        self.master.unbind("<Escape>")
+        if status == "error":
+            error_message = f"ERROR: Failed to read PGN file: {error}"
             print(error_message)
-            self.pgn_filepath.set(error_message)
+            if not self.all_games:
+                self.pgn_filepath.set(error_message)
+                self._clear_content_frame()
+                return
+        elif status == "cancelled":
+            print(f"Loading stopped after {len(self.all_games)} games.")
+
+        if not self.all_games:
+            print("Error: the PGN-file does not contain playable games.")
+            # Handle error state: clear path and content
+            self.pgn_filepath.set("Error: PGN file contains no games.")
             self._clear_content_frame()
+            return
+
+        if not self.load_shown:
+            # The requested index is beyond the end of the file: show the last game
+            self.load_shown = True
+            self._analyze_loaded_game(len(self.all_games) - 1, filepath)
+        self.num_games = len(self.game_descriptions)
+        self._update_nav_panel_visibility()
+        self.set_game_var_descriptions(self.current_game_index)
 
     def _create_file_reader_widget(self, file_reader_frame, row=0):
         """
@@ -2419,46 +2586,203 @@ class ChessEventViewer:
 
     def _add_event_tab(self, index, event_data):
         """
-        Creates and adds a single tab containing the detailed diagram and PGN snippet.
-        This incorporates the logic previously in draw_event_diagram.
+        Shows a single event (detailed diagram and PGN snippet) in the tab at position index (1-based).
+        The widget tree of a tab is built only once (_build_event_tab_view) and kept in the tab pool;
+        for a new game it is refilled with the new data (_fill_event_tab).
         """
+        tab_index = index - 1
+        tab_frame = self.tab_frames[tab_index]
+        view = self.tab_views.get(tab_frame)
+        try:
+            if view is None:
+                view = self._build_event_tab_view(tab_frame)
+                self.tab_views[tab_frame] = view
+            self._fill_event_tab(view, index, event_data)
+        except Exception as e:
+            print("error in creation notebook",e)
+            traceback.print_exc()
 
-        # --- 1. Create the container Frame for the tab content ---
-        tab_frame = ttk.Frame(self.notebook, padding="15 10 15 10")
+    def _build_event_tab_view(self, tab_frame):
+        """
+        Creates the (game independent) widgets of an event tab inside the placeholder frame.
+        Returns a dict with the widgets that _fill_event_tab needs.
+        """
+        # --- 1. Fill the placeholder Frame that is already in the notebook ---
+        for child in tab_frame.winfo_children():
+            child.destroy()
         #tab_frame.columnconfigure(1, weight=1)  # Ensure the PGN column expands
         tab_frame.grid_rowconfigure(0, weight=1)
         tab_frame.grid_columnconfigure(1, weight=1)  # The column for pgn_block
 
-        # Extract the PGN snippet text
-        pgn_snippet_text = event_data['move_history']
+        view = {}
 
         # --- COLUMN 0: DIAGRAM & INFO (Left) ---
-        title = f"{index}: {event_data['move_text']}"
-
         diagram_block = tk.Frame(tab_frame,
                                       padx=10, pady=10, bd=2, relief=tk.GROOVE)
         diagram_block.grid(row=0, column=0, padx=(0, 15), pady=5, sticky='nsw')
 
         # 1. Info Label
-        info_text = (
-            f"Change: {event_data['score'] / 100.0:.2f} P"
-            f"Eval BEFORE: {event_data['eval_before']:.2f} | Eval AFTER: {event_data['eval_after']:.2f}"
-        )
-        tk.Label(diagram_block, text=info_text, justify=tk.LEFT, pady=5).pack(anchor="w")
+        view['info_label'] = tk.Label(diagram_block, text="", justify=tk.LEFT, pady=5)
+        view['info_label'].pack(anchor="w")
 
         # 2. Canvas for the board
         board_canvas = tk.Canvas(diagram_block, width=self.board_size, height=self.board_size,
                                  borderwidth=0, highlightthickness=1, highlightbackground="black")
         board_canvas.pack(pady=10)
-        self.board_canvases.append(board_canvas)
+        view['board_canvas'] = board_canvas
+        # Bind the left mouse button click to our handler
+        board_canvas.bind("<Button-1>", self._on_board_click)
 
-        # Initialize the board with the FEN BEFORE the event
+        # --- COLUMN 1: PGN SNIPPET & ANALYSIS (Right Side) ---
+        pgn_block = tk.Frame(tab_frame, padx=5, pady=2, bd=2, relief=tk.GROOVE)
+        pgn_block.grid(row=0, column=1, padx=(15, 0), pady=5, sticky='nsew')
+
+        # Configure pgn_block: Row 0 is content (expand), Row 1 is Toolbar (fixed)
+        pgn_block.grid_rowconfigure(0, weight=1)
+        pgn_block.grid_rowconfigure(1, weight=0)
+        pgn_block.grid_columnconfigure(0, weight=1)
+
+        # 1. CREATE THE MAIN HORIZONTAL SPLITTER (Left vs Right Column)
+        column_pane = tk.PanedWindow(pgn_block, orient=tk.HORIZONTAL, sashrelief=tk.RAISED, sashwidth=4)
+        column_pane.grid(row=0, column=0, sticky="nsew")
+
+        # Create the two main column containers
+        left_column = tk.Frame(column_pane)
+        right_column = tk.Frame(column_pane)
+
+        column_pane.add(left_column, stretch="always")
+        column_pane.add(right_column, width=320, stretch="never")  # Keep right side stable
+
+        # ---------------------------------------------------------
+        # --- LEFT COLUMN: MOVES & COMMENTS (Vertical Split) ---
+        # ---------------------------------------------------------
+        left_pane = tk.PanedWindow(left_column, orient=tk.VERTICAL, sashrelief=tk.RAISED, sashwidth=4)
+        left_pane.pack(fill=tk.BOTH, expand=True)
+
+        # Container for Moves (Top Left)
+        moves_container = tk.Frame(left_pane)
+        # Container for Comments (Bottom Left)
+        comments_container = tk.Frame(left_pane)
+
+        left_pane.add(moves_container, height=350, minsize=150)
+        left_pane.add(comments_container, height=150, minsize=100)
+
+        # --- 1. MOVES (Inside moves_container) ---
+        # Assuming _create_move_list_widget uses grid or pack on its parent
+        self._create_move_list_widget(moves_container)
+        view['move_listbox'] = self.move_listbox
+        # Make sure the internal grid of moves_container is configured
+        moves_container.grid_rowconfigure(0, weight=1)
+        moves_container.grid_columnconfigure(0, weight=1)
+
+        # --- 2. COMMENTS (Inside comments_container) ---
+        comm_frame = tk.LabelFrame(comments_container, text="Comments", padx=5, pady=2)
+        comm_frame.pack(fill=tk.BOTH, expand=True, pady=2)
+
+        comm_text = tk.Text(comm_frame, height=4, wrap=tk.WORD, font=("Segoe UI", 10))
+        comm_text.pack(fill=tk.BOTH, expand=True)
+        comm_text.config(state=tk.DISABLED)
+        view['comment'] = comm_text
+
+        # ---------------------------------------------------------
+        # --- RIGHT COLUMN: INFO, VARIATIONS & MINIATURE ---
+        # ---------------------------------------------------------
+        # Create a vertical PanedWindow inside the right column
+        right_pane = tk.PanedWindow(right_column,
+                                    orient=tk.VERTICAL, sashrelief=tk.RAISED, sashwidth=4)
+        right_pane.pack(fill=tk.BOTH, expand=True)
+        view['right_pane'] = right_pane
+
+        # Container for the Top part (Move Info + Variations)
+        right_top_container = tk.Frame(right_pane)
+        # Container for the Bottom part (Miniature)
+        right_bottom_container = tk.Frame(right_pane)
+
+        # Add them to the pane
+        # We give the miniature container a fixed initial height of 350
+        right_pane.add(right_top_container, stretch="always")
+        right_pane.add(right_bottom_container, height=350, minsize=300, stretch="never")
+
+        # --- 1. TOP PART: MOVE & VARIATIONS ---
+        right_top_container.grid_columnconfigure(0, weight=1)
+        right_top_container.grid_rowconfigure(1, weight=1)
+
+        # Move Display
+        move_frame = tk.LabelFrame(right_top_container, text="Move", padx=5, pady=2)
+        move_frame.grid(row=0, column=0, sticky='ew', pady=2)
+
+        move_label = tk.Label(move_frame, text='-',
+                              font=("Helvetica", 12, "bold"), fg="blue")
+        move_label.pack(anchor="w")
+        view['move_label'] = move_label
+
+        # Variations
+        vars_frame = tk.LabelFrame(right_top_container, text="Variations", padx=5, pady=2)
+        vars_frame.grid(row=1, column=0, sticky='nsew', pady=2)
+
+        vars_text = tk.Listbox(vars_frame, font=('Arial', 9), height=6)
+        vars_text.pack(fill=tk.BOTH, expand=True)
+        view['variations'] = vars_text
+        vars_text.bind("<<ListboxSelect>>", self._on_variation_selected)
+
+        # --- 2. BOTTOM PART: MINIATURE ---
+        miniature_frame = tk.LabelFrame(right_bottom_container, text="Position Preview", padx=5, pady=2)
+        miniature_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Fixed size constraints inside the frame
+        miniature_frame.grid_propagate(False)
+
+        mini_board = ChessMiniature(miniature_frame, self.image_manager, size=280,
+                                    color_light=self.color_light, color_dark=self.color_dark)
+        mini_board.pack(expand=True, fill=tk.BOTH, padx=5, pady=(0, 0))
+        view['mini_board'] = mini_board
+        view['miniature_frame'] = miniature_frame
+
+        # ---------------------------------------------------------
+        # --- TOOLBAR (Bottom, Full Width) ---
+        # ---------------------------------------------------------
+        toolbar = self._setup_quick_toolbar(pgn_block)
+        toolbar.grid(row=1, column=0, sticky='ew', pady=(1, 2))
+
+        return view
+
+    def _fill_event_tab(self, view, index, event_data):
+        """
+        Puts the data of one event into an (already built) tab view and registers
+        its widgets under the tab index.
+        """
+        tab_index = index - 1
+        tab_frame = self.tab_frames[tab_index]
+
+        # Register the widgets of this tab (used by set_tab_variables)
+        self.board_canvases[tab_index] = view['board_canvas']
+        self.move_listboxes[tab_index] = view['move_listbox']
+        self.comment_widgets[tab_index] = view['comment']
+        self.right_pane_widgets[tab_index] = view['right_pane']
+        self.move_display_widgets[tab_index] = view['move_label']
+        self.variation_widgets[tab_index] = view['variations']
+        self.miniboards[tab_index] = view['mini_board']
+        self.miniature_widgets[tab_index] = view['miniature_frame']
+        self.mini_board = view['mini_board']
+        # The view may have been built (pooled) with another board theme
+        self.mini_board.set_colors(self.color_light, self.color_dark)
+        self.move_listbox = view['move_listbox']
+
+        # 1. Info Label
+        info_text = (
+            f"Change: {event_data['score'] / 100.0:.2f} P"
+            f"Eval BEFORE: {event_data['eval_before']:.2f} | Eval AFTER: {event_data['eval_after']:.2f}"
+        )
+        view['info_label'].config(text=info_text, fg="black")
+
+        # 2. The board: the FEN BEFORE the event
+        board_canvas = view['board_canvas']
+        board_canvas.delete("all")
         try:
             board = chess.Board(event_data['fen'])
         except ValueError:
-            tk.Label(diagram_block, text="Ongeldige FEN", fg="red").pack()
-            board_canvas.pack_forget()
-            self.notebook.add(tab_frame, text=f"ERROR {index}")
+            view['info_label'].config(text="Ongeldige FEN", fg="red")
+            self.notebook.tab(tab_frame, text=f"ERROR {index}")
             return
         for square in chess.SQUARES:
             rank = chess.square_rank(square)
@@ -2498,146 +2822,39 @@ class ChessEventViewer:
         except Exception as e:
             # If move parsing fails (e.g. at start of game), we simply skip highlighting
             print(f"Highlighting skipped: {e}")
-        # Bind the left mouse button click to our handler
-        board_canvas.bind("<Button-1>", self._on_board_click)
-        try:
-            # --- COLUMN 1: PGN SNIPPET & ANALYSIS (Right Side) ---
-            pgn_block = tk.Frame(tab_frame, padx=5, pady=2, bd=2, relief=tk.GROOVE)
-            pgn_block.grid(row=0, column=1, padx=(15, 0), pady=5, sticky='nsew')
-
-            # Configure pgn_block: Row 0 is content (expand), Row 1 is Toolbar (fixed)
-            pgn_block.grid_rowconfigure(0, weight=1)
-            pgn_block.grid_rowconfigure(1, weight=0)
-            pgn_block.grid_columnconfigure(0, weight=1)
-
-            # 1. CREATE THE MAIN HORIZONTAL SPLITTER (Left vs Right Column)
-            column_pane = tk.PanedWindow(pgn_block, orient=tk.HORIZONTAL, sashrelief=tk.RAISED, sashwidth=4)
-            column_pane.grid(row=0, column=0, sticky="nsew")
-
-            # Create the two main column containers
-            left_column = tk.Frame(column_pane)
-            right_column = tk.Frame(column_pane)
-
-            column_pane.add(left_column, stretch="always")
-            column_pane.add(right_column, width=320, stretch="never")  # Keep right side stable
-
-            # ---------------------------------------------------------
-            # --- LEFT COLUMN: MOVES & COMMENTS (Vertical Split) ---
-            # ---------------------------------------------------------
-            left_pane = tk.PanedWindow(left_column, orient=tk.VERTICAL, sashrelief=tk.RAISED, sashwidth=4)
-            left_pane.pack(fill=tk.BOTH, expand=True)
-
-            # Container for Moves (Top Left)
-            moves_container = tk.Frame(left_pane)
-            # Container for Comments (Bottom Left)
-            comments_container = tk.Frame(left_pane)
-
-            left_pane.add(moves_container, height=350, minsize=150)
-            left_pane.add(comments_container, height=150, minsize=100)
-
-            # --- 1. MOVES (Inside moves_container) ---
-            # Assuming _create_move_list_widget uses grid or pack on its parent
-            self._create_move_list_widget(moves_container)
-            # Make sure the internal grid of moves_container is configured
-            moves_container.grid_rowconfigure(0, weight=1)
-            moves_container.grid_columnconfigure(0, weight=1)
-
-            # --- 2. COMMENTS (Inside comments_container) ---
-            comm_frame = tk.LabelFrame(comments_container, text="Comments", padx=5, pady=2)
-            comm_frame.pack(fill=tk.BOTH, expand=True, pady=2)
-
-            comm_text = tk.Text(comm_frame, height=4, wrap=tk.WORD, font=("Segoe UI", 10))
-            comm_text.pack(fill=tk.BOTH, expand=True)
-            if 'comment' in event_data:
-                comm_text.insert(tk.END, event_data['comment'])
-            comm_text.config(state=tk.DISABLED)
-            self.comment_widgets.append(comm_text)
-
-            # ---------------------------------------------------------
-            # --- RIGHT COLUMN: INFO, VARIATIONS & MINIATURE ---
-            # ---------------------------------------------------------
-            # Create a vertical PanedWindow inside the right column
-            right_pane = tk.PanedWindow(right_column,
-                                        orient=tk.VERTICAL, sashrelief=tk.RAISED, sashwidth=4)
-            right_pane.pack(fill=tk.BOTH, expand=True)
-            self.right_pane_widgets.append(right_pane)
-
-            # Container for the Top part (Move Info + Variations)
-            right_top_container = tk.Frame(right_pane)
-            # Container for the Bottom part (Miniature)
-            right_bottom_container = tk.Frame(right_pane)
-
-            # Add them to the pane
-            # We give the miniature container a fixed initial height of 350
-            right_pane.add(right_top_container, stretch="always")
-            right_pane.add(right_bottom_container, height=350, minsize=300, stretch="never")
-
-            # --- 1. TOP PART: MOVE & VARIATIONS ---
-            right_top_container.grid_columnconfigure(0, weight=1)
-            right_top_container.grid_rowconfigure(1, weight=1)
-
-            # Move Display
-            move_frame = tk.LabelFrame(right_top_container, text="Move", padx=5, pady=2)
-            move_frame.grid(row=0, column=0, sticky='ew', pady=2)
-
-            move_label = tk.Label(move_frame, text=event_data.get('move_text', '-'),
-                                  font=("Helvetica", 12, "bold"), fg="blue")
-            move_label.pack(anchor="w")
-            self.move_display_widgets.append(move_label)
-
-            # Variations
-            vars_frame = tk.LabelFrame(right_top_container, text="Variations", padx=5, pady=2)
-            vars_frame.grid(row=1, column=0, sticky='nsew', pady=2)
-
-            vars_text = tk.Listbox(vars_frame, font=('Arial', 9), height=6)
-            vars_text.pack(fill=tk.BOTH, expand=True)
-            if 'variations' in event_data:
-                vars_text.insert(tk.END, event_data['variations'])
-            self.variation_widgets.append(vars_text)
-            vars_text.bind("<<ListboxSelect>>", self._on_variation_selected)
-
-            # --- 2. BOTTOM PART: MINIATURE ---
-            miniature_frame = tk.LabelFrame(right_bottom_container, text="Position Preview", padx=5, pady=2)
-            miniature_frame.pack(fill=tk.BOTH, expand=True)
-
-            # Fixed size constraints inside the frame
-            miniature_frame.grid_propagate(False)
-
-            last_variation = event_data.get('last_variation')
-            self.mini_board = ChessMiniature(miniature_frame, self.image_manager, size=280,
-                                             color_light=self.color_light, color_dark=self.color_dark)
-            self.mini_board.pack(expand=True, fill=tk.BOTH, padx=5, pady=(0, 0))
-            self.miniboards.append(self.mini_board)
-
-            self.miniature_widgets.append(miniature_frame)
-            # ---------------------------------------------------------
-            # --- TOOLBAR (Bottom, Full Width) ---
-            # ---------------------------------------------------------
-            toolbar = self._setup_quick_toolbar(pgn_block)
-            toolbar.grid(row=1, column=0, sticky='ew', pady=(1, 2))
-
-            # --- TAB FINALIZATION ---
-            self._update_move_listbox_content(pgn_snippet_text)
-
-            last_move = self.tab_data[index-1]['last_move']
-            if last_move > 0:
-                #get last_node
-                node_before_last = self.game
-                for i in range(last_move):
-                    node_before_last = node_before_last.variations[0]
-                if len(node_before_last.variations) > 1:
-                    self.mini_board.draw_from_node(node_before_last.variations[1])
-                    miniature_frame.config(text=get_full_move_text(node_before_last.variations[1]))
-
-            #print("tab-data", self.tab_data[index-1], self.all_moves_chess[self.tab_data[index-1]['last_move']])
-            tab_title = f"{event_data['move_text']}"
-
-            self.notebook.add(tab_frame, text=tab_title)
-
 
-        except Exception as e:
-            print("error in creation notebook",e)
-            traceback.print_exc()
+        # 3. Comment, move and variations
+        comm_text = view['comment']
+        comm_text.config(state=tk.NORMAL)
+        comm_text.delete("1.0", tk.END)
+        if 'comment' in event_data:
+            comm_text.insert(tk.END, event_data['comment'])
+        comm_text.config(state=tk.DISABLED)
+
+        view['move_label'].config(text=event_data.get('move_text', '-'))
+
+        vars_text = view['variations']
+        vars_text.delete(0, tk.END)
+        if 'variations' in event_data:
+            vars_text.insert(tk.END, event_data['variations'])
+
+        # --- TAB FINALIZATION ---
+        self._update_move_listbox_content(event_data['move_history'])
+
+        # 4. Miniature: first side-variation before the event move (if any)
+        view['mini_board'].clear()
+        view['miniature_frame'].config(text="Position Preview")
+        last_move = self.tab_data[tab_index]['last_move']
+        if last_move > 0:
+            #get last_node
+            node_before_last = self.game
+            for i in range(last_move):
+                node_before_last = node_before_last.variations[0]
+            if len(node_before_last.variations) > 1:
+                view['mini_board'].draw_from_node(node_before_last.variations[1])
+                view['miniature_frame'].config(text=get_full_move_text(node_before_last.variations[1]))
+
+        self.notebook.tab(tab_frame, text=f"{event_data['move_text']}")
 
     def _on_board_click(self, event):
         """
@@ -2681,18 +2898,24 @@ class ChessEventViewer:
         Removes existing tabs and populates the Notebook with new events,
         calculating the PGN snippet for each event.
         """
-        # 1. CLEAR ALL EXISTING TABS
-        for tab in self.notebook.tabs():
-            self.notebook.forget(tab)
-
-        self.move_listboxes = []
-        self.board_canvases = []
+        # 1. RESET THE TABS
+        # Block tab-change logic while the notebook is refilled
+        self.is_loading_game = True
+        # The 'No Events' page is not part of the tab pool
+        if self.empty_event_frame is not None:
+            self.notebook.forget(self.empty_event_frame)
+            self.empty_event_frame.destroy()
+            self.empty_event_frame = None
+        self.init_tab_variables()
 
         if not events:
+            self._release_surplus_tabs(0)
+            self.is_loading_game = False
             empty_frame = ttk.Frame(self.notebook, padding=20)
             tk.Label(empty_frame, text="No significant events (>= 50 cp) found in the PGN data.",
                      pady=50, padx=20).pack()
             self.notebook.add(empty_frame, text="No Events")
+            self.empty_event_frame = empty_frame
             return
 
         last_move_index = -1
@@ -2704,7 +2927,7 @@ class ChessEventViewer:
         for i, event in enumerate(events):
             current_move_index = event['move_index']
             moves_to_display = event['full_move_history'][last_move_index + 1: current_move_index + 1]
-            pgn_snippet, num_moves = _format_pgn_history(moves_to_display)
+            pgn_snippet, num_moves, row_map = _format_pgn_history(moves_to_display)
 
             last_variation = None
             for move in moves_to_display:
@@ -2725,48 +2948,59 @@ class ChessEventViewer:
             self.tab_data[i] = {
                 "num_moves": num_moves,
                 "first_move": last_move_index + 1,
-                "last_move": current_move_index
+                "last_move": current_move_index,
+                "row_map": row_map
             }
             processed_events.append(tab_data)
             last_move_index = current_move_index
 
-        # 2. CREATE THE FIRST TAB IMMEDIATELY
+        # 2. TAKE A TAB FROM THE POOL FOR EVERY EVENT
+        # Tabs of the previous game are refilled instead of destroyed and rebuilt; new tabs
+        # start as lightweight placeholders. The content is (re)filled when a tab is selected
+        # for the first time (see _on_tab_change) and prefetched for the neighbouring tabs only.
+        for i, tab_event in enumerate(processed_events):
+            if i < len(self.tab_pool):
+                tab_frame = self.tab_pool[i]
+                # Re-shows the tab if it was hidden for a game with fewer events
+                self.notebook.add(tab_frame)
+            else:
+                tab_frame = ttk.Frame(self.notebook, padding="15 10 15 10")
+                tk.Label(tab_frame, text="Loading position...", pady=50, padx=20).grid(row=0, column=0)
+                self.notebook.add(tab_frame)
+                self.tab_pool.append(tab_frame)
+            self.notebook.tab(tab_frame, text=f"{tab_event['move_text']}")
+            self.tab_frames[i] = tab_frame
+            self.pending_tab_events[i] = tab_event
+        self._release_surplus_tabs(len(processed_events))
+
+        # 3. BUILD AND SHOW THE FIRST TAB IMMEDIATELY
         if processed_events:
+            self._ensure_tab_built(0)
             self.is_loading_game = False
             self.current_tab = -1
-            self._add_event_tab(1, processed_events[0])
-            self.master.update_idletasks()
-            if self.notebook.tabs():
-                self.notebook.select(self.notebook.tabs()[0])
+            self.notebook.select(self.notebook.tabs()[0])
+            # The first tab may already have been selected when it was added,
+            # in that case no <<NotebookTabChanged>> is generated
+            self._on_tab_change(None)
 
             # Force the UI to draw the first tab now
             self.master.update_idletasks()
 
-
-        # 3. SCHEDULE THE REST IN THE BACKGROUND
-        # Start the background process after a small delay (100ms)
-        if len(processed_events) > 1:
-            self.master.after(100, lambda: self._add_remaining_tabs_sequentially(processed_events, 1))
-
-    def _add_remaining_tabs_sequentially(self, all_events, start_index):
+    def _release_surplus_tabs(self, needed):
         """
-        Adds tabs one by one in the background to prevent UI freezing.
+        Hides pooled tabs that the current game does not need; tabs beyond
+        TAB_POOL_SIZE are destroyed instead of being kept around.
         """
-        # Guard: stop if the user closed the window or cleared the notebook
-        if not self.notebook.winfo_exists():
-            return
-
-        # Temporarily block tab-change events while adding background tabs
-        self.is_loading_game = True
-
-        # Add one tab
-        self._add_event_tab(start_index + 1, all_events[start_index])
-
-        self.is_loading_game = False
+        for i in range(len(self.tab_pool) - 1, needed - 1, -1):
+            tab_frame = self.tab_pool[i]
+            if i < self.TAB_POOL_SIZE:
+                self.notebook.hide(tab_frame)
+            else:
+                self.notebook.forget(tab_frame)
+                self.tab_views.pop(tab_frame, None)
+                tab_frame.destroy()
+                del self.tab_pool[i]
 
-        # Schedule the next one if available
-        if start_index + 1 < len(all_events):
-            self.master.after(10, lambda: self._add_remaining_tabs_sequentially(all_events, start_index + 1))
     def swap_colours_func(self):
         self.swap_colours = not self.swap_colours
         self.display_diagram_move(self.current_move_index)